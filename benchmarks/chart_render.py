@@ -0,0 +1,113 @@
+"""Per-rerun chart render time and process RSS, with and without the chart cache.
+
+Replays reruns of the two charted pages: the historical-rate line chart and
+the Budget Planner pie, cycling through a few distinct inputs the way a user
+moving a slider would. "uncached" does what the pages used to do (px.line
+every rerun, a pyplot figure per rerun that is never closed); "cached" goes
+through utils.chart_cache. Each mode runs in its own process so RSS is
+comparable.
+
+    python benchmarks/chart_render.py --reruns 300 --distinct 5
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        # Peak rather than current RSS where /proc is unavailable (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def inputs(distinct):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    for i in range(distinct):
+        days = 30 + 60 * i
+        history = pd.DataFrame({
+            "Date": pd.date_range("2025-01-01", periods=days).strftime("%Y-%m-%d"),
+            "Rate": 0.9 + rng.normal(0, 0.01, days).cumsum(),
+        })
+        budget = {name: float(rng.integers(50, 500)) for name in ["Accommodation", "Food", "Transportation", "Activities", "Shopping", "Miscellaneous"]}
+        yield history, budget
+
+
+def run(mode, reruns, distinct):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import plotly.io as pio
+
+    from pages.budget_planner import draw_budget_pie
+    from pages.currency_converter import rate_history_figure
+    from utils.chart_cache import cached_matplotlib_png, cached_plotly_figure
+
+    cases = list(inputs(distinct))
+    start_rss = rss_mb()
+    timings = []
+    for i in range(reruns):
+        history, budget = cases[i % distinct]
+        start = time.perf_counter()
+        if mode == "cached":
+            figure = cached_plotly_figure(rate_history_figure, history, title="USD/EUR Exchange Rate History")
+            png = cached_matplotlib_png(draw_budget_pie, budget)
+        else:
+            figure = rate_history_figure(history, title="USD/EUR Exchange Rate History")
+            fig, ax = plt.subplots(figsize=(8, 6))
+            ax.pie(budget.values(), labels=budget.keys(), autopct="%1.1f%%", startangle=90)
+            ax.axis("equal")
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", bbox_inches="tight")
+            png = buffer.getvalue()
+        # st.plotly_chart serializes the figure on every call either way
+        pio.to_json(figure, validate=False)
+        timings.append(time.perf_counter() - start)
+        assert png
+
+    timings.sort()
+    return {
+        "mode": mode,
+        "mean_ms": sum(timings) / len(timings) * 1000,
+        "p95_ms": timings[int(0.95 * (len(timings) - 1))] * 1000,
+        "rss_growth_mb": rss_mb() - start_rss,
+        "rss_mb": rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=300)
+    parser.add_argument("--distinct", type=int, default=5, help="distinct chart inputs cycled through")
+    parser.add_argument("--mode", choices=["cached", "uncached"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run(args.mode, args.reruns, args.distinct)))
+        return
+
+    for mode in ("uncached", "cached"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--reruns", str(args.reruns), "--distinct", str(args.distinct)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:9s} {result['mean_ms']:7.1f} ms/rerun (p95 {result['p95_ms']:6.1f})  "
+              f"RSS {result['rss_mb']:6.1f} MB (+{result['rss_growth_mb']:.1f} MB over {args.reruns} reruns)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Cold-start import budget for the Home page.
+
+Imports what ``src/app.py`` imports before its first paint, in a fresh
+interpreter run with ``python -X importtime``, and fails if the total import
+time exceeds the budget or if any heavy module that should only load with
+its page gets imported.
+
+    python benchmarks/import_time.py --budget-ms 1000
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Keep in sync with the module-level imports of src/app.py and the Home page
+COLD_START_IMPORTS = ["streamlit", "dotenv", "config.settings", "utils.orchestrator", "utils.rate_scheduler", "utils.tracing",
+                      "utils.guide_bundle", "pages.home"]
+
+# Modules that only pages other than Home may import
+DEFERRED_MODULES = ["pandas", "numpy", "plotly.express", "matplotlib", "transformers", "sklearn"]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(runs):
+    """Return the best-of-``runs`` total import time (ms) and the imported module names"""
+    code = f"import sys; sys.path.insert(0, {SRC_DIR!r})\n" + "\n".join(f"import {name}" for name in COLD_START_IMPORTS)
+    best, modules = None, set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+        total_us, modules = 0, set()
+        for line in result.stderr.splitlines():
+            match = LINE_RE.match(line)
+            if not match:
+                continue
+            modules.add(match.group(4))
+            # Top-level imports (one space of indent) already include their children
+            if len(match.group(3)) == 1:
+                total_us += int(match.group(2))
+        best = total_us if best is None else min(best, total_us)
+    return best / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1000")))
+    parser.add_argument("--runs", type=int, default=3, help="report the fastest of this many runs")
+    args = parser.parse_args()
+
+    total_ms, modules = measure(args.runs)
+    leaked = [name for name in DEFERRED_MODULES if name in modules]
+    print(f"cold-start imports: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if leaked:
+        print(f"FAIL: deferred modules imported at cold start: {', '.join(leaked)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("FAIL: cold-start import time is over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Throughput and tail latency of the inference dispatcher against a mock endpoint.
+
+Starts the stub inference server in-process, configured to answer 503 while
+"loading" and 429 above a request rate, then fires concurrent sessions that
+ask a small set of trending prompts. Every session either calls the endpoint
+on its own with per-call retries (the old behaviour) or goes through
+InferenceDispatcher.
+
+    python benchmarks/inference_dispatcher.py --sessions 200 --prompts 5 --loading-seconds 2 --max-rps 4
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from stub_inference_server import ANSWER, UpstreamState, make_handler  # noqa: E402
+from utils import http_client  # noqa: E402
+from utils.inference_dispatcher import BACKGROUND, INTERACTIVE, InferenceDispatcher  # noqa: E402
+
+
+def start_stub(args):
+    state = UpstreamState(args.loading_seconds, args.max_rps)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(ANSWER, args.token_delay, args.first_token_delay, state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}/models/stub"
+
+
+def independent_call(url, payload):
+    """One session on its own: retry 429/503 with its own jittered sleep"""
+    for attempt in range(4):
+        response = http_client.post(url, upstream="huggingface", json=payload)
+        if response.status_code not in (429, 503) or attempt == 3:
+            return response.status_code == 200
+        time.sleep(random.uniform(0, min(30.0, 1.0 * 2 ** attempt)))
+
+
+def run(mode, args):
+    server, state, url = start_stub(args)
+    dispatcher = InferenceDispatcher(rate=args.max_rps, burst=max(1, int(args.max_rps)), max_attempts=8)
+    rng = random.Random(args.seed)
+    # Skewed popularity, like a trending city
+    weights = [1 / (rank + 1) for rank in range(args.prompts)]
+    jobs = [(rng.choices(range(args.prompts), weights)[0], rng.random() < args.background_share) for _ in range(args.sessions)]
+
+    def session(job):
+        prompt_id, background = job
+        payload = {"inputs": f"prompt {prompt_id}", "parameters": {"max_new_tokens": 500}}
+        start = time.perf_counter()
+        try:
+            if mode == "dispatcher":
+                dispatcher.generate(url, {}, payload, priority=BACKGROUND if background else INTERACTIVE)
+                ok = True
+            else:
+                ok = independent_call(url, payload)
+        except Exception:
+            ok = False
+        return background, ok, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        results = list(pool.map(session, jobs))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    interactive = sorted(seconds for background, ok, seconds in results if not background and ok)
+
+    def percentile(p):
+        return interactive[min(len(interactive) - 1, int(p * len(interactive)))] * 1000 if interactive else float("nan")
+
+    ok_count = sum(ok for _, ok, _ in results)
+    print(f"{mode:12s} {ok_count}/{len(results)} ok in {elapsed:5.2f} s ({ok_count / elapsed:6.1f} answers/s)  "
+          f"upstream {state.counts['requests']} (503 {state.counts['503']}, 429 {state.counts['429']})  "
+          f"interactive p50 {percentile(0.5):7.0f} ms  p95 {percentile(0.95):7.0f} ms  p99 {percentile(0.99):7.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--prompts", type=int, default=5, help="distinct prompts across all sessions")
+    parser.add_argument("--background-share", type=float, default=0.3, help="share of speculative requests")
+    parser.add_argument("--loading-seconds", type=float, default=2.0)
+    parser.add_argument("--max-rps", type=float, default=4.0)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for mode in ("independent", "dispatcher"):
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Headless per-page benchmark against recorded upstream fixtures.
+
+Starts ``stub_upstream`` on a free port, points every upstream URL at it,
+then drives each page function with Streamlit's AppTest: one load, one
+first interaction (cold caches) and ``--reruns`` repeated interactions
+(warm caches). For every page it reports rerun latency, HTTP calls per
+upstream route, errors and peak RSS, plus the hit rates of the shared
+caches, and writes everything to a JSON file for comparison between
+commits.
+
+    python benchmarks/page_suite.py --reruns 5 --latency-ms 50 --output bench.json
+    python benchmarks/page_suite.py --baseline bench.json --output bench-new.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import stub_upstream
+from chart_render import rss_mb
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def _type(label, value):
+    return lambda at: getattr(at, label)[0].input(value)
+
+
+def _click(at, label):
+    next(button for button in at.button if button.label == label).click()
+
+
+SCENARIOS = [
+    {"page": "home", "function": "home", "interact": None},
+    {"page": "currency_converter", "function": "currency_converter",
+     "interact": lambda at: at.slider[0].set_value(90)},
+    {"page": "destination_info", "function": "destination_info", "interact": _type("text_input", "Paris")},
+    {"page": "travel_planner", "function": "travel_planner", "interact": _type("text_input", "Paris, Rome, Tokyo")},
+    {"page": "ai_assistant", "function": "ai_assistant",
+     "interact": lambda at: (_type("text_area", "What should I pack for a winter trip to Norway?")(at), _click(at, "Get AI Recommendation"))},
+    {"page": "translator", "function": "language_translator",
+     "interact": lambda at: (_type("text_area", "Where is the train station? How much is a ticket to the airport?")(at), _click(at, "Translate"))},
+    {"page": "budget_planner", "function": "budget_planner",
+     "interact": lambda at: (_type("text_input", "Rome")(at), at.number_input(key="budget_Food").set_value(300.0))},
+]
+
+
+class RssSampler:
+    """Polls RSS in the background and keeps the peak since the last reset"""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = rss_mb()
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def reset(self):
+        self.peak = rss_mb()
+
+    def stop(self):
+        self._stop.set()
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else None
+
+
+def cache_stats():
+    """Hit rates of the process-wide caches the pages went through"""
+    from utils.chart_cache import get_chart_cache
+    from utils.inference_dispatcher import get_inference_dispatcher
+    from utils.response_cache import get_response_cache
+    from utils.semantic_cache import get_semantic_cache
+    from utils.shared_cache import get_shared_cache
+    from utils.translation_memory import get_translation_memory
+    from utils.travel_api import get_travel_client
+
+    return {
+        "ai_responses": get_response_cache().stats(),
+        "ai_semantic": get_semantic_cache().stats(),
+        "charts": get_chart_cache().stats(),
+        "translation_memory": get_translation_memory().stats(),
+        "inference_dispatcher": get_inference_dispatcher().stats(),
+        "travel_pages": get_travel_client().stats(),
+        "shared": get_shared_cache().stats(),
+    }
+
+
+def run_scenario(scenario, reruns, timeout, state, sampler):
+    from streamlit.testing.v1 import AppTest
+
+    from utils import http_client
+
+    script = (
+        f"import sys, importlib\nsys.path.insert(0, {os.path.abspath(SRC_DIR)!r})\n"
+        f"importlib.import_module('pages.{scenario['page']}').{scenario['function']}()"
+    )
+    http_client.reset_metrics()
+    state.reset()
+    sampler.reset()
+    at = AppTest.from_string(script, default_timeout=timeout)
+
+    def timed_run(interact):
+        if interact is not None:
+            interact(at)
+        start = time.perf_counter()
+        at.run()
+        return (time.perf_counter() - start) * 1000
+
+    load_ms = timed_run(None)
+    first_ms = timed_run(scenario["interact"])
+    warm_ms = [timed_run(scenario["interact"]) for _ in range(reruns)]
+
+    upstream = state.snapshot()
+    return {
+        "load_ms": load_ms,
+        "first_interaction_ms": first_ms,
+        "warm_p50_ms": percentile(warm_ms, 0.5),
+        "warm_p95_ms": percentile(warm_ms, 0.95),
+        "warm_ms": warm_ms,
+        "http_calls": sum(count for route, count in upstream.items() if not route.endswith(":error")),
+        "http_calls_by_route": upstream,
+        "http_client": http_client.get_metrics(),
+        "exceptions": [str(exception.value) for exception in at.exception],
+        "errors": [str(error.value) for error in at.error],
+        "peak_rss_mb": sampler.peak,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold):
+    """Print warm-rerun latency changes per page; return the pages that regressed beyond ``threshold``"""
+    regressions = []
+    for page, result in current["pages"].items():
+        before = baseline.get("pages", {}).get(page)
+        if not before or not before.get("warm_p50_ms"):
+            continue
+        change = result["warm_p50_ms"] / before["warm_p50_ms"] - 1
+        calls = result["http_calls"] - before["http_calls"]
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{page:20s} warm p50 {before['warm_p50_ms']:8.1f} -> {result['warm_p50_ms']:8.1f} ms ({change:+.0%})  "
+              f"http calls {calls:+d}{flag}")
+        if change > threshold:
+            regressions.append(page)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=5, help="warm reruns per page")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latency injected on every upstream response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of upstream requests answered with 503")
+    parser.add_argument("--pages", nargs="*", help="only run these pages")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per script run")
+    parser.add_argument("--output", default="page_suite.json")
+    parser.add_argument("--baseline", help="earlier output file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    server, state, base_url = stub_upstream.start(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    cache_dir = tempfile.mkdtemp(prefix="travel-buddy-bench-")
+    # Must be set before anything imports config.settings
+    os.environ.update(stub_upstream.env_for(base_url))
+    os.environ.update({
+        "HUGGINGFACE_API_KEY": "bench", "WEATHER_API_KEY": "bench", "TRAVEL_API_KEY": "bench",
+        "CACHE_DIR": cache_dir, "RATES_REFRESH_SECONDS": "0", "RATES_UI_REFRESH_SECONDS": "0",
+        "HF_RATE_LIMIT_PER_SECOND": "0",
+    })
+    sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+    sampler = RssSampler()
+    pages = {}
+    for scenario in SCENARIOS:
+        if args.pages and scenario["page"] not in args.pages:
+            continue
+        result = pages[scenario["page"]] = run_scenario(scenario, args.reruns, args.timeout, state, sampler)
+        print(f"{scenario['page']:20s} load {result['load_ms']:8.1f} ms  first {result['first_interaction_ms']:8.1f} ms  "
+              f"warm p50 {result['warm_p50_ms']:8.1f} ms  http {result['http_calls']:3d}  "
+              f"peak RSS {result['peak_rss_mb']:6.1f} MB" + (f"  EXCEPTIONS {result['exceptions']}" if result["exceptions"] else ""))
+    sampler.stop()
+    server.shutdown()
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "settings": vars(args),
+        "pages": pages,
+        "caches": cache_stats(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2 ** 20 if sys.platform == "darwin" else 2 ** 10),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            sys.exit(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
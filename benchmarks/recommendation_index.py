@@ -0,0 +1,86 @@
+"""Recall@k and query latency of DestinationIndex against brute force.
+
+Generates synthetic destinations spread uniformly over the sphere (so the
+poles and the antimeridian are covered) and compares the haversine index,
+the old Euclidean lat/lon NearestNeighbors model, and an exact brute-force
+haversine scan.
+
+    python benchmarks/recommendation_index.py --points 100000 --queries 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from models.recommendation_model import DestinationIndex, haversine_km  # noqa: E402
+
+
+def random_locations(n, rng):
+    """Uniform (latitude, longitude) samples on the sphere, in degrees"""
+    latitudes = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    longitudes = rng.uniform(-180, 180, n)
+    return np.column_stack([latitudes, longitudes])
+
+
+def recall(found, expected):
+    return np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    points = random_locations(args.points, rng)
+    queries = random_locations(args.queries, rng)
+
+    # Exact answer, in chunks to keep the distance matrix small
+    def brute_force():
+        ids = []
+        radians = np.radians(points)
+        for chunk in np.array_split(np.radians(queries), max(1, args.queries // 100)):
+            ids.append(np.argsort(haversine_km(chunk, radians), axis=1)[:, :args.k])
+        return np.vstack(ids)
+
+    expected, brute_seconds = timed(brute_force)
+    index, build_seconds = timed(lambda: DestinationIndex(points[:, 0], points[:, 1]))
+    (_, found), index_seconds = timed(lambda: index.query(queries, k=args.k))
+    euclidean = NearestNeighbors(n_neighbors=args.k).fit(points)
+    (_, euclidean_found), euclidean_seconds = timed(lambda: euclidean.kneighbors(queries))
+
+    # Incremental updates: 1% inserts and 1% deletes, no refit
+    updates = max(1, args.points // 100)
+    new_points = random_locations(updates, rng)
+
+    def churn():
+        for i, (lat, lon) in enumerate(new_points):
+            index.insert(args.points + i, lat, lon)
+        for point_id in rng.choice(args.points, updates, replace=False):
+            index.delete(int(point_id))
+
+    _, churn_seconds = timed(churn)
+
+    print(f"{args.points} points, {args.queries} queries, k={args.k}")
+    print(f"brute force haversine : {brute_seconds * 1000 / args.queries:8.3f} ms/query  recall@k 1.000")
+    print(f"DestinationIndex      : {index_seconds * 1000 / args.queries:8.3f} ms/query  recall@k {recall(found, expected):.3f}  (build {build_seconds:.2f} s)")
+    print(f"euclidean lat/lon kNN : {euclidean_seconds * 1000 / args.queries:8.3f} ms/query  recall@k {recall(euclidean_found, expected):.3f}")
+    print(f"{updates} inserts + {updates} deletes: {churn_seconds * 1000:.1f} ms total")
+
+
+if __name__ == "__main__":
+    main()
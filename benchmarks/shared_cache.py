@@ -0,0 +1,79 @@
+"""Upstream calls made by several worker processes, per shared cache backend.
+
+Starts ``stub_upstream`` and the ``stub_redis`` stand-in, then for each
+backend launches ``--workers`` processes that, like separate Streamlit
+servers on one host, each load the latest rates, current weather for a
+few cities and one AI answer. Workers on the ``memory`` backend share
+nothing; on ``sqlite`` and ``redis`` the host should fetch each item once.
+
+    python benchmarks/shared_cache.py --workers 4 --latency-ms 50
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import stub_redis
+import stub_upstream
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+CITIES = ["Paris", "Rome", "Tokyo"]
+PROMPT = "What should I pack for a winter trip to Norway?"
+
+
+def worker(start, weather_start):
+    sys.path.insert(0, os.path.abspath(SRC_DIR))
+    from utils.ai_service import get_ai_recommendation
+    from utils.rate_store import get_rate_store
+    from utils.weather_api import get_weather_batch
+
+    start.wait()
+    get_rate_store().snapshot()
+    get_ai_recommendation(PROMPT)
+    weather_start.wait()
+    get_weather_batch(CITIES)
+
+
+def run(backend, workers, base_url, redis_url, state):
+    os.environ.update({
+        "SHARED_CACHE_BACKEND": backend, "SHARED_CACHE_REDIS_URL": redis_url,
+        "CACHE_DIR": tempfile.mkdtemp(prefix=f"shared-cache-{backend}-"),
+    })
+    state.reset()
+    context = multiprocessing.get_context("spawn")
+    start, weather_start = context.Barrier(workers), context.Barrier(workers)
+    processes = [context.Process(target=worker, args=(start, weather_start)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    calls = {route: count for route, count in sorted(state.snapshot().items()) if not route.endswith(":error")}
+    print(f"{backend:8s} {sum(calls.values()):4d} upstream calls  {calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--backends", nargs="*", default=["memory", "sqlite", "redis"])
+    args = parser.parse_args()
+
+    server, state, base_url = stub_upstream.start(latency_ms=args.latency_ms)
+    redis_server, _, redis_url = stub_redis.start()
+    os.environ.update(stub_upstream.env_for(base_url))
+    os.environ.update({
+        "HUGGINGFACE_API_KEY": "bench", "WEATHER_API_KEY": "bench", "HF_RATE_LIMIT_PER_SECOND": "0",
+        "RATES_REFRESH_SECONDS": "0",
+    })
+
+    for backend in args.backends:
+        run(backend, args.workers, base_url, redis_url, state)
+
+    redis_server.shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Local stand-in for the Hugging Face text-generation endpoint.
+
+Serves both plain JSON answers and the server-sent token stream used by
+``stream_ai_recommendation``, with a configurable delay per token. It can
+also answer 503 "model loading" for its first seconds and 429 above a
+request rate, like the hosted endpoint.
+
+    python benchmarks/stub_inference_server.py --port 8765 --token-delay 0.05
+    python benchmarks/stub_inference_server.py --loading-seconds 5 --max-rps 2
+    HF_INFERENCE_URL=http://127.0.0.1:8765/models/stub streamlit run src/app.py
+"""
+import argparse
+import collections
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = "Pack light layers, comfortable shoes and a rain jacket. Check local transit passes before you go."
+
+
+class UpstreamState:
+    """Simulated load state shared by every handler thread, plus counters"""
+
+    def __init__(self, loading_seconds=0.0, max_rps=0.0):
+        self.ready_at = time.monotonic() + loading_seconds
+        self.max_rps = max_rps
+        self.recent = collections.deque()
+        self.lock = threading.Lock()
+        self.counts = collections.Counter()
+
+    def admit(self):
+        """Return ``(status, headers, body)`` for a refused request, or None"""
+        now = time.monotonic()
+        with self.lock:
+            self.counts["requests"] += 1
+            if now < self.ready_at:
+                self.counts["503"] += 1
+                return 503, {}, {"error": "Model stub is currently loading", "estimated_time": round(self.ready_at - now, 2)}
+            while self.recent and now - self.recent[0] > 1.0:
+                self.recent.popleft()
+            if self.max_rps and len(self.recent) >= self.max_rps:
+                self.counts["429"] += 1
+                return 429, {"Retry-After": "1"}, {"error": "Rate limit reached"}
+            self.recent.append(now)
+            self.counts["200"] += 1
+            return None
+
+
+def make_handler(answer, token_delay, first_token_delay, state=None):
+    state = state or UpstreamState()
+
+    class InferenceHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+
+            refused = state.admit()
+            if refused is not None:
+                status, headers, error = refused
+                body = json.dumps(error).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            if not payload.get("stream"):
+                time.sleep(first_token_delay + token_delay * len(answer.split()))
+                body = json.dumps([{"generated_text": answer}]).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            time.sleep(first_token_delay)
+            words = answer.split(" ")
+            for i, word in enumerate(words):
+                text = word if i == 0 else f" {word}"
+                event = {"token": {"id": i, "text": text, "special": False}, "generated_text": None}
+                if i == len(words) - 1:
+                    event["generated_text"] = answer
+                self.wfile.write(f"data:{json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(token_delay)
+
+        def log_message(self, format, *args):
+            pass
+
+    return InferenceHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-delay", type=float, default=0.05, help="seconds between streamed tokens")
+    parser.add_argument("--first-token-delay", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--loading-seconds", type=float, default=0.0, help="answer 503 for this long after start")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="answer 429 above this many requests per second")
+    args = parser.parse_args()
+
+    state = UpstreamState(args.loading_seconds, args.max_rps)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(ANSWER, args.token_delay, args.first_token_delay, state))
+    print(f"Stub inference server on http://127.0.0.1:{args.port}/models/stub")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
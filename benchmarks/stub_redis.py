@@ -0,0 +1,147 @@
+"""Local stand-in for Redis, enough for the shared cache's RESP backend.
+
+Speaks RESP2 and implements PING, AUTH, SELECT, GET, SET (EX / PX / NX),
+DEL, EXISTS, FLUSHDB and DBSIZE, with expiry, for one process. EVAL runs
+only the shared cache's compare-and-delete script:
+
+    python benchmarks/stub_redis.py --port 6390
+    SHARED_CACHE_BACKEND=redis SHARED_CACHE_REDIS_URL=redis://127.0.0.1:6390/0 streamlit run src/app.py
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+# utils.shared_cache.DELETE_IF_SCRIPT, the one script EVAL understands
+DELETE_IF_SCRIPT = b'if redis.call("GET", KEYS[1]) == ARGV[1] then return redis.call("DEL", KEYS[1]) end return 0'
+
+
+class RedisState:
+    """Keyspaces by database number, shared by connection threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.databases = {}
+        self.commands = 0
+
+    def keyspace(self, database):
+        return self.databases.setdefault(database, {})
+
+
+def _bulk(value):
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _error(message):
+    return b"-ERR %s\r\n" % message.encode("utf-8")
+
+
+def execute(state, session, args):
+    """Run one command and return the encoded reply"""
+    name = args[0].decode("utf-8").upper()
+    now = time.time()
+    with state.lock:
+        state.commands += 1
+        keys = state.keyspace(session["database"])
+
+        def live(key):
+            entry = keys.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= now:
+                del keys[key]
+                return None
+            return entry
+
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name == "AUTH":
+            return b"+OK\r\n"
+        if name == "SELECT":
+            session["database"] = int(args[1])
+            return b"+OK\r\n"
+        if name == "GET":
+            entry = live(args[1])
+            return _bulk(entry[0] if entry else None)
+        if name == "SET":
+            expires, only_new = None, False
+            options = [arg.decode("utf-8").upper() for arg in args[3:]]
+            for i, option in enumerate(options):
+                if option == "EX":
+                    expires = now + int(options[i + 1])
+                elif option == "PX":
+                    expires = now + int(options[i + 1]) / 1000
+                elif option == "NX":
+                    only_new = True
+            if only_new and live(args[1]) is not None:
+                return b"$-1\r\n"
+            keys[args[1]] = (args[2], expires)
+            return b"+OK\r\n"
+        if name in ("DEL", "EXISTS"):
+            found = [key for key in args[1:] if live(key) is not None]
+            if name == "DEL":
+                for key in found:
+                    del keys[key]
+            return b":%d\r\n" % len(found)
+        if name == "EVAL":
+            if args[1] != DELETE_IF_SCRIPT or args[2] != b"1":
+                return _error("only the compare-and-delete script is supported")
+            entry = live(args[3])
+            if entry is None or entry[0] != args[4]:
+                return b":0\r\n"
+            del keys[args[3]]
+            return b":1\r\n"
+        if name == "FLUSHDB":
+            keys.clear()
+            return b"+OK\r\n"
+        if name == "DBSIZE":
+            return b":%d\r\n" % sum(1 for key in list(keys) if live(key) is not None)
+    return _error(f"unknown command '{name}'")
+
+
+def make_handler(state):
+    class RedisHandler(socketserver.StreamRequestHandler):
+        def _read_command(self):
+            line = self.rfile.readline()
+            if not line:
+                return None
+            count = int(line[1:-2])
+            args = []
+            for _ in range(count):
+                length = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(length + 2)[:-2])
+            return args
+
+        def handle(self):
+            session = {"database": 0}
+            while True:
+                args = self._read_command()
+                if args is None:
+                    return
+                self.wfile.write(execute(state, session, args))
+
+    return RedisHandler
+
+
+def start(port=0):
+    """Start the stand-in on a background thread; returns ``(server, state, url)``"""
+    state = RedisState()
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-redis", daemon=True).start()
+    return server, state, f"redis://127.0.0.1:{server.server_address[1]}/0"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    server, _, url = start(args.port)
+    print(f"Redis stand-in on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
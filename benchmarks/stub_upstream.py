@@ -0,0 +1,258 @@
+"""Local replay server for every upstream the app calls.
+
+Serves the recorded responses in ``benchmarks/fixtures`` for the exchange
+rate API, OpenWeatherMap, the Hugging Face inference endpoint (JSON and
+server-sent token stream) and the travel API, with injectable latency and
+errors. Travel lists are paginated with ``page`` / ``per_page`` and carry an
+ETag and Last-Modified, so conditional requests get a 304. Point the app at it with:
+
+    python benchmarks/stub_upstream.py --port 8766 --latency-ms 80 --error-rate 0.05
+    EXCHANGE_RATE_API_URL=http://127.0.0.1:8766/v6 WEATHER_API_URL=http://127.0.0.1:8766/data/2.5 \\
+    HF_INFERENCE_URL=http://127.0.0.1:8766/models/stub TRAVEL_API_URL=http://127.0.0.1:8766 streamlit run src/app.py
+"""
+import argparse
+import collections
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_NUMBERED_LINE = re.compile(r"^(\d+)\. (.*)$")
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    fixtures = {}
+    for name in os.listdir(directory):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                fixtures[name[:-len(".json")]] = json.load(f)
+    return fixtures
+
+
+def env_for(base_url):
+    """Environment variables that point the app's upstream URLs at a stub on ``base_url``"""
+    return {
+        "EXCHANGE_RATE_API_URL": f"{base_url}/v6",
+        "WEATHER_API_URL": f"{base_url}/data/2.5",
+        "HF_INFERENCE_URL": f"{base_url}/models/stub",
+        "TRAVEL_API_URL": base_url,
+    }
+
+
+class StubState:
+    """Injection settings and per-route request counters, shared by handler threads"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = collections.Counter()
+        self.forced = collections.defaultdict(list)
+
+    def fail_next(self, route, times=1, status=503):
+        """Answer the next ``times`` requests to ``route`` with ``status``, whatever the error rate"""
+        with self.lock:
+            self.forced[route].extend([status] * times)
+
+    def begin(self, route):
+        """Count the request, sleep the injected latency and return the status to fail with, if any"""
+        with self.lock:
+            self.counts[route] += 1
+            delay = max(0.0, self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            if self.forced[route]:
+                fail = self.forced[route].pop(0)
+            else:
+                fail = 503 if self.random.random() < self.error_rate else None
+            if fail:
+                self.counts[f"{route}:error"] += 1
+        time.sleep(delay)
+        return fail
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+            self.forced.clear()
+
+
+def historical_rates(latest, date_str):
+    """Deterministic per-day variation of the latest rates, so history charts are not flat"""
+    seed = int(hashlib.sha256(date_str.encode("ascii")).hexdigest()[:8], 16)
+    drift = 1 + ((seed % 2001) - 1000) / 50_000
+    rates = {code: 1.0 if code == "USD" else round(rate * drift, 6) for code, rate in latest["rates"].items()}
+    return {**latest, "rates": rates}
+
+
+def generated_text(fixtures, prompt):
+    """Fixture answer, or a line-by-line "translation" for numbered translation prompts"""
+    lines = [_NUMBERED_LINE.match(line) for line in prompt.splitlines()]
+    lines = [match for match in lines if match]
+    if "numbered line" in prompt and lines:
+        return "\n".join(f"{match.group(1)}. [translated] {match.group(2)}" for match in lines)
+    return fixtures["inference"]["answer"]
+
+
+def make_handler(fixtures, state):
+    weather_by_id = {city["id"]: city for city in fixtures["weather"]["cities"]}
+    weather_by_name = {city["name"].casefold(): city for city in fixtures["weather"]["cities"]}
+    token_delay = fixtures["inference"].get("token_delay_seconds", 0.0)
+    last_modified = formatdate(usegmt=True)
+
+    class UpstreamHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, body, headers=None):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_travel_page(self, resource, query):
+            """One page of a travel list, with validators; 304 when the client's copy is current"""
+            items = fixtures["travel"].get(resource, [])
+            page = int(query.get("page", 1))
+            per_page = int(query.get("per_page", len(items) or 1))
+            start = (page - 1) * per_page
+            body = {"results": items[start:start + per_page], "page": page, "next": None}
+            if start + per_page < len(items):
+                body["next"] = "?" + urlencode({**query, "page": page + 1})
+            etag = '"%s"' % hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+            validators = {"ETag": etag, "Last-Modified": last_modified}
+
+            if self.headers.get("If-None-Match") == etag or (
+                "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == last_modified
+            ):
+                self.send_response(304)
+                for name, value in validators.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self._send_json(200, body, validators)
+
+        def _fail(self, route, status=503):
+            if route.startswith("huggingface") and status == 503:
+                self._send_json(503, {"error": "Model stub is currently loading", "estimated_time": 0.2})
+            elif status == 404:
+                self._send_json(404, {"error": "not found"})
+            else:
+                self._send_json(status, {"error": "Service unavailable"})
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            parts = [part for part in url.path.split("/") if part]
+
+            if parts[:2] == ["v6", "latest"]:
+                route, body = "exchange_rates:latest", (200, fixtures["exchange_rates_latest"])
+            elif parts[:2] == ["v6", "historical"] and len(parts) == 3:
+                route, body = "exchange_rates:historical", (200, historical_rates(fixtures["exchange_rates_latest"], parts[2]))
+            elif parts[-1:] == ["weather"]:
+                route = "weather:weather"
+                if "id" in query:
+                    city = weather_by_id.get(int(query["id"]))
+                else:
+                    city = weather_by_name.get(query.get("q", "").split(",")[0].strip().casefold())
+                body = (200, city) if city else (404, fixtures["weather"]["not_found"])
+            elif parts[-1:] == ["group"]:
+                route = "weather:group"
+                cities = [weather_by_id[int(city_id)] for city_id in query.get("id", "").split(",") if int(city_id) in weather_by_id]
+                body = (200, {"cnt": len(cities), "list": cities})
+            elif parts and parts[0] in ("destinations", "accommodations", "travel_tips", "itineraries"):
+                route = f"travel:{parts[0]}"
+                status = state.begin(route)
+                if status:
+                    self._fail(route, status)
+                else:
+                    self._send_travel_page(parts[0], query)
+                return
+            else:
+                route, body = "unknown", (404, {"error": "not found"})
+
+            status = state.begin(route)
+            if status:
+                self._fail(route, status)
+            else:
+                self._send_json(*body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            stream = bool(payload.get("stream"))
+            route = "huggingface:generate_stream" if stream else "huggingface:generate"
+            status = state.begin(route)
+            if status:
+                self._fail(route, status)
+                return
+
+            answer = generated_text(fixtures, payload.get("inputs", ""))
+            if not stream:
+                self._send_json(200, [{"generated_text": answer}])
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            words = answer.split(" ")
+            for i, word in enumerate(words):
+                event = {"token": {"id": i, "text": word if i == 0 else f" {word}", "special": False},
+                         "generated_text": answer if i == len(words) - 1 else None}
+                self.wfile.write(f"data:{json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(token_delay)
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return UpstreamHandler
+
+
+def start(port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0, fixtures_dir=FIXTURES_DIR):
+    """Start the stub on a background thread; returns ``(server, state, base_url)``"""
+    state = StubState(latency_ms, jitter_ms, error_rate, seed)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(load_fixtures(fixtures_dir), state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-upstream", daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform +/- jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    server, _, base_url = start(args.port, args.latency_ms, args.jitter_ms, args.error_rate, fixtures_dir=args.fixtures)
+    print(f"Stub upstreams on {base_url}")
+    for name, value in env_for(base_url).items():
+        print(f"  {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Travel API client against the local stub: memory and requests per pass.
+
+Serves a generated accommodation list of ``--items`` entries from
+``stub_upstream`` and reads it three ways: one ``requests`` download parsed
+with ``json.loads`` (the old client), the paginated streaming client on a
+cold cache, and the same client again once pages are due for
+revalidation (ETag -> 304). Reports wall time, the client's request
+counters and the peak Python heap of each pass.
+
+    python benchmarks/travel_client.py --items 50000 --page-size 1000
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import stub_upstream
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def make_fixtures(items):
+    """Copy of the recorded fixtures with ``items`` generated accommodations"""
+    directory = tempfile.mkdtemp(prefix="travel-fixtures-")
+    for name in os.listdir(stub_upstream.FIXTURES_DIR):
+        shutil.copy(os.path.join(stub_upstream.FIXTURES_DIR, name), directory)
+    path = os.path.join(directory, "travel.json")
+    with open(path, encoding="utf-8") as f:
+        travel = json.load(f)
+    travel["accommodations"] = [
+        {"id": i, "name": f"Guesthouse {i}", "type": ("hotel", "hostel", "apartment")[i % 3],
+         "price_per_night": 40 + i % 300, "currency": "EUR", "rating": round(3 + (i % 20) / 10, 1),
+         "description": "Quiet rooms close to the old town, breakfast included, late check-in on request."}
+        for i in range(items)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(travel, f)
+    return directory
+
+
+def start_stub(fixtures, latency_ms):
+    """Run the stub in its own process so its memory is not counted"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, stub_upstream.__file__, "--port", str(port), "--fixtures", fixtures, "--latency-ms", str(latency_ms)],
+        stdout=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def measure(label, read):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = read()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    print(f"{label:28s} {count:7d} items  {seconds * 1000:8.1f} ms  peak heap {peak:7.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--page-size", type=int, default=1_000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fixtures = make_fixtures(args.items)
+    process, base_url = start_stub(fixtures, args.latency_ms)
+    os.environ.update(stub_upstream.env_for(base_url))
+    os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="travel-bench-")
+    sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+    import requests
+
+    from utils.travel_api import TravelClient
+
+    def full_download():
+        return len(requests.get(f"{base_url}/accommodations", params={"destination": "Paris"}).json()["results"])
+
+    client = TravelClient(page_size=args.page_size, revalidate_after=0)
+
+    def streamed():
+        return sum(1 for _ in client.iter_items("accommodations", destination="Paris"))
+
+    measure("json.loads, one request", full_download)
+    measure("streamed pages, cold", streamed)
+    print(f"  requests: {client.stats()}")
+    measure("streamed pages, revalidated", streamed)
+    print(f"  requests: {client.stats()}")
+
+    process.terminate()
+    shutil.rmtree(fixtures)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,98 @@ class Config:
     CURRENCY_API_KEY = os.getenv("CURRENCY_API_KEY")
     TRAVEL_API_KEY = os.getenv("TRAVEL_API_KEY")
     AI_SERVICE_API_KEY = os.getenv("AI_SERVICE_API_KEY")
+    HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")
+    WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
 
     # Application settings
     DEBUG = os.getenv("DEBUG", "False") == "True"
     ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
+    # Instrumentation: span timings (on by default in debug), Prometheus export and the sampling profiler
+    TRACING = os.getenv("TRACING", str(DEBUG)) == "True"
+    METRICS_PATH = os.getenv("METRICS_PATH", "")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+    # Exchange rate settings
+    EXCHANGE_RATE_API_URL = os.getenv("EXCHANGE_RATE_API_URL", "https://open.er-api.com/v6")
+    RATES_TTL_SECONDS = int(os.getenv("RATES_TTL_SECONDS", "3600"))
+    RATES_RETRY_SECONDS = int(os.getenv("RATES_RETRY_SECONDS", "60"))
+    HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+    HISTORY_FETCH_WORKERS = int(os.getenv("HISTORY_FETCH_WORKERS", "8"))
+    FX_DEFAULT_SPREAD_BPS = float(os.getenv("FX_DEFAULT_SPREAD_BPS", "50"))
+    # Background refresh cadence (0 disables the scheduler) and days of history it keeps warm
+    RATES_REFRESH_SECONDS = int(os.getenv("RATES_REFRESH_SECONDS", "900"))
+    HISTORY_WARM_DAYS = int(os.getenv("HISTORY_WARM_DAYS", "30"))
+    # Seconds after start before the history is first warmed, so it does not compete with the first page render
+    HISTORY_WARM_DELAY_SECONDS = float(os.getenv("HISTORY_WARM_DELAY_SECONDS", "30"))
+    # How often an open Currency Exchange page re-reads the latest snapshot
+    RATES_UI_REFRESH_SECONDS = int(os.getenv("RATES_UI_REFRESH_SECONDS", "60"))
+
+    # Weather; city names are geocoded once, then current conditions are cached per city ID
+    WEATHER_API_URL = os.getenv("WEATHER_API_URL", "https://api.openweathermap.org/data/2.5")
+    WEATHER_TTL_SECONDS = int(os.getenv("WEATHER_TTL_SECONDS", "600"))
+    GEOCODE_TTL_SECONDS = int(os.getenv("GEOCODE_TTL_SECONDS", str(30 * 24 * 3600)))
+    GEOCODE_MISS_TTL_SECONDS = int(os.getenv("GEOCODE_MISS_TTL_SECONDS", "86400"))
+
+    # Travel content API; list pages are revalidated with ETag / Last-Modified once they are this old
+    TRAVEL_API_URL = os.getenv("TRAVEL_API_URL", "https://api.example.com")
+    TRAVEL_PAGE_SIZE = int(os.getenv("TRAVEL_PAGE_SIZE", "100"))
+    TRAVEL_REVALIDATE_SECONDS = int(os.getenv("TRAVEL_REVALIDATE_SECONDS", "300"))
+
+    # AI inference
+    HF_INFERENCE_URL = os.getenv("HF_INFERENCE_URL", "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2")
+
+    # Concurrent upstream calls issued while rendering a page
+    UPSTREAM_WORKERS = int(os.getenv("UPSTREAM_WORKERS", "16"))
+    # Characters of source text sent to the model per batched translation request
+    TRANSLATION_BATCH_CHARS = int(os.getenv("TRANSLATION_BATCH_CHARS", "1200"))
+    HF_RATE_LIMIT_PER_SECOND = float(os.getenv("HF_RATE_LIMIT_PER_SECOND", "2"))
+    HF_RATE_LIMIT_BURST = int(os.getenv("HF_RATE_LIMIT_BURST", "4"))
+    HF_MAX_ATTEMPTS = int(os.getenv("HF_MAX_ATTEMPTS", "4"))
+    UPSTREAM_CALL_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_CALL_TIMEOUT_SECONDS", "60"))
+
+    # Local transformers models
+    TEXT_GENERATION_MODEL = os.getenv("TEXT_GENERATION_MODEL", "gpt-3.5-turbo")
+    QA_MODEL = os.getenv("QA_MODEL", "distilbert-base-uncased-distilled-squad")
+    MODEL_MEMORY_BUDGET_MB = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "2048"))
+    MODEL_IDLE_SECONDS = int(os.getenv("MODEL_IDLE_SECONDS", "1800"))
+    MODEL_QUEUE_SIZE = int(os.getenv("MODEL_QUEUE_SIZE", "64"))
+    MODEL_QUEUE_TIMEOUT_SECONDS = float(os.getenv("MODEL_QUEUE_TIMEOUT_SECONDS", "5"))
+    MODEL_MAX_BATCH = int(os.getenv("MODEL_MAX_BATCH", "8"))
+    MODEL_BATCH_WAIT_MS = int(os.getenv("MODEL_BATCH_WAIT_MS", "20"))
+
+    # AI response cache
+    AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    AI_CACHE_MEMORY_ENTRIES = int(os.getenv("AI_CACHE_MEMORY_ENTRIES", "256"))
+    SEMANTIC_CACHE_ENTRIES = int(os.getenv("SEMANTIC_CACHE_ENTRIES", "1024"))
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.6"))
+    SEMANTIC_CACHE_POLICY = os.getenv("SEMANTIC_CACHE_POLICY", "lru")  # "lru" or "lfu"
+
+    # Rendered charts kept in memory, shared by all sessions
+    CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Local cache directory for data that is safe to keep between restarts
+    CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(__file__), "..", "..", ".cache"))
+
+    # Pregenerated Destination Info guides (see src/pregenerate_guides.py) and the search log that ranks them
+    GUIDE_BUNDLE_PATH = os.getenv("GUIDE_BUNDLE_PATH", os.path.join(CACHE_DIR, "destination_guides.bundle"))
+    GUIDE_BUNDLE_TOP = int(os.getenv("GUIDE_BUNDLE_TOP", "200"))
+    GUIDE_MAX_AGE_DAYS = float(os.getenv("GUIDE_MAX_AGE_DAYS", "30"))
+    DESTINATION_SEARCH_LOG = os.getenv("DESTINATION_SEARCH_LOG", os.path.join(CACHE_DIR, "destination_searches.log"))
+
+    # Cache for rates, weather and AI answers shared by the worker processes:
+    # "memory" (per process), "sqlite" (one WAL file in CACHE_DIR per host) or "redis"
+    SHARED_CACHE_BACKEND = os.getenv("SHARED_CACHE_BACKEND", "sqlite")
+    SHARED_CACHE_REDIS_URL = os.getenv("SHARED_CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+    SHARED_CACHE_RATES_MAX_BYTES = int(os.getenv("SHARED_CACHE_RATES_MAX_BYTES", str(2 * 1024 * 1024)))
+    SHARED_CACHE_WEATHER_MAX_BYTES = int(os.getenv("SHARED_CACHE_WEATHER_MAX_BYTES", str(16 * 1024 * 1024)))
+    SHARED_CACHE_AI_MAX_BYTES = int(os.getenv("SHARED_CACHE_AI_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # Country metadata; supported currencies come from this file via utils.country_data
+    COUNTRY_DATA_PATH = os.getenv("COUNTRY_DATA_PATH", os.path.join(os.path.dirname(__file__), "..", "..", "data", "country_info.json"))
+
     # Other settings
     DEFAULT_CURRENCY = "USD"
-    SUPPORTED_CURRENCIES = ["USD", "EUR", "GBP", "JPY", "AUD", "CAD"]
-    DEFAULT_DESTINATION = "Paris"
\ No newline at end of file
+    DEFAULT_DESTINATION = "Paris"
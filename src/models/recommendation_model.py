@@ -1,28 +1,168 @@
-from sklearn.neighbors import NearestNeighbors
+import pickle
+
+from sklearn.neighbors import BallTree
 import pandas as pd
 import numpy as np
 
+from utils.country_data import CountryIndex, get_country_index, load_records
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(points, targets):
+    """Great-circle distances (km) between every row of ``points`` and ``targets``.
+
+    Both arguments are ``(n, 2)`` arrays of (latitude, longitude) in radians;
+    the result has shape ``(len(points), len(targets))``.
+    """
+    lat1, lon1 = points[:, :1], points[:, 1:]
+    lat2, lon2 = targets[:, 0], targets[:, 1]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class DestinationIndex:
+    """Nearest-destination index on the sphere.
+
+    A haversine ``BallTree`` holds the bulk of the points. Inserts go to a
+    small brute-force buffer and deletes are tombstoned, so updates never
+    refit the tree; it is rebuilt once the buffer plus tombstones exceed
+    ``rebuild_fraction`` of the indexed points.
+    """
+
+    def __init__(self, latitudes, longitudes, ids=None, rebuild_fraction=0.1, leaf_size=40):
+        coords = np.radians(np.column_stack([latitudes, longitudes]).astype(float))
+        self.rebuild_fraction = rebuild_fraction
+        self.leaf_size = leaf_size
+        self._build(coords, np.asarray(ids if ids is not None else np.arange(len(coords))))
+
+    def _build(self, coords, ids):
+        self._coords = coords
+        self._ids = ids
+        self._positions = {point_id: i for i, point_id in enumerate(ids)}
+        self._alive = np.ones(len(ids), dtype=bool)
+        self._tree = BallTree(coords, leaf_size=self.leaf_size, metric="haversine") if len(coords) else None
+        self._pending = {}
+
+    def __len__(self):
+        return int(self._alive.sum()) + len(self._pending)
+
+    def insert(self, point_id, latitude, longitude):
+        """Add or move one destination without refitting the tree"""
+        self.delete(point_id)
+        self._pending[point_id] = np.radians([latitude, longitude])
+        self._maybe_rebuild()
+
+    def delete(self, point_id):
+        if self._pending.pop(point_id, None) is not None:
+            return
+        position = self._positions.get(point_id)
+        if position is not None and self._alive[position]:
+            self._alive[position] = False
+            self._maybe_rebuild()
+
+    def _maybe_rebuild(self):
+        churn = len(self._pending) + int((~self._alive).sum())
+        if churn > max(self.rebuild_fraction * len(self._ids), 32):
+            self.rebuild()
+
+    def rebuild(self):
+        """Fold pending inserts and deletes into a fresh tree"""
+        coords, ids = self._coords[self._alive], self._ids[self._alive]
+        if self._pending:
+            pending_ids = np.empty(len(self._pending), dtype=object)
+            pending_ids[:] = list(self._pending)
+            coords = np.vstack([coords, np.array(list(self._pending.values()))])
+            ids = np.concatenate([ids.astype(object), pending_ids])
+        self._build(coords, ids)
+
+    def query(self, locations, k=5):
+        """Return ``(distances_km, ids)`` of the ``k`` nearest destinations.
+
+        ``locations`` is one (latitude, longitude) pair or an ``(m, 2)`` array
+        of them in degrees; results have shape ``(m, k)``.
+        """
+        points = np.radians(np.atleast_2d(np.asarray(locations, dtype=float)))
+        k = min(k, len(self))
+        candidates_d, candidates_id = [], []
+
+        if self._tree is not None:
+            # Ask for extra neighbours so tombstoned points can be filtered out
+            dead = int((~self._alive).sum())
+            tree_k = min(k + dead, len(self._ids))
+            distances, positions = self._tree.query(points, k=tree_k)
+            distances = distances * EARTH_RADIUS_KM
+            distances[~self._alive[positions]] = np.inf
+            candidates_d.append(distances)
+            candidates_id.append(self._ids[positions])
+
+        if self._pending:
+            pending_ids = np.empty(len(self._pending), dtype=object)
+            pending_ids[:] = list(self._pending)
+            candidates_d.append(haversine_km(points, np.array(list(self._pending.values()))))
+            candidates_id.append(np.broadcast_to(pending_ids, (len(points), len(pending_ids))))
+
+        distances = np.hstack(candidates_d)
+        ids = np.hstack([c.astype(object) for c in candidates_id]) if len(candidates_id) > 1 else candidates_id[0]
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
 class RecommendationModel:
-    def __init__(self, data):
+    def __init__(self, data, index=None):
         self.data = data
-        self.model = NearestNeighbors(n_neighbors=5, algorithm='auto')
-        self.model.fit(self.data[['latitude', 'longitude']])
+        self.index = index if index is not None else DestinationIndex(data['latitude'], data['longitude'], ids=data.index)
 
     def get_recommendations(self, user_location, num_recommendations=5):
-        distances, indices = self.model.kneighbors([user_location])
-        recommended_destinations = self.data.iloc[indices[0]]
+        distances, ids = self.index.query([user_location], k=num_recommendations)
+        recommended_destinations = self.data.loc[ids[0]]
         return recommended_destinations
 
-def load_country_data(file_path):
-    country_data = pd.read_json(file_path)
-    return country_data
+    def get_batch_recommendations(self, user_locations, num_recommendations=5):
+        """Recommend destinations for many users in one vectorized query"""
+        distances, ids = self.index.query(user_locations, k=num_recommendations)
+        return [self.data.loc[row] for row in ids]
+
+    def add_destination(self, label, destination):
+        """Add or replace one destination row (needs ``latitude``/``longitude``)"""
+        self.data.loc[label] = destination
+        self.index.insert(label, destination['latitude'], destination['longitude'])
+
+    def remove_destination(self, label):
+        self.index.delete(label)
+        self.data = self.data.drop(index=label)
+
+    def save(self, path):
+        """Persist the data and index so workers can start without refitting"""
+        with open(path, "wb") as f:
+            pickle.dump({"data": self.data, "index": self.index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        return cls(state["data"], index=state["index"])
+
+def load_country_data(file_path=None):
+    if file_path is None:
+        return get_country_index().to_dataframe()
+    return CountryIndex(load_records(file_path)).to_dataframe()
 
 def main():
-    country_data = load_country_data('../data/country_info.json')
+    country_data = load_country_data()
     recommendation_model = RecommendationModel(country_data)
     user_location = [37.7749, -122.4194]  # Example: San Francisco coordinates
     recommendations = recommendation_model.get_recommendations(user_location)
     print(recommendations)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,33 +1,27 @@
-from streamlit import st
-from utils.ai_service import get_travel_recommendations, answer_query
+import streamlit as st
+
+from utils.ai_service import stream_ai_recommendation
 
 def ai_assistant():
-    st.title("AI Travel Assistant")
+    st.header("AI Travel Assistant")
     
-    st.write("Welcome to the AI Travel Assistant! Ask me anything about your travel plans.")
+    st.markdown("""
+    Ask our AI assistant for personalized travel advice, recommendations, or information.
+    Examples:
+    - "What should I pack for a winter trip to Norway?"
+    - "Suggest a 3-day itinerary for Rome"
+    - "What are some budget-friendly destinations in Southeast Asia?"
+    """)
     
-    user_query = st.text_input("What would you like to know?")
+    user_query = st.text_area("Your travel question", height=100)
     
-    if st.button("Get Answer"):
+    if st.button("Get AI Recommendation"):
         if user_query:
-            answer = answer_query(user_query)
-            st.write(answer)
-        else:
-            st.write("Please enter a query.")
-    
-    st.write("Or, get personalized travel recommendations based on your preferences.")
-    
-    destination = st.text_input("Enter your preferred destination:")
-    travel_type = st.selectbox("Select the type of travel:", ["Leisure", "Business", "Adventure", "Cultural"])
-    
-    if st.button("Get Recommendations"):
-        if destination:
-            recommendations = get_travel_recommendations(destination, travel_type)
-            st.write("Here are some recommendations for you:")
-            for rec in recommendations:
-                st.write(f"- {rec}")
+            st.markdown("### AI Recommendation")
+            # Free-form questions are often paraphrases of one already answered
+            st.write_stream(stream_ai_recommendation(user_query, paraphrases=True))
         else:
-            st.write("Please enter a destination.") 
+            st.warning("Please enter a question for the AI assistant")
 
 if __name__ == "__main__":
-    ai_assistant()
\ No newline at end of file
+    ai_assistant()
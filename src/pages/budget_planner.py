@@ -0,0 +1,171 @@
+import math
+
+import pandas as pd
+import streamlit as st
+
+from config.settings import Config
+from utils.ai_service import get_ai_recommendation
+from utils.budget_ledger import GROUP, BudgetLedger, read_expense_csv
+from utils.chart_cache import cached_matplotlib_png
+from utils.country_data import get_country_index
+from utils.currency_api import get_exchange_rates
+
+CATEGORIES = ['Accommodation', 'Food', 'Transportation', 'Activities', 'Shopping', 'Miscellaneous']
+
+def draw_budget_pie(fig, budget_items):
+    ax = fig.subplots()
+    ax.pie(budget_items.values(), labels=budget_items.keys(), autopct='%1.1f%%', startangle=90)
+    ax.axis('equal')
+
+def budget_planner():
+    st.header("Travel Budget Planner")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Trip Details")
+        destination = st.text_input("Destination")
+        duration = st.number_input("Duration (days)", min_value=1, max_value=90, value=7)
+        travelers = st.number_input("Number of Travelers", min_value=1, max_value=10, value=2)
+        budget_category = st.selectbox("Budget Category", ["Budget", "Moderate", "Luxury"])
+    
+    with col2:
+        if destination:
+            st.subheader("AI Budget Recommendation")
+            budget_prompt = f"Create a detailed travel budget for {travelers} travelers going to {destination} for {duration} days with a {budget_category.lower()} budget. Include estimated costs for accommodation, food, transportation, activities, and miscellaneous expenses. Format as bullet points with a total at the end."
+            
+            with st.spinner("Generating budget recommendation..."):
+                budget_recommendation = get_ai_recommendation(budget_prompt)
+                st.write(budget_recommendation)
+    
+    # Custom budget planner
+    st.subheader("Custom Budget Planner")
+    budget_ledger_section(destination, duration, travelers)
+
+def edit_budget_line(remove):
+    """Update or remove the line picked by id; as a button callback it runs before the category inputs are drawn"""
+    ledger = st.session_state.budget_ledger
+    line = int(st.session_state.budget_edit_line)
+    try:
+        if remove:
+            ledger.remove(line)
+        else:
+            ledger.update(line, amount=st.session_state.budget_edit_amount)
+    except KeyError as e:
+        st.session_state.budget_edit_error = e.args[0]
+        return
+    # Keep a category's input in step with its line, or the old amount would be written back
+    for item, mapped in list(st.session_state.budget_lines.items()):
+        if mapped == line:
+            if remove:
+                del st.session_state.budget_lines[item]
+            st.session_state[f"budget_{item}"] = 0.0 if remove else ledger.amount_of(line)
+
+@st.fragment
+def budget_ledger_section(destination, duration, travelers):
+    """Ledger widgets; editing a line reruns only this section, not the AI recommendation"""
+    if 'budget_ledger' not in st.session_state:
+        st.session_state.budget_ledger = BudgetLedger()
+        st.session_state.budget_lines = {}
+        st.session_state.budget_imports = set()
+    ledger = st.session_state.budget_ledger
+    
+    rates = get_exchange_rates()
+    currencies = sorted(rates) or get_country_index().currencies()
+    display_currency = st.selectbox("Display currency", currencies, index=currencies.index(Config.DEFAULT_CURRENCY) if Config.DEFAULT_CURRENCY in currencies else 0)
+    
+    # One planned line per category; each keeps the currency it was first entered in
+    col1, col2 = st.columns(2)
+    for i, item in enumerate(CATEGORIES):
+        line = st.session_state.budget_lines.get(item)
+        if line is not None and line not in ledger:
+            # Removed by id from the expense lines; the amount still entered becomes a new line
+            del st.session_state.budget_lines[item]
+            line = None
+        currency = ledger.currency_of(line) if line is not None else display_currency
+        with col1 if i < 3 else col2:
+            amount = st.number_input(
+                f"{item} budget ({currency})",
+                min_value=0.0,
+                value=ledger.amount_of(line) if line is not None else 0.0,
+                key=f"budget_{item}"
+            )
+        if line is None and amount:
+            st.session_state.budget_lines[item] = ledger.add(item, amount, currency)
+        elif line is not None and amount != ledger.amount_of(line):
+            ledger.update(line, amount=amount)
+    
+    with st.expander("Expense lines"):
+        with st.form("add_expense", clear_on_submit=True):
+            cols = st.columns(5)
+            category = cols[0].selectbox("Category", CATEGORIES)
+            amount = cols[1].number_input("Amount", min_value=0.0)
+            currency = cols[2].selectbox("Currency", currencies, index=currencies.index(display_currency))
+            traveler = cols[3].text_input("Traveler", value=GROUP)
+            day = cols[4].number_input("Day (0 = whole trip)", min_value=0, max_value=int(duration), value=0)
+            if st.form_submit_button("Add expense") and amount:
+                ledger.add(category, amount, currency, traveler.strip() or GROUP, day)
+        
+        uploaded = st.file_uploader("Import expense lines (CSV with category, amount, currency and optional traveler, day columns)", type="csv")
+        if uploaded is not None and uploaded.file_id not in st.session_state.budget_imports:
+            try:
+                lines, skipped = read_expense_csv(uploaded)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                ledger.extend(
+                    lines['category'],
+                    lines['amount'],
+                    lines['currency'],
+                    lines['traveler'] if 'traveler' in lines else None,
+                    lines['day'] if 'day' in lines else None,
+                )
+                st.session_state.budget_imports.add(uploaded.file_id)
+                if skipped:
+                    st.warning(f"Skipped {skipped} row(s) with a missing or non-numeric amount, or no currency.")
+        
+        edit_cols = st.columns(3)
+        edit_cols[0].number_input("Line", min_value=0, step=1, key="budget_edit_line")
+        edit_cols[1].number_input("New amount", min_value=0.0, key="budget_edit_amount")
+        edit_cols[2].button("Update line", on_click=edit_budget_line, args=(False,))
+        edit_cols[2].button("Remove line", on_click=edit_budget_line, args=(True,))
+        if "budget_edit_error" in st.session_state:
+            st.error(st.session_state.pop("budget_edit_error"))
+        
+        if len(ledger):
+            st.dataframe(ledger.to_dataframe(display_currency), use_container_width=True)
+    
+    if not rates:
+        return
+    
+    # Calculate and display total budget
+    factors = ledger.conversion_factors(display_currency)
+    by_category = ledger.totals("category", display_currency, factors)
+    total_budget = sum(by_category.values())
+    if math.isnan(total_budget):
+        st.warning("Some expense currencies have no exchange rate, so totals are incomplete.")
+        return
+    st.subheader(f"Total Budget: {total_budget:,.2f} {display_currency}")
+    
+    # Create a pie chart for budget distribution
+    if total_budget > 0:
+        spent = {category: round(value, 2) for category, value in by_category.items() if value > 0}
+        # Rendered once per distinct budget split and shared across reruns and sessions
+        st.image(cached_matplotlib_png(draw_budget_pie, spent, figsize=(8, 6)), use_column_width=True)
+        
+        by_traveler = ledger.totals("traveler", display_currency, factors)
+        by_day = ledger.totals("day", display_currency, factors)
+        if len(by_traveler) > 1:
+            st.markdown("**By traveler**")
+            st.bar_chart(pd.Series(by_traveler, name=display_currency))
+        if by_day:
+            st.markdown("**By day**")
+            st.bar_chart(pd.Series(by_day, name=display_currency))
+        
+        # Per day and per person calculations
+        st.markdown(f"**Budget per day:** {total_budget/duration:,.2f} {display_currency}")
+        st.markdown(f"**Budget per person:** {total_budget/travelers:,.2f} {display_currency}")
+        st.markdown(f"**Budget per person per day:** {total_budget/(travelers*duration):,.2f} {display_currency}")
+
+if __name__ == "__main__":
+    budget_planner()
@@ -1,25 +1,118 @@
+import io
+from datetime import datetime
+
+import pandas as pd
+import plotly.express as px
 import streamlit as st
-from utils.currency_api import get_exchange_rate
+
+from config.settings import Config
+from utils.chart_cache import cached_plotly_figure
+from utils.country_data import get_country_index
+from utils.cross_rates import minor_units, round_amount
+from utils.currency_api import convert_csv, get_exchange_rates
+from utils.rate_history import get_historical_rates
+from utils.rate_store import get_rate_store
+
+def rate_history_figure(df, title):
+    return px.line(df, x='Date', y='Rate', title=title)
+
+@st.fragment(run_every=Config.RATES_UI_REFRESH_SECONDS or None)
+def live_converter(currencies):
+    """Converter widgets; re-run on a timer so new rate snapshots appear without a full page rerun"""
+    from_currency = st.selectbox("From Currency", currencies, index=currencies.index("USD") if "USD" in currencies else 0)
+    to_currency = st.selectbox("To Currency", currencies, index=currencies.index("EUR") if "EUR" in currencies else 0)
+    
+    # Re-based tables are derived from the shared snapshot in memory
+    rates = get_exchange_rates(from_currency)
+    
+    amount = st.number_input("Amount", min_value=0.01, value=100.0, step=10.0)
+    
+    if rates and to_currency in rates:
+        converted_amount = round_amount(amount * rates[to_currency], to_currency)
+        st.success(f"{amount} {from_currency} = {converted_amount:,.{minor_units(to_currency)}f} {to_currency}")
+        
+        # Show exchange rate
+        st.info(f"1 {from_currency} = {rates[to_currency]:.4f} {to_currency}")
+        st.info(f"1 {to_currency} = {(1/rates[to_currency]):.4f} {from_currency}")
+        bid, _, ask = get_rate_store().snapshot().cross_rates().quote(from_currency, to_currency)
+        st.caption(f"Bid {bid:.4f} / Ask {ask:.4f}")
+        
+        countries = get_country_index().by_currency(to_currency)
+        if countries:
+            st.caption(f"{to_currency} is used in: {', '.join(country.name for country in countries)}")
+    
+    snapshot = get_rate_store().snapshot()
+    st.caption(f"Rates updated {datetime.fromtimestamp(snapshot.as_of):%Y-%m-%d %H:%M}")
 
 def currency_converter():
-    st.title("Currency Converter")
+    st.header("Currency Exchange")
     
-    # Input for the amount to convert
-    amount = st.number_input("Amount", min_value=0.0, format="%.2f")
+    col1, col2 = st.columns(2)
     
-    # Input for the currency to convert from
-    from_currency = st.selectbox("From Currency", ["USD", "EUR", "GBP", "JPY", "AUD", "CAD"])
+    rates = get_exchange_rates()
+    currencies = list(rates.keys())
     
-    # Input for the currency to convert to
-    to_currency = st.selectbox("To Currency", ["USD", "EUR", "GBP", "JPY", "AUD", "CAD"])
+    with col1:
+        st.subheader("Currency Converter")
+        if rates:
+            live_converter(currencies)
     
-    if st.button("Convert"):
-        if amount > 0:
-            exchange_rate = get_exchange_rate(from_currency, to_currency)
-            converted_amount = amount * exchange_rate
-            st.success(f"{amount} {from_currency} is equal to {converted_amount:.2f} {to_currency}")
-        else:
-            st.error("Please enter a valid amount.")
+    with col2:
+        st.subheader("Historical Exchange Rate")
+        if rates:
+            base = st.selectbox("Base Currency", currencies, index=currencies.index("USD") if "USD" in currencies else 0, key="hist_base")
+            target = st.selectbox("Target Currency", currencies, index=currencies.index("EUR") if "EUR" in currencies else 0, key="hist_target")
+            days = st.slider("Number of days", min_value=7, max_value=365, value=7)
+            
+            dates, historical_rates = get_historical_rates(base, target, days)
+            
+            if all(rate is not None for rate in historical_rates):
+                df = pd.DataFrame({
+                    'Date': dates,
+                    'Rate': historical_rates
+                })
+                
+                # Reruns with the same series reuse the figure instead of rebuilding it
+                fig = cached_plotly_figure(rate_history_figure, df, title=f'{base}/{target} Exchange Rate History')
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.warning("Some historical data is unavailable")
+
+    # Every rate for one currency, read from the precomputed cross-rate matrix
+    with st.expander("Rate grid"):
+        if rates:
+            grid_base = st.selectbox("Show all rates for", currencies, index=currencies.index("USD") if "USD" in currencies else 0, key="grid_base")
+            matrix = get_rate_store().snapshot().cross_rates()
+            mid, bid, ask = matrix.row(grid_base)
+            st.dataframe(pd.DataFrame({
+                'Currency': matrix.currencies,
+                'Bid': bid,
+                'Mid': mid,
+                'Ask': ask,
+                f'{grid_base} per unit': 1 / mid
+            }), hide_index=True, use_container_width=True)
+
+    # Batch conversion for expense sheets
+    st.subheader("Convert an Expense Sheet")
+    st.markdown("Upload a CSV with `amount` and `from` columns, plus optional `to` and `date` columns.")
+    expense_file = st.file_uploader("Expense sheet (CSV)", type=["csv"])
+    if expense_file and rates:
+        sheet_currency = st.selectbox("Convert to (when the sheet has no `to` column)", currencies, index=currencies.index("USD") if "USD" in currencies else 0, key="sheet_to")
+        try:
+            # Reruns convert again only for another file, target currency or rate table
+            key = (expense_file.file_id, sheet_currency, get_rate_store().snapshot().version)
+            cached = st.session_state.get("expense_sheet")
+            if cached is None or cached[0] != key:
+                output = io.StringIO()
+                expense_file.seek(0)
+                row_count = convert_csv(expense_file, output, default_to=sheet_currency)
+                cached = st.session_state.expense_sheet = (key, row_count, output.getvalue())
+            _, row_count, converted = cached
+            st.success(f"Converted {row_count} rows")
+            st.dataframe(pd.read_csv(io.StringIO(converted), nrows=20), use_container_width=True)
+            st.download_button("Download converted sheet", converted, file_name="converted_expenses.csv", mime="text/csv")
+        except Exception as e:
+            st.error(f"Could not convert expense sheet: {e}")
 
 if __name__ == "__main__":
-    currency_converter()
\ No newline at end of file
+    currency_converter()
@@ -0,0 +1,79 @@
+import streamlit as st
+
+from utils import http_client
+from utils.ai_service import stream_ai_recommendation
+from utils.guide_bundle import ATTRACTIONS_PROMPT, OVERVIEW_PROMPT, get_guide_bundle, record_search
+from utils.orchestrator import current_page_tasks
+from utils.weather_api import get_weather
+
+def destination_info():
+    tasks = current_page_tasks(st.session_state)
+    
+    st.header("Destination Information")
+    
+    city = st.text_input("Enter City Name")
+    
+    if city:
+        col1, col2 = st.columns(2)
+        
+        if st.session_state.get("destination_info_city") != city:
+            st.session_state["destination_info_city"] = city
+            record_search(city)
+        
+        # Popular cities come from the pregenerated bundle; others start both AI prompts with the weather lookup
+        bundle = get_guide_bundle()
+        guide = bundle.get(city) if bundle is not None else None
+        weather_future = tasks.submit(get_weather, city)
+        if guide is None:
+            city_info_stream = tasks.stream(stream_ai_recommendation, OVERVIEW_PROMPT.format(city=city))
+            things_to_do_stream = tasks.stream(stream_ai_recommendation, ATTRACTIONS_PROMPT.format(city=city))
+        
+        with col1:
+            st.subheader(f"Weather in {city}")
+            weather_box = st.container()
+        
+        def show_weather(weather_data):
+            with weather_box:
+                if weather_data and weather_data.get("cod") != "404":
+                    temp = weather_data["main"]["temp"]
+                    weather_desc = weather_data["weather"][0]["description"]
+                    humidity = weather_data["main"]["humidity"]
+                    wind_speed = weather_data["wind"]["speed"]
+                    
+                    st.markdown(f"**Temperature:** {temp}°C")
+                    st.markdown(f"**Conditions:** {weather_desc.title()}")
+                    st.markdown(f"**Humidity:** {humidity}%")
+                    st.markdown(f"**Wind Speed:** {wind_speed} m/s")
+                else:
+                    st.error("City not found or weather data unavailable")
+        
+        def weather_timed_out():
+            with weather_box:
+                st.warning("Weather unavailable: the weather service did not answer in time.")
+        
+        # Long enough for every retry the weather policy allows
+        tasks.on_result(
+            weather_future, show_weather,
+            timeout=http_client.POLICIES["weather"].worst_case_seconds(), on_timeout=weather_timed_out,
+        )
+        
+        with col2:
+            st.subheader(f"About {city}")
+            
+            # Generate city information using AI
+            if guide is not None:
+                st.write(guide["overview"])
+            else:
+                st.write_stream(city_info_stream)
+            
+            # What to do there
+            st.subheader("Top Attractions")
+            if guide is not None:
+                st.write(guide["attractions"])
+            else:
+                st.write_stream(things_to_do_stream)
+        
+        tasks.render_all()
+
+if __name__ == "__main__":
+    destination_info()
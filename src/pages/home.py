@@ -0,0 +1,25 @@
+import streamlit as st
+
+def home():
+    st.header("Welcome to Travel Buddy!")
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("""
+        **Travel Buddy** helps you:
+        - Convert currencies with real-time exchange rates
+        - Get information about travel destinations
+        - Receive AI-powered travel recommendations
+        - Translate languages for your journey
+        - Plan and manage your travel budget
+        
+        Start by selecting an option from the sidebar!
+        """)
+    
+    with col2:
+        # Display a travel-related image
+        st.image("https://images.unsplash.com/photo-1501785888041-af3ef285b470?ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8MTh8fHRyYXZlbHxlbnwwfHwwfHx8MA%3D%3D&auto=format&fit=crop&w=500&q=60")
+
+if __name__ == "__main__":
+    home()
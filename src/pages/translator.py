@@ -0,0 +1,47 @@
+import streamlit as st
+
+from utils.ai_service import stream_ai_recommendation
+from utils.inference_dispatcher import BACKGROUND
+from utils.orchestrator import current_page_tasks
+from utils.translation_memory import translate_stream
+
+def language_translator():
+    tasks = current_page_tasks(st.session_state)
+    
+    st.header("Language Translator")
+    
+    languages = ["English", "Spanish", "French", "German", "Italian", "Portuguese", "Japanese", "Chinese", "Russian", "Arabic"]
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        source_lang = st.selectbox("From Language", languages)
+    
+    with col2:
+        target_lang = st.selectbox("To Language", languages, index=1)
+    
+    text_to_translate = st.text_area("Enter text to translate", height=150)
+    
+    if st.button("Translate") and text_to_translate:
+        with st.spinner("Translating..."):
+            try:
+                # Sentence by sentence, reusing earlier translations from the translation memory
+                translation_stream = tasks.stream(translate_stream, text_to_translate, source_lang, target_lang)
+                
+                # Provide some travel-related phrases, generated alongside the translation
+                phrases_stream = None
+                if len(text_to_translate) < 100:  # Only for shorter texts
+                    phrases_prompt = f"Provide 3 additional useful related travel phrases in {target_lang} with their {source_lang} translations. Format as a bullet list."
+                    phrases_stream = tasks.stream(stream_ai_recommendation, phrases_prompt, priority=BACKGROUND)
+                
+                st.markdown("### Translation")
+                st.write_stream(translation_stream)
+                
+                if phrases_stream is not None:
+                    st.markdown("### Additional Useful Phrases")
+                    st.write_stream(phrases_stream)
+            except Exception as e:
+                st.error(f"Translation error: {e}")
+
+if __name__ == "__main__":
+    language_translator()
@@ -1,13 +1,16 @@
 import streamlit as st
 from utils.travel_api import get_destination_suggestions, create_itinerary
+from utils.country_data import get_country_index
 from utils.currency_api import get_currency_rates
+from utils.weather_api import get_weather_batch
 
 def travel_planner():
     st.title("Travel Planner")
     
     # Destination Suggestions
     st.header("Destination Suggestions")
-    destinations = get_destination_suggestions()
+    # Country capitals stand in while the travel API is unreachable
+    destinations = get_destination_suggestions() or get_country_index().capitals()
     selected_destination = st.selectbox("Choose a destination:", destinations)
     
     if selected_destination:
@@ -21,10 +24,25 @@ def travel_planner():
             itinerary = create_itinerary(itinerary_items.splitlines())
             st.write("Your Itinerary:")
             st.write(itinerary)
+        
+        # Weather for every stop, fetched in one batch
+        stops = st.text_input("Cities on your route (comma separated):")
+        if stops:
+            cities = [city.strip() for city in stops.split(",") if city.strip()]
+            weather = get_weather_batch(cities)
+            st.table([
+                {
+                    "City": city,
+                    "Temperature (°C)": data["main"]["temp"],
+                    "Conditions": data["weather"][0]["description"].title(),
+                }
+                if data and data.get("main") else {"City": city, "Temperature (°C)": None, "Conditions": "Unavailable"}
+                for city, data in weather.items()
+            ])
     
     # Currency Information
     st.header("Currency Information")
-    currency = st.selectbox("Select currency for your destination:", ["USD", "EUR", "GBP", "JPY"])
+    currency = st.selectbox("Select currency for your destination:", get_country_index().currencies())
     
     if currency:
         rates = get_currency_rates(currency)
@@ -0,0 +1,167 @@
+"""Pregenerate Destination Info guides into the memory-mapped guide bundle.
+
+Ranks destinations by the Destination Info search log, then by the
+capitals in data/country_info.json, and generates the overview and
+"Top Attractions" text for the top N concurrently under a rate limit.
+Finished guides go to a journal next to the bundle first, so an
+interrupted run resumes where it stopped; guides already in the bundle
+are copied over unless they are older than --max-age-days or were
+written with different prompts, in which case they are regenerated
+(ranked cities) or dropped (cities no longer asked for).
+
+    python src/pregenerate_guides.py --top 200 --workers 4 --rate 1
+    python src/pregenerate_guides.py --cities "Kyoto" "Porto" --max-age-days 7
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from config.settings import Config
+from utils.ai_service import build_inference_request
+from utils.country_data import get_country_index
+from utils.guide_bundle import (
+    ATTRACTIONS_PROMPT, OVERVIEW_PROMPT, PROMPT_VERSION, BundleWriter, GuideBundle, guide_key, rank_destinations,
+)
+from utils.inference_dispatcher import BACKGROUND, InferenceDispatcher
+
+
+def generate_guide(dispatcher, journal, city):
+    """Generate one city's guide and journal it before returning the journal entry"""
+    guide = {"city": city}
+    for field, template in (("overview", OVERVIEW_PROMPT), ("attractions", ATTRACTIONS_PROMPT)):
+        url, headers, payload = build_inference_request(template.format(city=city))
+        guide[field] = dispatcher.generate(url, headers, payload, priority=BACKGROUND).strip()
+    entry = {"key": guide_key(city), "guide": guide, "generated": time.time(), "version": PROMPT_VERSION}
+    journal.append(entry)
+    return entry
+
+
+def read_journal(path):
+    """Guides finished by an earlier, interrupted run with the current prompts: ``{key: entry}``"""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of a killed run may be cut short
+                continue
+            if entry.get("version") == PROMPT_VERSION:
+                done[entry["key"]] = entry
+    return done
+
+
+class Journal:
+    """Append-only record of finished guides, synced after every line"""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=Config.GUIDE_BUNDLE_TOP, help="number of ranked destinations to cover")
+    parser.add_argument("--cities", nargs="*", default=[], help="extra destinations, always included")
+    parser.add_argument("--search-log", default=Config.DESTINATION_SEARCH_LOG)
+    parser.add_argument("--output", default=Config.GUIDE_BUNDLE_PATH)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=Config.HF_RATE_LIMIT_PER_SECOND, help="inference requests per second (0: unlimited)")
+    parser.add_argument("--burst", type=int, default=Config.HF_RATE_LIMIT_BURST)
+    parser.add_argument("--max-age-days", type=float, default=Config.GUIDE_MAX_AGE_DAYS, help="regenerate guides older than this")
+    args = parser.parse_args()
+
+    if not Config.HUGGINGFACE_API_KEY:
+        sys.exit("HUGGINGFACE_API_KEY is not set.")
+
+    destinations = {}
+    for city in rank_destinations(get_country_index().records, args.search_log)[:args.top] + args.cities:
+        destinations.setdefault(guide_key(city), city)
+
+    existing = GuideBundle(args.output) if os.path.exists(args.output) else None
+    journal_path = f"{args.output}.journal"
+    finished = read_journal(journal_path)
+    now = time.time()
+    max_age = args.max_age_days * 86400
+    todo = [
+        city for key, city in destinations.items()
+        if key not in finished and not (existing is not None and existing.is_fresh(key, max_age, now))
+    ]
+    resumed = len(finished.keys() & destinations.keys())
+    print(f"{len(destinations)} destinations: {resumed} resumed from the journal, "
+          f"{len(destinations) - resumed - len(todo)} fresh in the bundle, {len(todo)} to generate")
+
+    dispatcher = InferenceDispatcher(rate=args.rate, burst=args.burst)
+    journal = Journal(journal_path)
+    failed = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(generate_guide, dispatcher, journal, city): city for city in todo}
+        try:
+            for i, future in enumerate(as_completed(futures), start=1):
+                city = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    failed.append(city)
+                    print(f"[{i}/{len(todo)}] {city}: failed ({e})")
+                    continue
+                finished[entry["key"]] = entry
+                print(f"[{i}/{len(todo)}] {city}")
+        except KeyboardInterrupt:
+            # Guides not started yet are dropped; the ones in flight finish and are journaled
+            print("Interrupted; finishing the guides in flight...")
+            pool.shutdown(cancel_futures=True)
+            journal.close()
+            sys.exit(f"{len(read_journal(journal_path))} guides kept in {journal_path}, rerun to resume.")
+    journal.close()
+
+    writer = BundleWriter(args.output)
+    new = kept = 0
+    try:
+        for key in destinations:
+            if key in finished:
+                writer.add(key, finished[key]["guide"], finished[key]["generated"])
+                new += 1
+            elif existing is not None and key in existing.index:
+                # Fresh guides, and stale ones whose regeneration failed, are copied without recompressing
+                writer.add_raw(key, *existing.raw(key))
+                kept += 1
+        if existing is not None:
+            # Fresh guides from earlier runs' --cities stay until they go stale
+            for key in existing.index.keys() - destinations.keys():
+                if existing.is_fresh(key, max_age, now):
+                    writer.add_raw(key, *existing.raw(key))
+                    kept += 1
+        writer.commit()
+    except BaseException:
+        writer.abort()
+        raise
+    os.remove(journal_path)
+
+    size = os.path.getsize(args.output)
+    print(f"Wrote {len(writer.index)} guides ({new} new, {kept} kept) to {args.output}, {size / 1024:.0f} KiB")
+    if failed:
+        sys.exit(f"{len(failed)} guides could not be generated: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,223 @@
-from transformers import pipeline
+import streamlit as st
 
-def get_travel_recommendations(destination, interests):
-    # Load the AI model for generating recommendations
-    recommendation_model = pipeline("text-generation", model="gpt-3.5-turbo")
+from config.settings import Config
+from utils.inference_dispatcher import INTERACTIVE, InferenceError, get_inference_dispatcher
+from utils.model_pool import get_model_pool
+from utils.response_cache import get_response_cache, make_cache_key
+from utils.semantic_cache import get_semantic_cache
+from utils.tracing import traced
+
+# Context the local question-answering model extracts its answers from
+TRAVEL_CONTEXT = "Traveling can be an exciting experience. You can explore new cultures, try different cuisines, and enjoy various activities. Always check travel advisories and local regulations before planning your trip."
 
+def get_travel_recommendations(destination, interests):
     # Create a prompt for the AI model
     prompt = f"Suggest a travel itinerary for someone visiting {destination} who is interested in {', '.join(interests)}."
 
-    # Generate recommendations
-    recommendations = recommendation_model(prompt, max_length=200, num_return_sequences=1)
+    # Generate recommendations with the pooled, already-loaded model
+    recommendations = get_model_pool().run("text-generation", Config.TEXT_GENERATION_MODEL, prompt, max_length=200, num_return_sequences=1)
 
     return recommendations[0]['generated_text']
 
 def answer_travel_query(query):
-    # Load the AI model for answering questions
-    qa_model = pipeline("question-answering", model="distilbert-base-uncased-distilled-squad")
+    # Concurrent questions are batched into one forward pass by the pool
+    answer = get_model_pool().run("question-answering", Config.QA_MODEL, {"question": query, "context": TRAVEL_CONTEXT})
+
+    return answer['answer']
+
+def build_inference_request(prompt):
+    """Return the URL, headers and payload for a Mistral-7B inference call"""
+    headers = {"Authorization": f"Bearer {Config.HUGGINGFACE_API_KEY}"}
+    
+    # Format prompt specifically for Mistral model
+    formatted_prompt = f"""<s>[INST] You are a helpful travel assistant providing concise, practical travel advice.
+
+{prompt} [/INST]"""
+    
+    payload = {
+        "inputs": formatted_prompt,
+        "parameters": {
+            "max_new_tokens": 500,
+            "do_sample": True,
+            "temperature": 0.7,
+            "top_k": 50,
+            "top_p": 0.95,
+            "return_full_text": False
+        }
+    }
+    return Config.HF_INFERENCE_URL, headers, payload
+
+def _cached_answer(prompt, cache_key, url, parameters, paraphrases):
+    """Exact response cache first, then (for free-form questions) a paraphrase from the semantic cache"""
+    cached = get_response_cache().get(cache_key)
+    if cached is None and paraphrases:
+        cached = get_semantic_cache().get(prompt, partition=_semantic_partition(prompt, url, parameters))
+    return cached
+
+def _remember_answer(prompt, cache_key, url, parameters, answer, paraphrases):
+    get_response_cache().put(cache_key, answer)
+    if paraphrases:
+        get_semantic_cache().put(prompt, answer, partition=_semantic_partition(prompt, url, parameters))
+
+def _semantic_partition(prompt, url, parameters):
+    # Paraphrases are only matched within one template topic and one set of generation settings
+    return (template_topic(prompt), make_cache_key("", url, parameters))
+
+@traced()
+def get_ai_recommendation(prompt, use_cache=True, priority=INTERACTIVE, paraphrases=False):
+    """Get travel recommendations from Mistral-7B model via Hugging Face
+
+    Responses are cached by prompt and generation parameters; pass
+    ``use_cache=False`` when a freshly sampled answer is needed. With
+    ``paraphrases=True``, for free-form questions only, paraphrases of a
+    cached prompt are answered from the semantic cache. Templated page
+    prompts leave it off: they differ only in the values filled in, which
+    the semantic match cannot tell apart reliably.
+    Identical concurrent requests, in this process or in other worker
+    processes on the host, share one upstream call.
+    """
+    if not Config.HUGGINGFACE_API_KEY:
+        st.warning("Hugging Face API key not configured. Using template responses.")
+        return get_template_response(prompt)
+        
+    try:
+        API_URL, headers, payload = build_inference_request(prompt)
+        
+        # Model-loading 503s and 429s are backed off by the dispatcher, shared across sessions
+        def generate():
+            return get_inference_dispatcher().generate(API_URL, headers, payload, priority=priority)
+
+        if not use_cache:
+            return generate()
+
+        cache_key = make_cache_key(prompt, API_URL, payload["parameters"])
+        cached = _cached_answer(prompt, cache_key, API_URL, payload["parameters"], paraphrases)
+        if cached is not None:
+            return cached
+
+        # Other worker processes asking the same prompt wait for this answer instead of generating their own
+        result = get_response_cache().fetch_once(cache_key, generate)
+        if paraphrases:
+            get_semantic_cache().put(prompt, result, partition=_semantic_partition(prompt, API_URL, payload["parameters"]))
+        return result
+    except InferenceError as e:
+        # Fall back to templates for any other error
+        st.error(f"Error from Hugging Face API: {e.status_code}")
+        return get_template_response(prompt)
+    except Exception as e:
+        st.error(f"Error getting AI recommendation: {e}")
+        return get_template_response(prompt)
+
+@traced()
+def stream_ai_recommendation(prompt, use_cache=True, priority=INTERACTIVE, paraphrases=False):
+    """Yield a Mistral-7B answer token by token for ``st.write_stream``
+
+    Uses the inference endpoint's server-sent event stream. Cached answers
+    are yielded in one piece; errors fall back to template responses.
+    Pass ``priority=BACKGROUND`` for speculative requests and
+    ``paraphrases=True`` as for ``get_ai_recommendation``.
+    """
+    if not Config.HUGGINGFACE_API_KEY:
+        yield get_ai_recommendation(prompt)
+        return
+        
+    API_URL, headers, payload = build_inference_request(prompt)
+    cache_key = make_cache_key(prompt, API_URL, payload["parameters"])
+    if use_cache:
+        cached = _cached_answer(prompt, cache_key, API_URL, payload["parameters"], paraphrases)
+        if cached is not None:
+            yield cached
+            return
+    
+    tokens = []
+    try:
+        for text in get_inference_dispatcher().stream(API_URL, headers, payload, priority=priority):
+            tokens.append(text)
+            yield text
+    except InferenceError as e:
+        st.error(f"Error from Hugging Face API: {e.status_code}")
+        yield get_template_response(prompt)
+        return
+    except Exception as e:
+        if tokens:
+            raise
+        st.error(f"Error getting AI recommendation: {e}")
+        yield get_template_response(prompt)
+        return
+    
+    result = "".join(tokens).strip()
+    if use_cache and result:
+        _remember_answer(prompt, cache_key, API_URL, payload["parameters"], result, paraphrases)
 
-    # Define a context for the model to answer questions
-    context = "Traveling can be an exciting experience. You can explore new cultures, try different cuisines, and enjoy various activities. Always check travel advisories and local regulations before planning your trip."
+# Keywords that select a template response; also the first, zero-cost tier of the semantic cache
+TEMPLATE_TOPICS = {
+    "packing": ["pack", "packing", "bring"],
+    "budget": ["budget", "cheap", "affordable", "cost"],
+    "itinerary": ["itinerary", "plan", "schedule", "day trip"],
+}
+TEMPLATE_CITIES = ["paris", "london", "rome", "new york", "tokyo", "bangkok"]
 
-    # Get the answer to the user's query
-    answer = qa_model(question=query, context=context)
+def template_topic(prompt):
+    """Return the template topic or city a prompt is about, or None"""
+    prompt_lower = prompt.lower()
+    for topic, keywords in TEMPLATE_TOPICS.items():
+        if any(word in prompt_lower for word in keywords):
+            return topic
+    for city in TEMPLATE_CITIES:
+        if city in prompt_lower:
+            return city
+    return None
 
-    return answer['answer']
\ No newline at end of file
+# Template response function for fallback
+def get_template_response(prompt):
+    """Fallback template responses when API fails"""
+    topic = template_topic(prompt)
+    
+    # Check for common travel topics
+    if topic == "packing":
+        return """Here are essential items to pack:
+- Weather-appropriate clothing (layers recommended)
+- Comfortable walking shoes
+- Travel documents (passport, visas, tickets)
+- Travel adapter and electronics chargers
+- Basic toiletries and medications
+- Travel insurance information
+- Local currency or credit/debit cards"""
+    
+    elif topic == "budget":
+        return """Budget travel tips:
+- Travel during shoulder season (between peak and off-season)
+- Stay in hostels or use homestay services
+- Use public transportation instead of taxis
+- Cook some meals instead of eating out for every meal
+- Look for free attractions and city walking tours
+- Use flight comparison tools and set fare alerts"""
+    
+    elif topic == "itinerary":
+        return """Suggested itinerary structure:
+- Day 1: Focus on main attractions and get oriented
+- Day 2: Explore neighborhoods and local culture
+- Day 3: Take a day trip to nearby attractions
+- Balance your schedule with both planned activities and free time
+- Research opening hours for key attractions
+- Group activities by geographical proximity to save travel time"""
+    
+    # For city-specific information
+    if topic in TEMPLATE_CITIES:
+        return f"""Top things to do in {topic.title()}:
+- Visit the main historical sites and landmarks
+- Try local cuisine at recommended restaurants
+- Explore museums and cultural centers
+- Experience the local markets
+- Take a walking tour to learn about the city's history
+- Enjoy the local parks and public spaces"""
+    
+    # Default response for other travel questions
+    return """Travel recommendations:
+- Research your destination thoroughly before traveling
+- Learn a few basic phrases in the local language
+- Respect local customs and traditions
+- Stay flexible with your plans
+- Connect with locals for authentic experiences
+- Keep a travel journal to document your experiences
+- Consider purchasing travel insurance for peace of mind"""
@@ -0,0 +1,259 @@
+import numpy as np
+
+from utils.rate_store import get_rate_store
+
+INITIAL_CAPACITY = 64
+
+# Traveler label for shared costs that belong to the whole group
+GROUP = "Everyone"
+
+
+class _Codes:
+    """Small label <-> integer code table for one ledger column"""
+
+    def __init__(self):
+        self.labels = []
+        self._codes = {}
+
+    def code(self, label):
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class BudgetLedger:
+    """Array-backed trip budget of (category, amount, currency, traveler, day) lines.
+
+    Lines live in NumPy columns; category, currency and traveler are stored
+    as integer codes. Running totals per category, traveler and day are
+    kept per currency and updated on every add, update or removal, so
+    editing a line is O(1) and converting every total to a display
+    currency is one matrix-vector product with the exchange rates.
+    Days are 1-based trip days; ``None`` or 0 means the line is not tied
+    to a day.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.categories = _Codes()
+        self.currencies = _Codes()
+        self.travelers = _Codes()
+        self._size = 0
+        self._category = np.zeros(capacity, dtype=np.int32)
+        self._currency = np.zeros(capacity, dtype=np.int32)
+        self._traveler = np.zeros(capacity, dtype=np.int32)
+        self._day = np.zeros(capacity, dtype=np.int32)
+        self._amount = np.zeros(capacity, dtype=float)
+        self._alive = np.zeros(capacity, dtype=bool)
+        # Running totals: rows are categories / travelers / days, columns are currencies
+        self._by_category = np.zeros((0, 0))
+        self._by_traveler = np.zeros((0, 0))
+        self._by_day = np.zeros((0, 0))
+
+    def __len__(self):
+        return int(self._alive[:self._size].sum())
+
+    def __contains__(self, line):
+        """True if ``line`` is a line id that has not been removed"""
+        return 0 <= line < self._size and bool(self._alive[line])
+
+    @staticmethod
+    def _grown(array, rows, columns):
+        """``array`` zero-padded to at least ``rows`` x ``columns``, growing geometrically"""
+        if array.shape[0] >= rows and array.shape[1] >= columns:
+            return array
+        grown = np.zeros((max(rows, 2 * array.shape[0]), max(columns, 2 * array.shape[1])))
+        grown[:array.shape[0], :array.shape[1]] = array
+        return grown
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= len(self._amount):
+            return
+        capacity = max(needed, 2 * len(self._amount))
+        for name in ("_category", "_currency", "_traveler", "_day", "_amount", "_alive"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _apply(self, line, sign):
+        """Add (``sign=1``) or remove (``sign=-1``) one line's contribution to the running totals"""
+        amount = sign * self._amount[line]
+        currency = self._currency[line]
+        self._by_category[self._category[line], currency] += amount
+        self._by_traveler[self._traveler[line], currency] += amount
+        if self._day[line] >= 0:
+            self._by_day[self._day[line], currency] += amount
+
+    def _ensure_totals(self, day=-1):
+        currencies = len(self.currencies)
+        self._by_category = self._grown(self._by_category, len(self.categories), currencies)
+        self._by_traveler = self._grown(self._by_traveler, len(self.travelers), currencies)
+        self._by_day = self._grown(self._by_day, max(day + 1, self._by_day.shape[0]), currencies)
+
+    def add(self, category, amount, currency, traveler=GROUP, day=None):
+        """Append one line and return its id"""
+        self._reserve(1)
+        line = self._size
+        self._category[line] = self.categories.code(category)
+        self._currency[line] = self.currencies.code(currency.upper())
+        self._traveler[line] = self.travelers.code(traveler or GROUP)
+        self._day[line] = day - 1 if day else -1
+        self._amount[line] = amount
+        self._alive[line] = True
+        self._size += 1
+        self._ensure_totals(self._day[line])
+        self._apply(line, 1)
+        return line
+
+    def extend(self, categories, amounts, currencies, travelers=None, days=None):
+        """Append many lines in one vectorized pass and return their ids"""
+        count = len(amounts)
+        self._reserve(count)
+        lines = np.arange(self._size, self._size + count)
+        self._category[lines] = [self.categories.code(category) for category in categories]
+        self._currency[lines] = [self.currencies.code(str(currency).upper()) for currency in currencies]
+        self._traveler[lines] = [self.travelers.code(traveler or GROUP) for traveler in travelers] if travelers is not None else self.travelers.code(GROUP)
+        if days is None:
+            self._day[lines] = -1
+        else:
+            days = np.nan_to_num(np.asarray(days, dtype=float)).astype(np.int32)
+            self._day[lines] = np.where(days > 0, days - 1, -1)
+        self._amount[lines] = np.asarray(amounts, dtype=float)
+        self._alive[lines] = True
+        self._size += count
+        self._ensure_totals(int(self._day[lines].max()) if count else -1)
+
+        np.add.at(self._by_category, (self._category[lines], self._currency[lines]), self._amount[lines])
+        np.add.at(self._by_traveler, (self._traveler[lines], self._currency[lines]), self._amount[lines])
+        dated = lines[self._day[lines] >= 0]
+        np.add.at(self._by_day, (self._day[dated], self._currency[dated]), self._amount[dated])
+        return lines
+
+    def update(self, line, category=None, amount=None, currency=None, traveler=None, day=None):
+        """Change fields of one line; only that line's contribution to the totals is redone.
+
+        Pass ``day=0`` to detach the line from its day.
+        """
+        if line not in self:
+            raise KeyError(f"No budget line {line}.")
+        self._apply(line, -1)
+        if category is not None:
+            self._category[line] = self.categories.code(category)
+        if amount is not None:
+            self._amount[line] = amount
+        if currency is not None:
+            self._currency[line] = self.currencies.code(currency.upper())
+        if traveler is not None:
+            self._traveler[line] = self.travelers.code(traveler)
+        if day is not None:
+            self._day[line] = day - 1 if day else -1
+        self._ensure_totals(self._day[line])
+        self._apply(line, 1)
+
+    def remove(self, line):
+        if line not in self:
+            raise KeyError(f"No budget line {line}.")
+        self._apply(line, -1)
+        self._alive[line] = False
+
+    def amount_of(self, line):
+        return float(self._amount[line])
+
+    def currency_of(self, line):
+        return self.currencies.labels[self._currency[line]]
+
+    def conversion_factors(self, display_currency):
+        """Rate from every ledger currency to ``display_currency``; NaN where unknown"""
+        matrix = get_rate_store().snapshot().cross_rates()
+        factors = np.full(len(self.currencies), np.nan)
+        if display_currency not in matrix:
+            return factors
+        target = matrix.index[display_currency]
+        for code, currency in enumerate(self.currencies.labels):
+            if currency in matrix:
+                factors[code] = matrix.matrix[matrix.index[currency], target]
+        return factors
+
+    def totals(self, by="category", display_currency="USD", factors=None):
+        """Return ``{label: total in display_currency}`` for ``by`` in category, traveler or day"""
+        factors = self.conversion_factors(display_currency) if factors is None else factors
+        table, labels = {
+            "category": (self._by_category, self.categories.labels),
+            "traveler": (self._by_traveler, self.travelers.labels),
+            "day": (self._by_day, None),
+        }[by]
+        # Currencies with no rate and no spending must not turn every total into NaN
+        used = np.flatnonzero(np.abs(table[:, :len(factors)]).sum(axis=0) > 0)
+        converted = table[:, used] @ factors[used]
+        if labels is None:
+            return {day + 1: float(converted[day]) for day in range(len(converted)) if table[day].any()}
+        return {label: float(converted[code]) for code, label in enumerate(labels)}
+
+    def total(self, display_currency="USD", factors=None):
+        return sum(self.totals("category", display_currency, factors).values())
+
+    def recompute(self):
+        """Rebuild the running totals from the lines, dropping accumulated rounding error"""
+        self._by_category[:] = 0
+        self._by_traveler[:] = 0
+        self._by_day[:] = 0
+        lines = np.flatnonzero(self._alive[:self._size])
+        np.add.at(self._by_category, (self._category[lines], self._currency[lines]), self._amount[lines])
+        np.add.at(self._by_traveler, (self._traveler[lines], self._currency[lines]), self._amount[lines])
+        dated = lines[self._day[lines] >= 0]
+        np.add.at(self._by_day, (self._day[dated], self._currency[dated]), self._amount[dated])
+
+    def to_dataframe(self, display_currency="USD", factors=None):
+        """Live lines as a DataFrame, with the amount converted to ``display_currency``; Day 0 means undated"""
+        import pandas as pd
+
+        factors = self.conversion_factors(display_currency) if factors is None else factors
+        lines = np.flatnonzero(self._alive[:self._size])
+        return pd.DataFrame({
+            "Category": np.array(self.categories.labels, dtype=object)[self._category[lines]] if len(lines) else [],
+            "Amount": self._amount[lines],
+            "Currency": np.array(self.currencies.labels, dtype=object)[self._currency[lines]] if len(lines) else [],
+            "Traveler": np.array(self.travelers.labels, dtype=object)[self._traveler[lines]] if len(lines) else [],
+            "Day": np.where(self._day[lines] >= 0, self._day[lines] + 1, 0),
+            display_currency: self._amount[lines] * factors[self._currency[lines]] if len(lines) else [],
+        }, index=pd.Index(lines, name="Line"))
+
+
+EXPENSE_COLUMNS = ("category", "amount", "currency")
+
+
+def read_expense_csv(file):
+    """Parse an expense CSV into ``(lines, skipped)`` ready for ``BudgetLedger.extend``.
+
+    Rows with a missing or non-numeric amount or a blank currency are
+    dropped and counted in ``skipped``. Raises ValueError if the file cannot
+    be parsed or lacks one of ``EXPENSE_COLUMNS``.
+    """
+    import pandas as pd
+
+    try:
+        lines = pd.read_csv(file)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Could not read the CSV file: {e}") from e
+    lines.columns = [str(column).strip().lower() for column in lines.columns]
+    missing = [column for column in EXPENSE_COLUMNS if column not in lines]
+    if missing:
+        raise ValueError(f"The CSV file has no {', '.join(missing)} column.")
+
+    lines["amount"] = pd.to_numeric(lines["amount"], errors="coerce")
+    lines["currency"] = lines["currency"].astype("string").str.strip().str.upper()
+    valid = lines["amount"].notna() & lines["currency"].fillna("").ne("")
+    lines = lines[valid].copy()
+    lines["category"] = lines["category"].fillna("Other").astype(str)
+    lines["currency"] = lines["currency"].astype(str)
+    if "traveler" in lines:
+        lines["traveler"] = lines["traveler"].fillna(GROUP).astype(str)
+    if "day" in lines:
+        lines["day"] = pd.to_numeric(lines["day"], errors="coerce")
+    return lines, int((~valid).sum())
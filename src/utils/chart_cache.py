@@ -0,0 +1,134 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+from config.settings import Config
+from utils.tracing import traced
+
+
+def fingerprint(data):
+    """Stable content hash of a DataFrame or JSON-serializable chart input"""
+    digest = hashlib.sha256()
+    if hasattr(data, "columns") and hasattr(data, "index"):
+        import pandas as pd
+
+        digest.update(json.dumps([str(column) for column in data.columns]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """LRU of rendered charts bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = Config.CHART_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_chart_cache():
+    """Return the chart cache shared by every session in this process"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ChartCache()
+    return _cache
+
+
+def _chart_key(kind, builder, data, options):
+    material = json.dumps(
+        [kind, builder.__module__, builder.__qualname__, fingerprint(data), options], sort_keys=True, default=str
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@traced()
+def cached_plotly_figure(build, data, **options):
+    """Return ``build(data, **options)``, reusing the figure built for equal data and options.
+
+    The figure object is kept rather than its JSON because ``st.plotly_chart``
+    only takes figures and re-validating JSON costs more than building it;
+    the serialized size is what counts against the memory cap.
+    """
+    cache = get_chart_cache()
+    key = _chart_key("plotly", build, data, options)
+    figure = cache.get(key)
+    if figure is None:
+        import plotly.io as pio
+
+        figure = build(data, **options)
+        cache.put(key, figure, len(pio.to_json(figure, validate=False)))
+    return figure
+
+
+@traced()
+def cached_matplotlib_png(draw, data, figsize=(8, 6), dpi=100, **options):
+    """Return PNG bytes of ``draw(figure, data, **options)``, rendering each distinct input once.
+
+    Figures are created without pyplot, so they are never registered in its
+    global figure list, and are cleared as soon as the PNG is written.
+    """
+    cache = get_chart_cache()
+    key = _chart_key("matplotlib", draw, data, {"figsize": figsize, "dpi": dpi, **options})
+    png = cache.get(key)
+    if png is None:
+        from matplotlib.figure import Figure
+
+        figure = Figure(figsize=figsize, dpi=dpi)
+        try:
+            draw(figure, data, **options)
+            buffer = io.BytesIO()
+            figure.savefig(buffer, format="png", bbox_inches="tight")
+        finally:
+            figure.clear()
+        png = buffer.getvalue()
+        cache.put(key, png, len(png))
+    return png
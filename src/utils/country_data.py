@@ -0,0 +1,167 @@
+import json
+import os
+import pickle
+import threading
+
+from config.settings import Config
+
+# Bump when CountryRecord or the snapshot layout changes so old snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+
+REQUIRED_FIELDS = {
+    "name": str,
+    "code": str,
+    "currency": str,
+    "capital": str,
+    "region": str,
+    "population": int,
+    "area": (int, float),
+    "latitude": (int, float),
+    "longitude": (int, float),
+}
+
+
+class CountryRecord:
+    """One country from ``data/country_info.json``"""
+
+    __slots__ = tuple(REQUIRED_FIELDS)
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"CountryRecord({self.code!r}, {self.name!r})"
+
+
+def validate_countries(document):
+    """Check the parsed JSON document and return its list of country dicts.
+
+    Raises ValueError describing the first problem found.
+    """
+    countries = document.get("countries") if isinstance(document, dict) else None
+    if not isinstance(countries, list):
+        raise ValueError("Country data must be an object with a 'countries' list.")
+
+    seen = set()
+    for i, country in enumerate(countries):
+        for field, expected in REQUIRED_FIELDS.items():
+            value = country.get(field)
+            if not isinstance(value, expected) or isinstance(value, bool):
+                raise ValueError(f"Country #{i} has a missing or invalid '{field}': {value!r}")
+        if country["code"] in seen:
+            raise ValueError(f"Duplicate country code '{country['code']}'.")
+        seen.add(country["code"])
+        if not -90 <= country["latitude"] <= 90 or not -180 <= country["longitude"] <= 180:
+            raise ValueError(f"Country '{country['code']}' has coordinates out of range.")
+    return countries
+
+
+def _snapshot_path(source_path):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(Config.CACHE_DIR, f"{name}.pickle")
+
+
+def load_records(source_path=None):
+    """Return the country records, compiling a binary snapshot on first use.
+
+    The snapshot is reused for as long as the JSON file's size and mtime are
+    unchanged, so the JSON is parsed and validated once per edit.
+    """
+    source_path = source_path or Config.COUNTRY_DATA_PATH
+    stat = os.stat(source_path)
+    stamp = (SNAPSHOT_VERSION, stat.st_size, stat.st_mtime_ns)
+    snapshot_path = _snapshot_path(source_path)
+
+    try:
+        with open(snapshot_path, "rb") as f:
+            snapshot = pickle.load(f)
+        if snapshot["stamp"] == stamp:
+            return snapshot["records"]
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError):
+        pass
+
+    with open(source_path, encoding="utf-8") as f:
+        countries = validate_countries(json.load(f))
+    records = tuple(CountryRecord(**{name: country[name] for name in REQUIRED_FIELDS}) for country in countries)
+
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"stamp": stamp, "records": records}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+    return records
+
+
+class CountryIndex:
+    """In-memory lookups over the country records.
+
+    Lookups by ISO code and capital return a single record; lookups by
+    currency and region return a tuple of records.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self._by_code = {record.code.upper(): record for record in records}
+        self._by_capital = {record.capital.casefold(): record for record in records}
+        self._by_currency = {}
+        self._by_region = {}
+        for record in records:
+            self._by_currency.setdefault(record.currency.upper(), []).append(record)
+            self._by_region.setdefault(record.region.casefold(), []).append(record)
+        self._by_currency = {key: tuple(value) for key, value in self._by_currency.items()}
+        self._by_region = {key: tuple(value) for key, value in self._by_region.items()}
+
+    def __len__(self):
+        return len(self.records)
+
+    def by_code(self, code):
+        return self._by_code.get(code.upper())
+
+    def by_capital(self, capital):
+        return self._by_capital.get(capital.strip().casefold())
+
+    def by_currency(self, currency):
+        return self._by_currency.get(currency.upper(), ())
+
+    def in_region(self, region):
+        return self._by_region.get(region.casefold(), ())
+
+    def currencies(self):
+        """Currency codes used by at least one country, sorted"""
+        return sorted(self._by_currency)
+
+    def regions(self):
+        return sorted({record.region for record in self.records})
+
+    def capitals(self):
+        return [record.capital for record in self.records]
+
+    def to_dataframe(self):
+        """Return the records as a pandas DataFrame indexed by ISO code"""
+        import pandas as pd
+
+        return pd.DataFrame([record.as_dict() for record in self.records]).set_index("code", drop=False)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_country_index():
+    """Return the country index shared by every page and model in this process"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CountryIndex(load_records())
+    return _index
@@ -0,0 +1,105 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from config.settings import Config
+
+# ISO 4217 minor units for currencies that do not use two decimals
+MINOR_UNITS = {
+    "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "ISK": 0, "JPY": 0, "KMF": 0, "KRW": 0,
+    "PYG": 0, "RWF": 0, "UGX": 0, "UYI": 0, "VND": 0, "VUV": 0, "XAF": 0, "XOF": 0, "XPF": 0,
+    "BHD": 3, "IQD": 3, "JOD": 3, "KWD": 3, "LYD": 3, "OMR": 3, "TND": 3,
+}
+
+# Quoted bid/ask spread per currency in basis points; others use Config.FX_DEFAULT_SPREAD_BPS
+SPREAD_BPS = {
+    "USD": 10, "EUR": 10, "GBP": 15, "JPY": 15, "CHF": 20, "CAD": 20, "AUD": 20,
+}
+
+# Rebuild the whole matrix instead of patching it when more than this share of currencies changed
+INCREMENTAL_LIMIT = 0.25
+
+
+def minor_units(currency):
+    return MINOR_UNITS.get(currency, 2)
+
+
+def round_amount(amount, currency):
+    """Round ``amount`` half-up to the currency's minor unit"""
+    quantum = Decimal(1).scaleb(-minor_units(currency))
+    return float(Decimal(str(amount)).quantize(quantum, rounding=ROUND_HALF_UP))
+
+
+def spread_bps(currency):
+    return SPREAD_BPS.get(currency, Config.FX_DEFAULT_SPREAD_BPS)
+
+
+class CrossRateMatrix:
+    """All-pairs exchange rates derived from one USD table.
+
+    ``matrix[i, j]`` is how many units of currency ``j`` one unit of
+    currency ``i`` buys, so any pair or inverse is a single lookup.
+    """
+
+    def __init__(self, rates, _usd=None, _matrix=None):
+        self.currencies = list(rates)
+        self.index = {code: i for i, code in enumerate(self.currencies)}
+        self.usd = np.fromiter(rates.values(), dtype=float, count=len(rates)) if _usd is None else _usd
+        # One outer division: rate(i -> j) = usd[j] / usd[i]
+        self.matrix = self.usd[np.newaxis, :] / self.usd[:, np.newaxis] if _matrix is None else _matrix
+        self.spreads = np.array([spread_bps(code) for code in self.currencies], dtype=float) / 10_000
+
+    def __contains__(self, currency):
+        return currency in self.index
+
+    def _position(self, currency):
+        try:
+            return self.index[currency]
+        except KeyError:
+            raise ValueError(f"Currency '{currency}' not found.") from None
+
+    def rate(self, from_currency, to_currency):
+        return float(self.matrix[self._position(from_currency), self._position(to_currency)])
+
+    def inverse(self, from_currency, to_currency):
+        return self.rate(to_currency, from_currency)
+
+    def triangulate(self, from_currency, to_currency, via):
+        """Rate for ``from -> via[0] -> ... -> to``, e.g. ``via=["USD"]``"""
+        route = [from_currency, *via, to_currency]
+        positions = [self._position(code) for code in route]
+        return float(np.prod(self.matrix[positions[:-1], positions[1:]]))
+
+    def quote(self, from_currency, to_currency):
+        """Return ``(bid, mid, ask)`` using the wider spread of the two currencies"""
+        i, j = self._position(from_currency), self._position(to_currency)
+        mid = float(self.matrix[i, j])
+        half_spread = max(self.spreads[i], self.spreads[j]) / 2
+        return mid * (1 - half_spread), mid, mid * (1 + half_spread)
+
+    def row(self, base_currency):
+        """Return ``(mid, bid, ask)`` arrays for ``base_currency`` against every currency"""
+        i = self._position(base_currency)
+        mid = self.matrix[i]
+        half_spread = np.maximum(self.spreads[i], self.spreads) / 2
+        return mid, mid * (1 - half_spread), mid * (1 + half_spread)
+
+    def updated(self, rates):
+        """Return a matrix for a new USD table, reusing this one where possible.
+
+        When the currency set is unchanged and only a few rates moved, only
+        the rows and columns of the changed currencies are recomputed.
+        """
+        if list(rates) != self.currencies:
+            return CrossRateMatrix(rates)
+        usd = np.fromiter(rates.values(), dtype=float, count=len(rates))
+        changed = np.flatnonzero(usd != self.usd)
+        if len(changed) == 0:
+            return self
+        if len(changed) > INCREMENTAL_LIMIT * len(usd):
+            return CrossRateMatrix(rates)
+
+        matrix = self.matrix.copy()
+        matrix[changed, :] = usd[np.newaxis, :] / usd[changed, np.newaxis]
+        matrix[:, changed] = usd[changed][np.newaxis, :] / usd[:, np.newaxis]
+        return CrossRateMatrix(rates, _usd=usd, _matrix=matrix)
@@ -1,20 +1,106 @@
-import requests
 import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.history_store import get_history_store
+from utils.rate_history import fetch_missing_days
+from utils.rate_store import get_rate_store
+from utils.tracing import traced
 
 def get_exchange_rate(base_currency, target_currency):
-    api_key = os.getenv('CURRENCY_API_KEY')
-    url = f"https://api.exchangerate-api.com/v4/latest/{base_currency}"
-    
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        if target_currency in data['rates']:
-            return data['rates'][target_currency]
-        else:
-            raise ValueError(f"Target currency '{target_currency}' not found.")
-    else:
-        raise Exception("Error fetching exchange rates.")
+    snapshot = get_rate_store().snapshot()
+    if target_currency not in snapshot.rates:
+        raise ValueError(f"Target currency '{target_currency}' not found.")
+    return snapshot.rate(base_currency, target_currency)
 
 def convert_currency(amount, base_currency, target_currency):
     exchange_rate = get_exchange_rate(base_currency, target_currency)
-    return amount * exchange_rate
\ No newline at end of file
+    return amount * exchange_rate
+
+@traced()
+def get_exchange_rates(base_currency="USD"):
+    """Get latest exchange rates from the shared rate store"""
+    try:
+        snapshot = get_rate_store().snapshot()
+        if snapshot.stale:
+            st.warning("Exchange rate service is unavailable. Showing the last known rates.")
+        return snapshot.rates_for(base_currency)
+    except Exception as e:
+        st.error(f"Error fetching exchange rates: {e}")
+        return {}
+
+def get_currency_rates(currency):
+    """Rates from ``currency`` to every other currency, e.g. for a destination's currency"""
+    return get_exchange_rates(currency)
+
+def _usd_rate_matrix(currencies, days):
+    """Stack the latest USD table (row 0) and the tables for ``days`` (rows 1..)"""
+    latest = get_rate_store().snapshot().rates
+    matrix = np.empty((len(days) + 1, len(currencies)))
+    matrix[0] = [latest.get(code, np.nan) for code in currencies]
+    if days:
+        fetch_missing_days(days)
+        matrix[1:] = get_history_store().table(days, currencies)
+    return matrix
+
+def convert_batch(amounts, from_currencies, to_currencies, dates=None):
+    """Convert many amounts in one vectorized pass.
+
+    Accepts any array-like columns (lists, NumPy/pandas/Arrow arrays).
+    Rows with a past date use that day's rates, all other rows use the
+    latest rates. Unknown currencies or unavailable days give NaN.
+    """
+    amounts = pd.to_numeric(pd.Series(np.asarray(amounts)), errors="coerce").to_numpy(dtype=float)
+    from_codes = pd.Series(np.asarray(from_currencies), dtype="string").str.upper()
+    to_codes = pd.Series(np.asarray(to_currencies), dtype="string").str.upper()
+
+    currencies = pd.Index(get_rate_store().snapshot().currencies())
+    from_idx = currencies.get_indexer(from_codes)
+    to_idx = currencies.get_indexer(to_codes)
+
+    row_idx = np.zeros(len(amounts), dtype=np.int64)
+    days = []
+    if dates is not None:
+        parsed = pd.to_datetime(pd.Series(np.asarray(dates)), errors="coerce").dt.date
+        past = parsed.notna() & (parsed < date.today())
+        codes, days = pd.factorize(parsed[past], sort=True)
+        row_idx[past.to_numpy()] = codes + 1
+        days = list(days)
+
+    matrix = _usd_rate_matrix(list(currencies), days)
+    # A trailing NaN column absorbs the -1 indexes of unknown currencies
+    matrix = np.hstack([matrix, np.full((len(matrix), 1), np.nan)])
+    rates = matrix[row_idx, to_idx] / matrix[row_idx, from_idx]
+    return amounts * rates
+
+def convert_dataframe(df, amount_col="amount", from_col="from", to_col="to", date_col="date", output_col="converted_amount"):
+    """Return a copy of ``df`` with a column of converted amounts added"""
+    dates = df[date_col] if date_col in df.columns else None
+    result = df.copy()
+    result[output_col] = convert_batch(df[amount_col], df[from_col], df[to_col], dates)
+    return result
+
+def convert_csv(source, destination, chunksize=50_000, default_to=None, **columns):
+    """Stream a CSV expense sheet through ``convert_dataframe`` chunk by chunk.
+
+    Only one chunk is held in memory at a time. ``default_to`` fills the
+    target currency when the sheet has no target column. Returns the number
+    of rows written.
+    """
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, "w", newline="", encoding="utf-8") as f:
+            return convert_csv(source, f, chunksize, default_to, **columns)
+
+    to_col = columns.get("to_col", "to")
+    rows = 0
+    for i, chunk in enumerate(pd.read_csv(source, chunksize=chunksize)):
+        if to_col not in chunk.columns:
+            if default_to is None:
+                raise ValueError(f"CSV has no '{to_col}' column and no default target currency was given.")
+            chunk[to_col] = default_to
+        convert_dataframe(chunk, **columns).to_csv(destination, header=i == 0, index=False)
+        rows += len(chunk)
+    return rows
@@ -0,0 +1,196 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+OVERVIEW_PROMPT = "Provide a brief overview of {city} as a travel destination in 3-4 sentences."
+ATTRACTIONS_PROMPT = "List 5 top attractions or things to do in {city} in bullet point format."
+
+# Guides written with other prompt wording count as stale and are regenerated on the next refresh
+PROMPT_VERSION = f"{zlib.crc32((OVERVIEW_PROMPT + ATTRACTIONS_PROMPT).encode('utf-8')):08x}"
+
+MAGIC = b"TBGUIDE1"
+# Trailer: offset and length of the compressed index, then the magic again
+TRAILER = struct.Struct("<QI8s")
+
+# How often the app checks whether the bundle file has been replaced
+RELOAD_CHECK_SECONDS = 60
+
+
+def guide_key(city):
+    """Bundle key for a city name, keeping the country if one is given.
+
+    ``" Paris "`` -> ``"paris"`` and ``"Paris ,  Texas"`` -> ``"paris, texas"``,
+    so a guide for one Paris is never served for another.
+    """
+    parts = (" ".join(part.split()) for part in city.split(","))
+    return ", ".join(part for part in parts if part).casefold()
+
+
+class GuideBundle:
+    """Read-only, memory-mapped file of pregenerated destination guides.
+
+    Layout: ``MAGIC``, one zlib-compressed JSON guide per city, the
+    zlib-compressed JSON index ``{key: [offset, length, generated,
+    prompt_version]}`` and ``TRAILER``. Only the index is decoded when the
+    bundle is opened; a guide is decompressed when it is asked for, and
+    the pages the OS maps in are shared by every worker process.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < len(MAGIC) + TRAILER.size or self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a guide bundle")
+        offset, length, magic = TRAILER.unpack_from(self._mmap, len(self._mmap) - TRAILER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is truncated")
+        self.index = json.loads(zlib.decompress(self._mmap[offset:offset + length]))
+
+    def __contains__(self, city):
+        return guide_key(city) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, city):
+        """Return the guide dict for ``city`` or None"""
+        entry = self.index.get(guide_key(city))
+        if entry is None:
+            return None
+        offset, length = entry[0], entry[1]
+        return json.loads(zlib.decompress(self._mmap[offset:offset + length]))
+
+    def raw(self, key):
+        """Compressed guide bytes, generation time and prompt version, for copying into a new bundle"""
+        offset, length, generated, version = self.index[key]
+        return self._mmap[offset:offset + length], generated, version
+
+    def is_fresh(self, key, max_age, now=None):
+        entry = self.index.get(key)
+        if entry is None:
+            return False
+        now = time.time() if now is None else now
+        return entry[3] == PROMPT_VERSION and now - entry[2] < max_age
+
+
+class BundleWriter:
+    """Writes a new bundle next to ``path`` and swaps it in atomically on ``commit()``"""
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(MAGIC)
+        self.index = {}
+
+    def add(self, key, guide, generated=None):
+        blob = zlib.compress(json.dumps(guide, ensure_ascii=False).encode("utf-8"), 9)
+        self.add_raw(key, blob, time.time() if generated is None else generated, PROMPT_VERSION)
+
+    def add_raw(self, key, blob, generated, version):
+        self.index[key] = [self._file.tell(), len(blob), generated, version]
+        self._file.write(blob)
+
+    def commit(self):
+        index = zlib.compress(json.dumps(self.index).encode("utf-8"), 9)
+        offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(TRAILER.pack(offset, len(index), MAGIC))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._tmp_path)
+
+
+_bundle = None
+_bundle_signature = None
+_bundle_checked = None
+_bundle_lock = threading.Lock()
+
+
+def get_guide_bundle():
+    """Return the bundle at ``Config.GUIDE_BUNDLE_PATH``, or None if there is none.
+
+    The file is checked for replacement at most every ``RELOAD_CHECK_SECONDS``,
+    so a refresh job can publish a new bundle while the app is running.
+    """
+    global _bundle, _bundle_signature, _bundle_checked
+    with _bundle_lock:
+        now = time.monotonic()
+        if _bundle_checked is not None and now - _bundle_checked < RELOAD_CHECK_SECONDS:
+            return _bundle
+        _bundle_checked = now
+        try:
+            stat = os.stat(Config.GUIDE_BUNDLE_PATH)
+        except FileNotFoundError:
+            _bundle = _bundle_signature = None
+            return None
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature != _bundle_signature:
+            _bundle_signature = signature
+            try:
+                _bundle = GuideBundle(Config.GUIDE_BUNDLE_PATH)
+            except (OSError, ValueError) as e:
+                logger.warning("Could not open guide bundle %s: %s", Config.GUIDE_BUNDLE_PATH, e)
+                _bundle = None
+    return _bundle
+
+
+_log_lock = threading.Lock()
+
+
+def record_search(city):
+    """Append a Destination Info search to the log the pregeneration job ranks cities by"""
+    if not Config.DESTINATION_SEARCH_LOG:
+        return
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(Config.DESTINATION_SEARCH_LOG)), exist_ok=True)
+        with _log_lock, open(Config.DESTINATION_SEARCH_LOG, "a", encoding="utf-8") as f:
+            f.write(f"{int(time.time())}\t{' '.join(city.split())}\n")
+    except OSError as e:
+        logger.warning("Could not record destination search: %s", e)
+
+
+def search_counts(path):
+    """Return ``(Counter of guide keys, {key: most used spelling})`` from a search log"""
+    counts = Counter()
+    spellings = {}
+    if not path or not os.path.exists(path):
+        return counts, {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            city = line.rstrip("\n").split("\t")[-1].strip()
+            if city:
+                key = guide_key(city)
+                counts[key] += 1
+                spellings.setdefault(key, Counter())[city] += 1
+    return counts, {key: names.most_common(1)[0][0] for key, names in spellings.items()}
+
+
+def rank_destinations(records, search_log=None):
+    """City names, most searched first, then the capitals of the most populous countries"""
+    counts, names = search_counts(search_log)
+    ranked = [names[key] for key, _ in counts.most_common()]
+    seen = set(counts)
+    for record in sorted(records, key=lambda record: record.population, reverse=True):
+        key = guide_key(record.capital)
+        if key not in seen:
+            seen.add(key)
+            ranked.append(record.capital)
+    return ranked
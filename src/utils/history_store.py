@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import numpy as np
+
+from config.settings import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are kept apart
+    fcntl = None
+
+# Row 0 of the matrix is this day; row ``i`` is ``EPOCH + i`` days
+EPOCH = date(2000, 1, 1)
+INITIAL_COLUMNS = 256
+ROW_GROWTH = 366
+
+
+def _as_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def _rows(days):
+    """Matrix rows of ``days``; days before EPOCH get -1"""
+    rows = np.array([(_as_date(day) - EPOCH).days for day in days], dtype=np.int64)
+    rows[rows < 0] = -1
+    return rows
+
+
+class HistoryStore:
+    """Append-only (day x currency) matrix of USD rates in a memory-mapped file.
+
+    Every currency gets a fixed column and every day a fixed row, so a pair
+    over any date range is one slice of two columns and one division.
+    Missing values are stored as 0 so unwritten regions stay sparse on disk.
+    The file is shared by all sessions and only the pages actually touched
+    are held in memory. Days before EPOCH cannot be stored and read as
+    missing.
+
+    Writers take an exclusive ``flock`` on a lock file next to the matrix
+    and readers a shared one, so processes sharing the directory never see
+    the matrix while another one is growing or widening it.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(Config.CACHE_DIR, "rate_history")
+        self._data_path = os.path.join(self.directory, "rates.f8")
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._lock = threading.RLock()
+        self._index_mtime = None
+        self._columns = {}
+        self._capacity = INITIAL_COLUMNS
+        self._matrix = None
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_file = open(os.path.join(self.directory, "lock"), "a+b")
+        with self._locked():
+            self._load()
+
+    @contextmanager
+    def _locked(self, exclusive=False):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        try:
+            self._index_mtime = os.path.getmtime(self._index_path)
+            with open(self._index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {"currencies": [], "capacity": INITIAL_COLUMNS}
+            self._index_mtime = None
+        self._columns = {code: i for i, code in enumerate(index["currencies"])}
+        self._capacity = index["capacity"]
+        self._open_matrix()
+
+    def _open_matrix(self, min_rows=0):
+        row_bytes = self._capacity * 8
+        size = os.path.getsize(self._data_path) if os.path.exists(self._data_path) else 0
+        rows = size // row_bytes
+        if rows < min_rows or rows == 0:
+            rows = max(rows, min_rows) + ROW_GROWTH
+            with open(self._data_path, "ab") as f:
+                f.truncate(rows * row_bytes)
+        self._matrix = np.memmap(self._data_path, dtype=np.float64, mode="r+", shape=(rows, self._capacity))
+
+    def _save_index(self):
+        currencies = sorted(self._columns, key=self._columns.get)
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"currencies": currencies, "capacity": self._capacity}, f)
+        os.replace(tmp_path, self._index_path)
+        self._index_mtime = os.path.getmtime(self._index_path)
+
+    def _refresh_index(self):
+        # Another process may have added currencies since we loaded the index
+        try:
+            mtime = os.path.getmtime(self._index_path)
+        except OSError:
+            return
+        if mtime != self._index_mtime:
+            self._load()
+
+    def _widen(self, capacity):
+        # Map the file as it is now; other processes may have added rows since
+        self._open_matrix()
+        old = np.array(self._matrix)
+        self._matrix = None
+        widened = np.zeros((old.shape[0], capacity))
+        widened[:, :old.shape[1]] = old
+        tmp_path = f"{self._data_path}.{os.getpid()}.tmp"
+        widened.tofile(tmp_path)
+        os.replace(tmp_path, self._data_path)
+        self._capacity = capacity
+        self._open_matrix()
+
+    def _column(self, code):
+        column = self._columns.get(code)
+        if column is None:
+            column = len(self._columns)
+            if column >= self._capacity:
+                self._widen(self._capacity * 2)
+            self._columns[code] = column
+        return column
+
+    def add_day(self, day, rates):
+        """Import one full USD ``rates`` dict as returned by the rate API"""
+        row = (_as_date(day) - EPOCH).days
+        if row < 0:
+            raise ValueError(f"Days before {EPOCH.isoformat()} cannot be stored.")
+        with self._locked(exclusive=True):
+            self._refresh_index()
+            known = len(self._columns)
+            columns = [self._column(code) for code in rates]
+            if row >= self._matrix.shape[0]:
+                self._open_matrix(min_rows=row + 1)
+            values = np.zeros(self._capacity)
+            values[columns] = list(rates.values())
+            self._matrix[row] = values
+            self._matrix.flush()
+            if len(self._columns) != known:
+                self._save_index()
+
+    def has_days(self, days):
+        """Return a boolean array telling which of ``days`` are stored"""
+        rows = _rows(days)
+        with self._locked():
+            self._refresh_index()
+            usd = self._columns.get("USD")
+            if usd is None:
+                return np.zeros(len(rows), dtype=bool)
+            present = np.zeros(len(rows), dtype=bool)
+            in_range = (rows >= 0) & (rows < self._matrix.shape[0])
+            present[in_range] = self._matrix[rows[in_range], usd] != 0
+            return present
+
+    def series(self, base_currency, target_currency, start, end):
+        """Return ``(dates, rates)`` for ``start``..``end`` inclusive.
+
+        ``rates`` is a float array with NaN for days that are not stored.
+        """
+        start, end = _as_date(start), _as_date(end)
+        first, last = (start - EPOCH).days, (end - EPOCH).days + 1
+        dates = [start + timedelta(days=i) for i in range(last - first)]
+        # Days before EPOCH are not stored, so the window starts at row 0 at the earliest
+        skip = max(-first, 0)
+        first += skip
+        with self._locked():
+            self._refresh_index()
+            base = self._columns.get(base_currency)
+            target = self._columns.get(target_currency)
+            if base is None or target is None:
+                return dates, np.full(len(dates), np.nan)
+            stop = min(last, self._matrix.shape[0])
+            window = np.array(self._matrix[first:max(stop, first), [base, target]])
+        window[window == 0] = np.nan
+        rates = np.full(len(dates), np.nan)
+        rates[skip:skip + len(window)] = window[:, 1] / window[:, 0]
+        return dates, rates
+
+    def table(self, days, currencies):
+        """Return a ``len(days) x len(currencies)`` array of USD rates (NaN if missing)"""
+        rows = _rows(days)
+        with self._locked():
+            self._refresh_index()
+            columns = np.array([self._columns.get(code, -1) for code in currencies], dtype=np.int64)
+            result = np.zeros((len(rows), len(columns)))
+            in_range = (rows >= 0) & (rows < self._matrix.shape[0])
+            known = columns >= 0
+            result[np.ix_(in_range, known)] = self._matrix[np.ix_(rows[in_range], columns[known])]
+        result[result == 0] = np.nan
+        return result
+
+    def currencies(self):
+        with self._locked():
+            self._refresh_index()
+            return list(self._columns)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Return the history store shared by every session in this process"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+    return _store
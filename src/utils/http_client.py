@@ -0,0 +1,144 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import Config
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+
+class RetryPolicy:
+    """How requests to one upstream are timed out and retried"""
+
+    def __init__(self, timeout, retries=2, backoff=0.5, max_backoff=10.0,
+                 retry_statuses=(429, 500, 502, 503, 504)):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def delay(self, attempt):
+        """Full-jitter exponential backoff before retry number ``attempt``"""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def worst_case_seconds(self):
+        """Longest a request can take: every attempt timing out, plus the longest backoff before each retry"""
+        timeout = sum(self.timeout) if isinstance(self.timeout, tuple) else self.timeout
+        backoffs = sum(min(self.max_backoff, self.backoff * 2 ** attempt) for attempt in range(self.retries))
+        return (self.retries + 1) * timeout + backoffs
+
+
+POLICIES = {
+    "default": RetryPolicy(timeout=(3.05, Config.HTTP_TIMEOUT_SECONDS)),
+    "exchange_rates": RetryPolicy(timeout=(3.05, Config.HTTP_TIMEOUT_SECONDS), retries=2, backoff=0.5),
+    "weather": RetryPolicy(timeout=(3.05, Config.HTTP_TIMEOUT_SECONDS), retries=1, backoff=0.5),
+    # 429s and model-loading 503s are backed off across sessions by utils.inference_dispatcher
+    "huggingface": RetryPolicy(timeout=(3.05, 120), retries=2, backoff=1.0, retry_statuses=(500, 502, 504)),
+    "travel": RetryPolicy(timeout=(3.05, Config.HTTP_TIMEOUT_SECONDS), retries=2, backoff=0.5),
+}
+
+
+class EndpointStats:
+    """Latency histogram and error counters for one endpoint"""
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.errors = {}
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_seconds": self.total_seconds,
+            "buckets": dict(zip(LATENCY_BUCKETS, self.buckets)),
+            "errors": dict(self.errors),
+        }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(endpoint, seconds, error=None):
+    with _stats_lock:
+        stats = _stats.get(endpoint)
+        if stats is None:
+            stats = _stats[endpoint] = EndpointStats()
+        stats.observe(seconds)
+        if error is not None:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+
+
+def get_metrics():
+    """Return ``{endpoint: stats}`` for every endpoint called so far"""
+    with _stats_lock:
+        return {endpoint: stats.as_dict() for endpoint, stats in _stats.items()}
+
+
+def reset_metrics():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _make_session():
+    session = requests.Session()
+    # One pool per host, each capped at HTTP_POOL_MAXSIZE keep-alive connections
+    adapter = HTTPAdapter(pool_connections=len(POLICIES), pool_maxsize=Config.HTTP_POOL_MAXSIZE, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = _make_session()
+
+
+def request(method, url, upstream="default", endpoint=None, **kwargs):
+    """Send a request through the shared session using ``upstream``'s retry policy.
+
+    Retryable statuses and connection errors are retried with jittered
+    backoff. The last response is returned whatever its status; the last
+    exception is raised if every attempt failed to connect.
+    """
+    policy = POLICIES.get(upstream, POLICIES["default"])
+    kwargs.setdefault("timeout", policy.timeout)
+    endpoint = f"{upstream}:{endpoint or urlsplit(url).path}"
+
+    for attempt in range(policy.retries + 1):
+        last_attempt = attempt == policy.retries
+        start = time.perf_counter()
+        try:
+            response = _session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            _record(endpoint, time.perf_counter() - start, type(e).__name__)
+            if last_attempt:
+                raise
+        else:
+            failed = response.status_code >= 400
+            _record(endpoint, time.perf_counter() - start, str(response.status_code) if failed else None)
+            if last_attempt or response.status_code not in policy.retry_statuses:
+                return response
+            response.close()
+        time.sleep(policy.delay(attempt))
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,263 @@
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+
+from config.settings import Config
+from utils import http_client
+
+# Request priorities; lower runs first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class InferenceError(Exception):
+    """The inference endpoint answered with a non-200 status"""
+
+    def __init__(self, status_code):
+        super().__init__(f"Inference endpoint returned {status_code}")
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """``rate`` requests per second with bursts of up to ``burst``"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 if one is available now)"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.rate <= 0 or self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class _Flight:
+    """One upstream call and the tokens it has produced so far.
+
+    Every caller asking for the same request subscribes to the same flight,
+    so tokens are fetched once and replayed to each of them.
+    """
+
+    def __init__(self, key, priority, seq):
+        self.key = key
+        self.priority = priority
+        self.seq = seq
+        self.tokens = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self.condition = threading.Condition()
+
+    def publish(self, token):
+        with self.condition:
+            self.tokens.append(token)
+            self.condition.notify_all()
+
+    def finish(self, error=None):
+        with self.condition:
+            self.done = True
+            self.error = error
+            self.condition.notify_all()
+
+    def subscribe(self, timeout):
+        """Yield the flight's tokens; ``timeout`` bounds the wait for each next chunk, not the whole answer"""
+        position = 0
+        while True:
+            deadline = time.monotonic() + timeout
+            with self.condition:
+                while position == len(self.tokens) and not self.done:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for the inference endpoint.")
+                    self.condition.wait(remaining)
+                chunk = self.tokens[position:]
+                position = len(self.tokens)
+                finished = self.done
+            yield from chunk
+            if finished and position == len(self.tokens):
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class InferenceDispatcher:
+    """Process-wide gate in front of the text-generation endpoint.
+
+    - Identical requests already in flight are coalesced: later callers
+      subscribe to the running call instead of sending their own.
+    - Upstream calls are admitted through a token bucket, highest priority
+      (then oldest) first, so speculative calls never delay interactive ones.
+    - 503 "model loading" and 429 responses set one backoff deadline shared
+      by every queued call, honouring ``estimated_time`` and ``Retry-After``,
+      instead of each session sleeping on its own.
+    """
+
+    def __init__(self, rate=None, burst=None, max_attempts=None, max_backoff=None, timeout=None):
+        self.bucket = TokenBucket(
+            Config.HF_RATE_LIMIT_PER_SECOND if rate is None else rate,
+            Config.HF_RATE_LIMIT_BURST if burst is None else burst,
+        )
+        self.max_attempts = Config.HF_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.max_backoff = 60.0 if max_backoff is None else max_backoff
+        self.timeout = Config.UPSTREAM_CALL_TIMEOUT_SECONDS * 2 if timeout is None else timeout
+        self._condition = threading.Condition()
+        self._flights = {}
+        self._waiting = []
+        self._seq = itertools.count()
+        self._backoff_until = 0.0
+        self._failures = 0
+
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.backoffs = 0
+        self.throttled_seconds = 0.0
+
+    @staticmethod
+    def request_key(url, payload, stream):
+        material = json.dumps({"url": url, "payload": payload, "stream": stream}, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def generate(self, url, headers, payload, priority=INTERACTIVE):
+        """Return the generated text, or raise InferenceError on a non-200 answer"""
+        return "".join(self._join(url, headers, payload, False, priority))
+
+    def stream(self, url, headers, payload, priority=INTERACTIVE):
+        """Yield generated tokens as the endpoint streams them"""
+        return self._join(url, headers, payload, True, priority)
+
+    def _join(self, url, headers, payload, stream, priority):
+        key = self.request_key(url, payload, stream)
+        with self._condition:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(key, priority, next(self._seq))
+                threading.Thread(
+                    target=self._fly, args=(flight, url, headers, payload, stream), name="inference", daemon=True
+                ).start()
+            else:
+                self.coalesced += 1
+                # An interactive caller joining a background call promotes it
+                if priority < flight.priority:
+                    flight.priority = priority
+                    self._condition.notify_all()
+            flight.subscribers += 1
+        return flight.subscribe(self.timeout)
+
+    def _admit(self, flight):
+        """Block until ``flight`` is the most urgent waiter and may send a request"""
+        start = time.monotonic()
+        with self._condition:
+            self._waiting.append(flight)
+            try:
+                while True:
+                    now = time.monotonic()
+                    first = min(self._waiting, key=lambda waiting: (waiting.priority, waiting.seq))
+                    delay = max(self._backoff_until - now, self.bucket.wait_time(now))
+                    if first is flight and delay <= 0:
+                        self.bucket.take()
+                        self.upstream_calls += 1
+                        return
+                    self._condition.wait(delay if first is flight else None)
+            finally:
+                self._waiting.remove(flight)
+                self.throttled_seconds += time.monotonic() - start
+                self._condition.notify_all()
+
+    def _back_off(self, response):
+        """Push the shared backoff deadline out after a 429 or 503"""
+        delay = None
+        try:
+            if response.status_code == 429 and response.headers.get("Retry-After"):
+                delay = float(response.headers["Retry-After"])
+            elif response.status_code == 503:
+                delay = float(response.json().get("estimated_time"))
+        except (TypeError, ValueError):
+            pass
+        with self._condition:
+            self._failures += 1
+            self.backoffs += 1
+            if delay is None:
+                delay = random.uniform(0, min(self.max_backoff, 2 ** self._failures))
+            self._backoff_until = max(self._backoff_until, time.monotonic() + min(delay, self.max_backoff))
+            self._condition.notify_all()
+
+    def _fly(self, flight, url, headers, payload, stream):
+        try:
+            for attempt in range(self.max_attempts):
+                self._admit(flight)
+                body = {**payload, "stream": True} if stream else payload
+                response = http_client.post(
+                    url, upstream="huggingface", endpoint="generate_stream" if stream else "generate",
+                    headers=headers, json=body, stream=stream,
+                )
+                with response:
+                    if response.status_code in (429, 503) and attempt < self.max_attempts - 1:
+                        self._back_off(response)
+                        continue
+                    if response.status_code != 200:
+                        raise InferenceError(response.status_code)
+                    with self._condition:
+                        self._failures = 0
+                    if stream:
+                        self._relay_events(response, flight)
+                    else:
+                        flight.publish(response.json()[0]["generated_text"].strip())
+                    break
+        except Exception as e:
+            flight.finish(e)
+        else:
+            flight.finish()
+        finally:
+            with self._condition:
+                self._flights.pop(flight.key, None)
+
+    @staticmethod
+    def _relay_events(response, flight):
+        """Publish the text of each server-sent token event"""
+        started = False
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):])
+            token = event.get("token") or {}
+            if token.get("special") or not token.get("text"):
+                continue
+            # Drop the leading whitespace the model emits before its first token
+            text = token["text"] if started else token["text"].lstrip()
+            started = True
+            flight.publish(text)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "upstream_calls": self.upstream_calls,
+                "coalesced": self.coalesced,
+                "backoffs": self.backoffs,
+                "throttled_seconds": self.throttled_seconds,
+                "in_flight": len(self._flights),
+                "queued": len(self._waiting),
+            }
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_inference_dispatcher():
+    """Return the dispatcher shared by every session in this process"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = InferenceDispatcher()
+    return _dispatcher
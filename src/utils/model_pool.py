@@ -0,0 +1,171 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from config.settings import Config
+
+
+def load_pipeline(task, model):
+    """Build a transformers pipeline; transformers is only imported here"""
+    from transformers import pipeline
+
+    return pipeline(task, model=model)
+
+
+def estimate_size(pipe):
+    """Approximate memory held by a pipeline's weights, in bytes"""
+    model = getattr(pipe, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return 0
+    return sum(p.numel() * p.element_size() for p in model.parameters())
+
+
+class ModelRegistry:
+    """Loads each (task, model) pipeline once and keeps it warm.
+
+    Models idle for longer than ``idle_seconds`` are dropped, and least
+    recently used models are dropped when loading another one would exceed
+    ``memory_budget`` bytes.
+    """
+
+    def __init__(self, memory_budget=None, idle_seconds=None, loader=load_pipeline):
+        self.memory_budget = Config.MODEL_MEMORY_BUDGET_MB * 1024 * 1024 if memory_budget is None else memory_budget
+        self.idle_seconds = Config.MODEL_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        self._loader = loader
+        self._models = OrderedDict()  # (task, model) -> [pipeline, size, last_used]
+        self._lock = threading.Lock()
+
+    def _evict(self, needed):
+        now = time.monotonic()
+        for key in list(self._models):
+            pipe, size, last_used = self._models[key]
+            if now - last_used > self.idle_seconds:
+                del self._models[key]
+        while self._models and self.memory_used() + needed > self.memory_budget:
+            self._models.popitem(last=False)
+
+    def memory_used(self):
+        return sum(size for _, size, _ in self._models.values())
+
+    def get(self, task, model):
+        """Return the warm pipeline for ``(task, model)``, loading it if needed"""
+        key = (task, model)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                entry[2] = time.monotonic()
+                self._models.move_to_end(key)
+                return entry[0]
+
+        # Load outside the lock so other models stay usable meanwhile
+        pipe = self._loader(task, model)
+        size = estimate_size(pipe)
+        with self._lock:
+            if key not in self._models:
+                self._evict(size)
+                self._models[key] = [pipe, size, time.monotonic()]
+            return self._models[key][0]
+
+    def loaded(self):
+        with self._lock:
+            return list(self._models)
+
+
+class ModelWorker:
+    """Serves one (task, model) pipeline from a bounded request queue.
+
+    Requests that arrive within ``batch_wait`` seconds of each other, up to
+    ``max_batch`` of them, go through the pipeline in a single call.
+    """
+
+    def __init__(self, registry, task, model, max_batch=None, batch_wait=None, queue_size=None):
+        self.registry = registry
+        self.task = task
+        self.model = model
+        self.max_batch = Config.MODEL_MAX_BATCH if max_batch is None else max_batch
+        self.batch_wait = Config.MODEL_BATCH_WAIT_MS / 1000 if batch_wait is None else batch_wait
+        self._queue = queue.Queue(maxsize=Config.MODEL_QUEUE_SIZE if queue_size is None else queue_size)
+        self._thread = threading.Thread(target=self._serve, name=f"model-{task}", daemon=True)
+        self._thread.start()
+
+    def submit(self, inputs, timeout=None, **kwargs):
+        """Queue one input and return a Future for its output.
+
+        Raises ``queue.Full`` if the queue stays full for ``timeout`` seconds.
+        """
+        future = Future()
+        self._queue.put((inputs, kwargs, future), timeout=timeout)
+        return future
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            # Only requests with identical generation kwargs can share a call
+            if item[1] != batch[0][1]:
+                self._run([item])
+                continue
+            batch.append(item)
+        return batch
+
+    def _run(self, batch):
+        try:
+            pipe = self.registry.get(self.task, self.model)
+            outputs = pipe([inputs for inputs, _, _ in batch], **batch[0][1])
+            if len(batch) == 1 and not isinstance(outputs, list):
+                outputs = [outputs]
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), output in zip(batch, outputs):
+            future.set_result(output)
+
+    def _serve(self):
+        while True:
+            self._run(self._next_batch())
+
+
+class ModelPool:
+    """Process-level entry point: one registry and one worker per model"""
+
+    def __init__(self, registry=None):
+        self.registry = registry or ModelRegistry()
+        self._workers = {}
+        self._lock = threading.Lock()
+
+    def worker(self, task, model):
+        key = (task, model)
+        with self._lock:
+            if key not in self._workers:
+                self._workers[key] = ModelWorker(self.registry, task, model)
+            return self._workers[key]
+
+    def submit(self, task, model, inputs, **kwargs):
+        return self.worker(task, model).submit(inputs, timeout=Config.MODEL_QUEUE_TIMEOUT_SECONDS, **kwargs)
+
+    def run(self, task, model, inputs, **kwargs):
+        """Submit ``inputs`` and wait for the result"""
+        return self.submit(task, model, inputs, **kwargs).result()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_model_pool():
+    """Return the model pool shared by every session in this process"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModelPool()
+    return _pool
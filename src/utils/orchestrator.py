@@ -0,0 +1,158 @@
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from config.settings import Config
+
+# Shared by every session so the number of concurrent upstream calls stays bounded
+_executor = ThreadPoolExecutor(max_workers=Config.UPSTREAM_WORKERS, thread_name_prefix="upstream")
+_END = object()
+
+
+class PageTasks:
+    """Independent upstream calls issued by one page render.
+
+    Calls run concurrently on the shared executor while the script thread
+    renders. Results are handed back to the script thread, which is the only
+    place Streamlit elements are created, as soon as each call finishes.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = Config.UPSTREAM_CALL_TIMEOUT_SECONDS if timeout is None else timeout
+        self.cancelled = threading.Event()
+        self._ctx = get_script_run_ctx()
+        self._futures = []
+        self._callbacks = []
+
+    def _run(self, fn, args, kwargs):
+        if self.cancelled.is_set():
+            raise CancelledError()
+        # Lets st.warning/st.error inside service functions reach this session
+        add_script_run_ctx(threading.current_thread(), self._ctx)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            add_script_run_ctx(threading.current_thread(), None)
+
+    def submit(self, fn, *args, **kwargs):
+        """Start ``fn(*args, **kwargs)`` in the background and return its future"""
+        future = _executor.submit(self._run, fn, args, kwargs)
+        self._futures.append(future)
+        return future
+
+    def on_result(self, future, render, timeout=None, on_timeout=None):
+        """Call ``render(result)`` from the script thread once ``future`` is done.
+
+        ``render(None)`` is called instead if the call fails, or if it
+        exceeds its timeout and no ``on_timeout()`` callback is given.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        self._callbacks.append((future, render, deadline, on_timeout))
+
+    def render_ready(self):
+        """Run the render callbacks of every call that has finished or timed out"""
+        now = time.monotonic()
+        pending = []
+        for callback in self._callbacks:
+            future, render, deadline, on_timeout = callback
+            if future.done():
+                render(None if future.cancelled() or future.exception() else future.result())
+            elif now >= deadline:
+                future.cancel()
+                if on_timeout is not None:
+                    on_timeout()
+                else:
+                    render(None)
+            else:
+                pending.append(callback)
+        self._callbacks = pending
+
+    def render_all(self):
+        """Block until every registered callback has been rendered"""
+        while self._callbacks:
+            deadline = min(callback[2] for callback in self._callbacks)
+            futures = [callback[0] for callback in self._callbacks]
+            wait(futures, timeout=max(deadline - time.monotonic(), 0), return_when="FIRST_COMPLETED")
+            self.render_ready()
+
+    def stream(self, fn, *args, timeout=None, **kwargs):
+        """Run the generator ``fn(*args, **kwargs)`` in the background.
+
+        Returns a generator for ``st.write_stream`` that yields chunks as the
+        worker produces them. Other finished calls are rendered in between
+        chunks. ``timeout`` bounds the wait for each next chunk; when it runs
+        out the worker is told to stop and a truncation notice is yielded.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        chunks = queue.Queue()
+        stop = threading.Event()
+
+        def produce():
+            source = None
+            try:
+                source = fn(*args, **kwargs)
+                for chunk in source:
+                    if stop.is_set() or self.cancelled.is_set():
+                        break
+                    chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                # Releases the upstream call the generator is reading from
+                if source is not None:
+                    source.close()
+                chunks.put(_END)
+
+        self.submit(produce)
+
+        def consume():
+            deadline = time.monotonic() + timeout
+            while not self.cancelled.is_set():
+                self.render_ready()
+                try:
+                    chunk = chunks.get(timeout=0.1)
+                except queue.Empty:
+                    if time.monotonic() >= deadline:
+                        stop.set()
+                        yield f"\n\n*Answer cut short: no response for {timeout:g} seconds.*"
+                        return
+                    continue
+                if chunk is _END:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                deadline = time.monotonic() + timeout
+                yield chunk
+
+        return consume()
+
+    def cancel(self):
+        """Drop calls that have not started and stop streams that are running"""
+        self.cancelled.set()
+        for future in self._futures:
+            future.cancel()
+
+
+def start_page_tasks(session_state, timeout=None):
+    """Return a fresh ``PageTasks`` for this script run.
+
+    Calls left over from the session's previous run (for example after the
+    user navigated to another page) are cancelled first.
+    """
+    previous = session_state.get("_page_tasks")
+    if previous is not None:
+        previous.cancel()
+    tasks = PageTasks(timeout)
+    session_state["_page_tasks"] = tasks
+    return tasks
+
+
+def current_page_tasks(session_state):
+    """Return the ``PageTasks`` of the current script run, starting one if needed"""
+    tasks = session_state.get("_page_tasks")
+    if tasks is None:
+        tasks = start_page_tasks(session_state)
+    return tasks
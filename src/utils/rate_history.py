@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from config.settings import Config
+from utils import http_client
+from utils.history_store import EPOCH, get_history_store
+from utils.rate_store import PIVOT_CURRENCY, get_rate_store
+from utils.tracing import traced
+
+def fetch_day(date_str):
+    """Fetch the full USD rate table for one past day"""
+    url = f"{Config.EXCHANGE_RATE_API_URL}/historical/{date_str}?base={PIVOT_CURRENCY}"
+    response = http_client.get(url, upstream="exchange_rates", endpoint="historical")
+    data = response.json()
+    if data.get("result") != "success":
+        return None
+    return data["rates"]
+
+
+def fetch_missing_days(days):
+    """Fetch the given past days concurrently and import them into the history store.
+
+    Days that are already stored are skipped, so a warm range costs no HTTP
+    calls, and so are days before the store's EPOCH, which it cannot hold.
+    Returns the number of days fetched.
+    """
+    store = get_history_store()
+    missing = [day for day, present in zip(days, store.has_days(days)) if not present and day >= EPOCH]
+    if not missing:
+        return 0
+
+    def fetch_and_store(day):
+        try:
+            rates = fetch_day(day.isoformat())
+        except Exception:
+            return False
+        if not rates:
+            return False
+        store.add_day(day, rates)
+        return True
+
+    workers = min(Config.HISTORY_FETCH_WORKERS, len(missing))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(fetch_and_store, missing))
+
+
+@traced()
+def get_historical_rates(base_currency, target_currency, days=7):
+    """Get exchange rates for the past ``days`` days, oldest first.
+
+    Past days are served from the history store and fetched only if
+    missing; today's value comes from the live rate store.
+    """
+    today = date.today()
+    start = today - timedelta(days=days - 1)
+    past_days = [start + timedelta(days=i) for i in range(days - 1)]
+    fetch_missing_days(past_days)
+
+    dates, rates = get_history_store().series(base_currency, target_currency, start, today)
+    try:
+        rates[-1] = get_rate_store().snapshot().rate(base_currency, target_currency)
+    except Exception:
+        rates[-1] = np.nan
+
+    return [day.isoformat() for day in dates], [None if np.isnan(rate) else float(rate) for rate in rates]
@@ -0,0 +1,80 @@
+import logging
+import threading
+from datetime import date, timedelta
+
+from config.settings import Config
+from utils.rate_store import get_rate_store
+
+logger = logging.getLogger(__name__)
+
+
+class RateRefreshScheduler:
+    """Background thread that keeps rate data warm for the whole process.
+
+    Every ``interval`` seconds it fetches a new latest-rate table (published
+    to readers by the rate store's atomic snapshot swap) and makes sure the
+    last ``warm_days`` days of history are in the history store, so request
+    paths only ever read memory. At start only the latest rates are fetched;
+    the history is first warmed ``warm_delay`` seconds later, once the first
+    pages have rendered.
+    """
+
+    def __init__(self, interval=None, warm_days=None, store=None, warm_delay=None):
+        self.interval = Config.RATES_REFRESH_SECONDS if interval is None else interval
+        self.warm_days = Config.HISTORY_WARM_DAYS if warm_days is None else warm_days
+        self.warm_delay = Config.HISTORY_WARM_DELAY_SECONDS if warm_delay is None else warm_delay
+        self.store = store or get_rate_store()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rate-refresh", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        self.refresh_rates()
+        self.warm_history()
+
+    def refresh_rates(self):
+        try:
+            self.store.refresh()
+        except Exception:
+            logger.exception("Refreshing latest exchange rates failed")
+
+    def warm_history(self):
+        if self.warm_days:
+            # Imported here so starting the scheduler does not pull NumPy into cold start
+            from utils.rate_history import fetch_missing_days
+
+            today = date.today()
+            days = [today - timedelta(days=i) for i in range(1, self.warm_days + 1)]
+            try:
+                fetch_missing_days(days)
+            except Exception:
+                logger.exception("Warming the rate history cache failed")
+
+    def _run(self):
+        self.refresh_rates()
+        if self._stop.wait(self.warm_delay):
+            return
+        self.warm_history()
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def ensure_scheduler_started():
+    """Start the process-wide scheduler on first call; later calls do nothing"""
+    global _scheduler
+    if not Config.RATES_REFRESH_SECONDS:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RateRefreshScheduler()
+            _scheduler.start()
+    return _scheduler
@@ -0,0 +1,168 @@
+import threading
+import time
+
+from config.settings import Config
+from utils import http_client
+from utils.shared_cache import get_shared_cache
+
+# All tables are stored against USD and other bases are derived by cross-rate division
+PIVOT_CURRENCY = "USD"
+
+
+def fetch_latest_rates():
+    """Fetch the latest USD rate table from the exchange rate API"""
+    url = f"{Config.EXCHANGE_RATE_API_URL}/latest/{PIVOT_CURRENCY}"
+    response = http_client.get(url, upstream="exchange_rates", endpoint="latest")
+    data = response.json()
+    if data.get("result") != "success":
+        raise RuntimeError(f"Exchange rate API returned {data.get('result')!r}")
+    return data["rates"]
+
+
+def fetch_shared_latest_rates():
+    """Latest USD rate table and when it was fetched, as ``(rates, as_of)``.
+
+    Fetched by one worker process per host and shared with the others; the
+    fetch time travels with the table so a copy read from the shared cache
+    is not mistaken for a new one.
+    """
+    entry = get_shared_cache().fetch_once(
+        "rates", f"table:{PIVOT_CURRENCY}", lambda: {"rates": fetch_latest_rates(), "as_of": time.time()}
+    )
+    return entry["rates"], entry["as_of"]
+
+
+class RateSnapshot:
+    """Immutable view of one USD rate table.
+
+    ``stale`` is set when the table is being served after a failed refresh.
+    ``version`` increases by one every time a new table is fetched.
+    ``as_of`` is the wall-clock time the table was fetched from the API.
+    """
+
+    __slots__ = ("rates", "fetched_at", "checked_at", "stale", "version", "as_of", "_by_base", "_matrix", "_previous_matrix")
+
+    def __init__(self, rates, fetched_at, checked_at=None, stale=False, version=0, as_of=None, previous_matrix=None):
+        self.rates = rates
+        self.fetched_at = fetched_at
+        self.checked_at = fetched_at if checked_at is None else checked_at
+        self.stale = stale
+        self.version = version
+        self.as_of = time.time() if as_of is None else as_of
+        self._by_base = {}
+        self._matrix = None
+        self._previous_matrix = previous_matrix
+
+    def rate(self, base_currency, target_currency):
+        """Return how many units of ``target_currency`` one ``base_currency`` buys"""
+        try:
+            return self.rates[target_currency] / self.rates[base_currency]
+        except KeyError as e:
+            raise ValueError(f"Currency '{e.args[0]}' not found.") from None
+
+    def rates_for(self, base_currency):
+        """Return the full rate table re-based on ``base_currency``"""
+        table = self._by_base.get(base_currency)
+        if table is None:
+            if base_currency not in self.rates:
+                raise ValueError(f"Currency '{base_currency}' not found.")
+            base_rate = self.rates[base_currency]
+            table = {code: rate / base_rate for code, rate in self.rates.items()}
+            self._by_base[base_currency] = table
+        return table
+
+    def currencies(self):
+        return list(self.rates.keys())
+
+    def cross_rates(self):
+        """Return the all-pairs ``CrossRateMatrix`` for this table, built on first use"""
+        if self._matrix is None:
+            # NumPy is only needed once a page asks for the matrix
+            from utils.cross_rates import CrossRateMatrix
+
+            previous = self._previous_matrix
+            self._matrix = previous.updated(self.rates) if previous is not None else CrossRateMatrix(self.rates)
+            self._previous_matrix = None
+        return self._matrix
+
+    def mark_stale(self, checked_at):
+        """Return a copy of this snapshot flagged as stale"""
+        snapshot = RateSnapshot(self.rates, self.fetched_at, checked_at, stale=True, version=self.version, as_of=self.as_of)
+        snapshot._by_base = self._by_base
+        snapshot._matrix = self._matrix
+        snapshot._previous_matrix = self._previous_matrix
+        return snapshot
+
+
+class RateStore:
+    """Process-wide, TTL-cached exchange rate table.
+
+    Only one caller refreshes at a time; while a refresh is in flight other
+    callers keep reading the previous snapshot instead of hitting the API.
+    Snapshots are immutable and replaced by a single reference swap, so
+    readers never take a lock. ``fetch()`` returns ``(rates, as_of)``.
+    """
+
+    def __init__(self, fetch=fetch_shared_latest_rates, ttl=None, retry_after=None):
+        self._fetch = fetch
+        self._ttl = Config.RATES_TTL_SECONDS if ttl is None else ttl
+        self._retry_after = Config.RATES_RETRY_SECONDS if retry_after is None else retry_after
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+
+    def _is_fresh(self, snapshot, now):
+        if snapshot is None:
+            return False
+        max_age = self._retry_after if snapshot.stale else self._ttl
+        return now - snapshot.checked_at < max_age
+
+    def snapshot(self):
+        """Return the current snapshot, refreshing it if the TTL has expired"""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot, time.monotonic()):
+            return snapshot
+
+        # Somebody else is already refreshing: serve what we have if we can
+        if not self._refresh_lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            return self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def refresh(self):
+        """Fetch a new table now, regardless of the TTL"""
+        with self._refresh_lock:
+            return self._refresh(force=True)
+
+    def _refresh(self, force=False):
+        current = self._snapshot
+        now = time.monotonic()
+        if not force and self._is_fresh(current, now):
+            return current
+
+        try:
+            rates, as_of = self._fetch()
+        except Exception:
+            if current is None:
+                raise
+            self._snapshot = current.mark_stale(now)
+            return self._snapshot
+
+        version = current.version + 1 if current is not None else 1
+        # Lets the next matrix patch only the currencies that moved
+        previous_matrix = current._matrix if current is not None else None
+        self._snapshot = RateSnapshot(rates, now, version=version, as_of=as_of, previous_matrix=previous_matrix)
+        return self._snapshot
+
+    def invalidate(self):
+        """Force the next read to refresh from the API"""
+        self._snapshot = None
+
+
+_store = RateStore()
+
+
+def get_rate_store():
+    """Return the rate store shared by every session in this process"""
+    return _store
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import Config
+from utils.shared_cache import get_shared_cache
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace and case so trivially different prompts share a key"""
+    return " ".join(prompt.split()).casefold()
+
+
+def make_cache_key(prompt, model, parameters):
+    """Content address for a prompt and the generation settings used to answer it"""
+    material = json.dumps(
+        {"prompt": normalize_prompt(prompt), "model": model, "parameters": parameters},
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache for AI responses: an in-memory LRU over the shared cache.
+
+    The shared tier (``utils.shared_cache``, namespace ``ai``, which applies
+    its own TTL) is seen by every worker process on the host, so an answer
+    generated in one worker is reused by the others. Memory entries older
+    than ``ttl`` seconds are misses.
+    """
+
+    def __init__(self, shared=None, memory_entries=None, ttl=None):
+        self.shared = shared or get_shared_cache()
+        self.memory_entries = Config.AI_CACHE_MEMORY_ENTRIES if memory_entries is None else memory_entries
+        self.ttl = Config.AI_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached response for ``key`` or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            self._memory.pop(key, None)
+
+        value = self.shared.get_json("ai", key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self._remember(key, value, now)
+            self.shared_hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value, time.time())
+        self.shared.set_json("ai", key, value)
+
+    def fetch_once(self, key, fetch):
+        """Return the response for ``key``, generating it with ``fetch()`` in one worker process at a time"""
+        value = self.shared.fetch_once("ai", key, fetch)
+        with self._lock:
+            self._remember(key, value, time.time())
+        return value
+
+    def stats(self):
+        lookups = self.memory_hits + self.shared_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.shared_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the response cache shared by every session in this process"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+    return _cache
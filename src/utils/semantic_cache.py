@@ -0,0 +1,215 @@
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from config.settings import Config
+
+# Width of the hashed feature space; short travel questions rarely collide at this size
+DIMENSIONS = 1024
+
+# Weight of a whole word relative to each of its character trigrams
+WORD_WEIGHT = 2.0
+
+STOPWORDS = frozenset("""
+a an and any are as at be best can could do does for from give good how i in is it me my of on or
+please should some suggest tell the there things to top what when where which while with would you your
+""".split())
+
+# Words that change the phrasing of a question but not what is being asked
+FILLER_WORDS = frozenset("""
+advice guide help idea ideas list need recommend recommendation recommendations tip tips trip travel
+travelling traveling visit visiting
+""".split())
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def content_words(text):
+    """Lower-cased words of ``text`` without stopwords"""
+    return [word for word in _TOKEN.findall(text.casefold()) if word not in STOPWORDS]
+
+
+def _trigrams(word):
+    padded = f"<{word}>"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def embed(text):
+    """Hashed word + character-trigram vector of ``text``, L2-normalised.
+
+    Trigrams let inflections ("pack"/"packing") share most of their mass;
+    crc32 keeps the hashing stable across processes.
+    """
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for word in content_words(text):
+        for feature, weight in [(word, WORD_WEIGHT), *((gram, 1.0) for gram in _trigrams(word))]:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            vector[digest % DIMENSIONS] += weight if digest & 0x80000000 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def stem(word):
+    """Strip a plural or verb ending: "cities" -> "city", "packing" -> "pack", "beaches" -> "beach".
+
+    Deliberately crude; it only has to agree with itself. A stem shorter
+    than three letters keeps the whole word, so "bus" stays "bus".
+    """
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if not word.endswith(suffix):
+            continue
+        base = word[:-len(suffix)] + replacement
+        if len(base) < 3:
+            break
+        if suffix == "es" and not base.endswith(("s", "x", "z", "ch", "sh")):
+            # "tomes" -> "tome", not "tom"
+            base = word[:-1]
+        elif suffix == "s" and base.endswith(("s", "u")):
+            # "pass", "bus" and "campus" are not plurals
+            break
+        elif suffix in ("ing", "ed") and len(base) > 3 and base[-1] == base[-2] and base[-1] not in "lsz":
+            # "shopping" -> "shop"
+            base = base[:-1]
+        return base
+    return word
+
+
+def same_subject(words, other_words):
+    """True when every content word on either side is matched on the other.
+
+    A word is matched by a word with the same ``stem`` or is a filler
+    word. This rejects near neighbours that differ only in a place or
+    number, such as "3 days in Rome" against "3 days in Paris", including
+    places whose names contain one another ("Niger" and "Nigeria").
+    Numbers must also come in the same order: "2 travelers for 7 days" is
+    not "7 travelers for 2 days".
+    """
+    if [word for word in words if word.isdigit()] != [word for word in other_words if word.isdigit()]:
+        return False
+    stems, other_stems = {stem(word) for word in words}, {stem(word) for word in other_words}
+    return all(
+        word in FILLER_WORDS or stem(word) in theirs
+        for mine, theirs in ((set(words), other_stems), (set(other_words), stems))
+        for word in mine
+    )
+
+
+class SemanticCache:
+    """In-process nearest-neighbour cache for paraphrased prompts.
+
+    Entries live in fixed-size NumPy arrays. Lookups only compare against
+    entries in the same partition (caller-supplied, e.g. template topic plus
+    generation settings), take the best cosine similarity above
+    ``threshold`` and then check ``same_subject``. When full, the least
+    recently used (``policy="lru"``) or least frequently used
+    (``policy="lfu"``) entry is replaced.
+    """
+
+    def __init__(self, capacity=None, threshold=None, policy=None, ttl=None):
+        self.capacity = Config.SEMANTIC_CACHE_ENTRIES if capacity is None else capacity
+        self.threshold = Config.SEMANTIC_CACHE_THRESHOLD if threshold is None else threshold
+        self.policy = policy or Config.SEMANTIC_CACHE_POLICY
+        if self.policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy '{self.policy}'.")
+        self.ttl = Config.AI_CACHE_TTL_SECONDS if ttl is None else ttl
+
+        self._vectors = np.zeros((self.capacity, DIMENSIONS), dtype=np.float32)
+        self._partitions = np.full(self.capacity, -1, dtype=np.int64)
+        self._created = np.zeros(self.capacity)
+        self._last_used = np.zeros(self.capacity)
+        self._uses = np.zeros(self.capacity, dtype=np.int64)
+        self._words = [None] * self.capacity
+        self._values = [None] * self.capacity
+        self._partition_ids = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.evictions = 0
+        self._hit_similarity = 0.0
+
+    def _partition_id(self, partition):
+        return self._partition_ids.setdefault(partition, len(self._partition_ids))
+
+    def get(self, prompt, partition=None):
+        """Return the answer cached for a prompt similar to ``prompt`` or None"""
+        vector = embed(prompt)
+        words = content_words(prompt)
+        now = time.time()
+        with self._lock:
+            partition_id = self._partition_ids.get(partition)
+            if partition_id is None or not vector.any():
+                self.misses += 1
+                return None
+
+            candidates = (self._partitions == partition_id) & (now - self._created < self.ttl)
+            scores = np.where(candidates, self._vectors @ vector, -1.0)
+            # A few best candidates, most similar first, so a subject mismatch can fall through
+            for slot in np.argsort(scores)[::-1][:4]:
+                if scores[slot] < self.threshold:
+                    break
+                if not same_subject(words, self._words[slot]):
+                    self.rejected += 1
+                    continue
+                self._last_used[slot] = now
+                self._uses[slot] += 1
+                self.hits += 1
+                self._hit_similarity += float(scores[slot])
+                return self._values[slot]
+
+            self.misses += 1
+            return None
+
+    def put(self, prompt, value, partition=None):
+        vector = embed(prompt)
+        if not vector.any():
+            return
+        now = time.time()
+        with self._lock:
+            partition_id = self._partition_id(partition)
+            free = np.flatnonzero((self._partitions < 0) | (now - self._created >= self.ttl))
+            if len(free):
+                slot = free[0]
+            else:
+                if self.policy == "lfu":
+                    slot = np.lexsort((self._last_used, self._uses))[0]
+                else:
+                    slot = np.argmin(self._last_used)
+                self.evictions += 1
+
+            self._vectors[slot] = vector
+            self._partitions[slot] = partition_id
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._uses[slot] = 0
+            self._words[slot] = content_words(prompt)
+            self._values[slot] = value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "mean_hit_similarity": self._hit_similarity / self.hits if self.hits else 0.0,
+            "entries": int((self._partitions >= 0).sum()),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """Return the semantic cache shared by every session in this process"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache()
+    return _cache
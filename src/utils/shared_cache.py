@@ -0,0 +1,433 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from urllib.parse import urlsplit
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+# How long a worker may hold the fetch lock for a key before others stop waiting for it;
+# longer than the slowest fetch, an AI generation bounded by the dispatcher's timeout
+LOCK_SECONDS = Config.UPSTREAM_CALL_TIMEOUT_SECONDS * 2 + 10
+LOCK_POLL_SECONDS = 0.05
+
+
+class CachePolicy:
+    """TTL and total size limit of one cache namespace"""
+
+    def __init__(self, ttl, max_bytes):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+
+def _rates_ttl():
+    # A shared table must not outlive one scheduler interval, or refreshes would keep rereading it
+    if Config.RATES_REFRESH_SECONDS:
+        return min(Config.RATES_TTL_SECONDS, Config.RATES_REFRESH_SECONDS)
+    return Config.RATES_TTL_SECONDS
+
+
+NAMESPACES = {
+    "rates": CachePolicy(ttl=_rates_ttl(), max_bytes=Config.SHARED_CACHE_RATES_MAX_BYTES),
+    "weather": CachePolicy(ttl=Config.WEATHER_TTL_SECONDS, max_bytes=Config.SHARED_CACHE_WEATHER_MAX_BYTES),
+    "ai": CachePolicy(ttl=Config.AI_CACHE_TTL_SECONDS, max_bytes=Config.SHARED_CACHE_AI_MAX_BYTES),
+}
+
+
+class CacheBackend:
+    """Byte-string cache with per-namespace TTLs and size limits.
+
+    Subclasses store the bytes (``_get``, ``_set``, ``_add``, ``_delete``,
+    ``_delete_if``);
+    this class adds the policies, JSON helpers, a cross-process fetch lock
+    and hit counters. Backend failures are counted and treated as misses,
+    so an unreachable cache only costs the upstream calls it would have
+    saved.
+    """
+
+    def __init__(self, namespaces=None):
+        self.namespaces = NAMESPACES if namespaces is None else namespaces
+        self._stats_lock = threading.Lock()
+        self._counts = Counter()
+
+    def policy(self, namespace):
+        return self.namespaces[namespace]
+
+    def _count(self, namespace, counter):
+        with self._stats_lock:
+            self._counts[namespace, counter] += 1
+
+    def _failed(self, action, namespace, error):
+        self._count(namespace, "errors")
+        logger.warning("Shared cache %s failed for namespace %r: %s", action, namespace, error)
+
+    def get(self, namespace, key):
+        """Return the bytes stored under ``key`` or None"""
+        try:
+            value = self._get(namespace, key)
+        except Exception as e:
+            self._failed("get", namespace, e)
+            return None
+        self._count(namespace, "hits" if value is not None else "misses")
+        return value
+
+    def set(self, namespace, key, value):
+        policy = self.policy(namespace)
+        if len(value) > policy.max_bytes:
+            return
+        try:
+            self._set(namespace, key, value, policy)
+        except Exception as e:
+            self._failed("set", namespace, e)
+
+    def add(self, namespace, key, value, ttl):
+        """Store ``value`` only if ``key`` is absent; True if it was stored"""
+        try:
+            return self._add(namespace, key, value, ttl)
+        except Exception as e:
+            self._failed("add", namespace, e)
+            return False
+
+    def delete(self, namespace, key):
+        try:
+            self._delete(namespace, key)
+        except Exception as e:
+            self._failed("delete", namespace, e)
+
+    def get_json(self, namespace, key):
+        value = self.get(namespace, key)
+        return None if value is None else json.loads(value)
+
+    def set_json(self, namespace, key, value):
+        self.set(namespace, key, json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+    def _lock_key(self, namespace, lock, token):
+        """True if the fetch lock was taken, False if another worker holds it, None if the backend failed"""
+        try:
+            return self._add(namespace, lock, token, LOCK_SECONDS)
+        except Exception as e:
+            self._failed("add", namespace, e)
+            return None
+
+    def _unlock_key(self, namespace, lock, token):
+        """Release the fetch lock unless it expired and another worker has taken it since"""
+        try:
+            self._delete_if(namespace, lock, token)
+        except Exception as e:
+            self._failed("delete", namespace, e)
+
+    def fetch_once(self, namespace, key, fetch):
+        """Return the JSON value under ``key``, calling ``fetch()`` in one worker at a time.
+
+        Workers that find another one already fetching wait up to
+        ``LOCK_SECONDS`` for its result instead of calling the upstream
+        themselves; if it never arrives, or the backend cannot be reached,
+        they fetch on their own.
+        """
+        value = self.get_json(namespace, key)
+        if value is not None:
+            return value
+
+        lock = f"{key}:lock"
+        token = uuid.uuid4().hex.encode("ascii")
+        deadline = time.monotonic() + LOCK_SECONDS
+        locked = self._lock_key(namespace, lock, token)
+        while locked is False and time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_SECONDS)
+            value = self.get_json(namespace, key)
+            if value is not None:
+                return value
+            locked = self._lock_key(namespace, lock, token)
+        try:
+            if locked:
+                # The previous holder may have stored the value and released the lock since the first lookup
+                value = self.get_json(namespace, key)
+                if value is not None:
+                    return value
+            value = fetch()
+            self.set_json(namespace, key, value)
+            return value
+        finally:
+            if locked:
+                self._unlock_key(namespace, lock, token)
+
+    def stats(self):
+        """Return ``{namespace: counters}`` plus the backend's name"""
+        stats = {"backend": type(self).__name__}
+        with self._stats_lock:
+            for namespace in self.namespaces:
+                hits, misses = self._counts[namespace, "hits"], self._counts[namespace, "misses"]
+                stats[namespace] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "errors": self._counts[namespace, "errors"],
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                }
+        return stats
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU; nothing is shared between workers"""
+
+    def __init__(self, namespaces=None):
+        super().__init__(namespaces)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._bytes = {}
+
+    def _namespace(self, namespace):
+        if namespace not in self._entries:
+            self._entries[namespace] = OrderedDict()
+            self._bytes[namespace] = 0
+        return self._entries[namespace]
+
+    def _pop(self, namespace, key):
+        entry = self._namespace(namespace).pop(key, None)
+        if entry is not None:
+            self._bytes[namespace] -= len(entry[1])
+        return entry
+
+    def _get(self, namespace, key):
+        with self._lock:
+            entries = self._namespace(namespace)
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._pop(namespace, key)
+                return None
+            entries.move_to_end(key)
+            return entry[1]
+
+    def _store(self, namespace, key, value, ttl, max_bytes):
+        self._pop(namespace, key)
+        entries = self._namespace(namespace)
+        entries[key] = (time.time() + ttl, value)
+        self._bytes[namespace] += len(value)
+        while self._bytes[namespace] > max_bytes:
+            _, (_, evicted) = entries.popitem(last=False)
+            self._bytes[namespace] -= len(evicted)
+
+    def _set(self, namespace, key, value, policy):
+        with self._lock:
+            self._store(namespace, key, value, policy.ttl, policy.max_bytes)
+
+    def _add(self, namespace, key, value, ttl):
+        with self._lock:
+            entry = self._namespace(namespace).get(key)
+            if entry is not None and entry[0] > time.time():
+                return False
+            self._store(namespace, key, value, ttl, self.policy(namespace).max_bytes)
+            return True
+
+    def _delete(self, namespace, key):
+        with self._lock:
+            self._pop(namespace, key)
+
+    def _delete_if(self, namespace, key, value):
+        with self._lock:
+            entry = self._namespace(namespace).get(key)
+            if entry is not None and entry[1] == value:
+                self._pop(namespace, key)
+
+
+class SQLiteBackend(CacheBackend):
+    """One SQLite file in WAL mode, shared by every worker process on the host.
+
+    WAL lets readers in all processes proceed while one of them writes.
+    When a namespace grows past its size limit the oldest entries go first.
+    """
+
+    def __init__(self, path=None, namespaces=None):
+        super().__init__(namespaces)
+        self.path = path or os.path.join(Config.CACHE_DIR, "shared_cache.sqlite3")
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+            "size INTEGER NOT NULL, stored REAL NOT NULL, expires REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._db.commit()
+
+    def _get(self, namespace, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires > ?", (namespace, key, time.time())
+            ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def _set(self, namespace, key, value, policy):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, value, len(value), now, now + policy.ttl),
+            )
+            self._db.execute("DELETE FROM entries WHERE namespace = ? AND expires <= ?", (namespace, now))
+            excess = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?", (namespace,)
+            ).fetchone()[0] - policy.max_bytes
+            if excess > 0:
+                evicted = []
+                for old_key, size in self._db.execute(
+                    "SELECT key, size FROM entries WHERE namespace = ? ORDER BY stored", (namespace,)
+                ):
+                    if excess <= 0:
+                        break
+                    evicted.append((namespace, old_key))
+                    excess -= size
+                self._db.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", evicted)
+
+    def _add(self, namespace, key, value, ttl):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries WHERE namespace = ? AND key = ? AND expires <= ?", (namespace, key, now))
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, value, len(value), now, now + ttl),
+            )
+            return cursor.rowcount == 1
+
+    def _delete(self, namespace, key):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def _delete_if(self, namespace, key, value):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries WHERE namespace = ? AND key = ? AND value = ?", (namespace, key, value))
+
+
+class RedisError(Exception):
+    """The Redis server answered a command with an error"""
+
+
+# Deletes KEYS[1] only while it still holds ARGV[1], in one atomic step
+DELETE_IF_SCRIPT = 'if redis.call("GET", KEYS[1]) == ARGV[1] then return redis.call("DEL", KEYS[1]) end return 0'
+
+
+class RedisBackend(CacheBackend):
+    """Minimal RESP client for a Redis server shared by several hosts.
+
+    Keys are ``<prefix>:<namespace>:<key>`` and expire through ``PX``.
+    Redis has no per-prefix memory limit, so a namespace's size limit is
+    applied per value here and the server's ``maxmemory`` policy bounds
+    the total.
+    """
+
+    def __init__(self, url=None, namespaces=None, prefix="travel-buddy", timeout=2.0):
+        super().__init__(namespaces)
+        parts = urlsplit(url or Config.SHARED_CACHE_REDIS_URL)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.database = int(parts.path.strip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._socket = None
+        self._reader = None
+
+    def _connect(self):
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._socket.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.database:
+            self._send("SELECT", self.database)
+
+    def _close(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+        self._socket = self._reader = None
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            raise RedisError(payload.decode("utf-8"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply {line!r}")
+
+    def _send(self, *args):
+        parts = [f"*{len(args)}\r\n".encode("ascii")]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._socket.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def command(self, *args):
+        """Send one command and return its decoded reply, reconnecting once on a dropped connection"""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._socket is None:
+                        self._connect()
+                    return self._send(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def _key(self, namespace, key):
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _get(self, namespace, key):
+        return self.command("GET", self._key(namespace, key))
+
+    def _set(self, namespace, key, value, policy):
+        self.command("SET", self._key(namespace, key), value, "PX", int(policy.ttl * 1000))
+
+    def _add(self, namespace, key, value, ttl):
+        return self.command("SET", self._key(namespace, key), value, "PX", int(ttl * 1000), "NX") == "OK"
+
+    def _delete(self, namespace, key):
+        self.command("DEL", self._key(namespace, key))
+
+    def _delete_if(self, namespace, key, value):
+        self.command("EVAL", DELETE_IF_SCRIPT, 1, self._key(namespace, key), value)
+
+
+BACKENDS = {"memory": MemoryBackend, "sqlite": SQLiteBackend, "redis": RedisBackend}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Return the backend chosen by ``Config.SHARED_CACHE_BACKEND`` for this process"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if Config.SHARED_CACHE_BACKEND not in BACKENDS:
+                raise ValueError(
+                    f"Unknown SHARED_CACHE_BACKEND {Config.SHARED_CACHE_BACKEND!r}; use one of {', '.join(BACKENDS)}"
+                )
+            _cache = BACKENDS[Config.SHARED_CACHE_BACKEND]()
+    return _cache
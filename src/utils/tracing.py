@@ -0,0 +1,298 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from config.settings import Config
+from utils import http_client
+from utils.http_client import EndpointStats
+
+# Per-rerun traces kept for this many sessions
+MAX_TRACED_SESSIONS = 256
+
+_NULL_SPAN = nullcontext()
+_lock = threading.Lock()
+_stats = {}
+_reruns = OrderedDict()
+
+
+class RerunTrace:
+    """Time spent per span name during one script rerun of one session"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.spans = {}
+
+    def add(self, name, seconds):
+        count, total = self.spans.get(name, (0, 0.0))
+        self.spans[name] = (count + 1, total + seconds)
+
+    @property
+    def seconds(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+
+def record(name, seconds):
+    """Add one timing to the process-wide histogram and the current rerun's trace"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = EndpointStats()
+        stats.observe(seconds)
+        trace = _reruns.get(ctx.session_id) if ctx is not None else None
+        if trace is not None:
+            trace.add(name, seconds)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def span(name):
+    """Context manager timing a block as ``name``; a shared no-op when tracing is off"""
+    return _Span(name) if Config.TRACING else _NULL_SPAN
+
+
+def traced(name=None):
+    """Decorator timing every call as a span named ``name`` (default: the function name).
+
+    Generator functions are timed until they are exhausted, which includes
+    the time the consumer spends between items. With tracing off the
+    function is returned unchanged.
+    """
+    def decorate(fn):
+        if not Config.TRACING:
+            return fn
+        label = name or fn.__name__
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with _Span(label):
+                    yield from fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with _Span(label):
+                    return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def begin_rerun():
+    """Start collecting spans for the current session's rerun"""
+    ctx = get_script_run_ctx()
+    if not Config.TRACING or ctx is None:
+        return
+    with _lock:
+        _reruns[ctx.session_id] = RerunTrace()
+        _reruns.move_to_end(ctx.session_id)
+        while len(_reruns) > MAX_TRACED_SESSIONS:
+            _reruns.popitem(last=False)
+
+
+def end_rerun():
+    """Finish the current session's rerun trace and return it (None when tracing is off)"""
+    ctx = get_script_run_ctx()
+    if not Config.TRACING or ctx is None:
+        return None
+    with _lock:
+        trace = _reruns.get(ctx.session_id)
+    if trace is not None and trace.finished is None:
+        trace.finished = time.perf_counter()
+        record("rerun", trace.seconds)
+    return trace
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(metric, label, series):
+    lines = []
+    for key, stats in sorted(series.items()):
+        cumulative = 0
+        for bound, count in stats["buckets"].items():
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{metric}_bucket{{{label}="{_escape(key)}",le="{le}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{{label}="{_escape(key)}"}} {stats["total_seconds"]}')
+        lines.append(f'{metric}_count{{{label}="{_escape(key)}"}} {stats["count"]}')
+    return lines
+
+
+def prometheus_text():
+    """Span and HTTP metrics in the Prometheus text exposition format"""
+    with _lock:
+        spans = {name: stats.as_dict() for name, stats in _stats.items()}
+    endpoints = http_client.get_metrics()
+
+    lines = [
+        "# HELP travel_buddy_span_seconds Time spent in traced functions and reruns.",
+        "# TYPE travel_buddy_span_seconds histogram",
+        *_histogram_lines("travel_buddy_span_seconds", "span", spans),
+        "# HELP travel_buddy_http_request_seconds Upstream HTTP request latency.",
+        "# TYPE travel_buddy_http_request_seconds histogram",
+        *_histogram_lines("travel_buddy_http_request_seconds", "endpoint", endpoints),
+        "# HELP travel_buddy_http_errors_total Upstream HTTP errors by status code or exception.",
+        "# TYPE travel_buddy_http_errors_total counter",
+    ]
+    for endpoint, stats in sorted(endpoints.items()):
+        for error, count in sorted(stats["errors"].items()):
+            lines.append(f'travel_buddy_http_errors_total{{endpoint="{_escape(endpoint)}",error="{_escape(error)}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_snapshot(path=None):
+    """Atomically write ``prometheus_text()`` to ``path`` (default ``Config.METRICS_PATH``)"""
+    path = path or Config.METRICS_PATH
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_metrics_server = None
+
+
+def ensure_metrics_server():
+    """Serve ``/metrics`` on ``Config.METRICS_PORT`` once per process (0 disables it)"""
+    global _metrics_server
+    if not Config.METRICS_PORT:
+        return None
+    with _lock:
+        if _metrics_server is None:
+            _metrics_server = ThreadingHTTPServer(("127.0.0.1", Config.METRICS_PORT), _MetricsHandler)
+            _metrics_server.daemon_threads = True
+            threading.Thread(target=_metrics_server.serve_forever, name="metrics", daemon=True).start()
+    return _metrics_server
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval.
+
+    ``folded()`` returns the samples in the folded-stack format read by
+    flamegraph.pl, speedscope and inferno: one ``thread;frame;frame count``
+    line per distinct stack.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = (Config.PROFILE_INTERVAL_MS if interval is None else interval) / 1000
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+_profiler = None
+
+
+def start_profiler():
+    global _profiler
+    with _lock:
+        if _profiler is None:
+            _profiler = SamplingProfiler()
+            _profiler.start()
+    return _profiler
+
+
+def stop_profiler(path=None):
+    """Stop the running profiler, write its folded stacks and return the file path"""
+    global _profiler
+    with _lock:
+        profiler, _profiler = _profiler, None
+    if profiler is None:
+        return None
+    profiler.stop()
+    path = path or os.path.join(Config.CACHE_DIR, "profiles", time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(profiler.folded())
+    return path
+
+
+def render_debug_panel(trace):
+    """Sidebar with this rerun's span timings, the profiler switch and a metrics snapshot"""
+    import streamlit as st
+
+    with st.sidebar.expander("Debug: performance", expanded=False):
+        if trace is None:
+            st.caption("Set TRACING=True to collect span timings.")
+        else:
+            st.markdown(f"**Last rerun:** {trace.seconds * 1000:.0f} ms")
+            rows = sorted(trace.spans.items(), key=lambda item: item[1][1], reverse=True)
+            st.table([{"Span": name, "Calls": count, "Total (ms)": round(total * 1000, 1)} for name, (count, total) in rows])
+
+        profiling = st.toggle("Sampling profiler", value=_profiler is not None, key="debug_profiler")
+        if profiling and _profiler is None:
+            start_profiler()
+        elif not profiling and _profiler is not None:
+            st.session_state.debug_profile_path = stop_profiler()
+        path = st.session_state.get("debug_profile_path")
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                st.download_button("Download folded stacks", f.read(), file_name=os.path.basename(path))
+
+        st.download_button("Download metrics snapshot", prometheus_text(), file_name="metrics.prom")
@@ -0,0 +1,185 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from config.settings import Config
+from utils.ai_service import build_inference_request, stream_ai_recommendation
+from utils.inference_dispatcher import get_inference_dispatcher
+from utils.tracing import traced
+
+# A sentence runs to terminal punctuation followed by whitespace, to CJK terminal punctuation,
+# or to the end of its line; group 2 is the whitespace that follows it
+_SENTENCE = re.compile(r"(.+?(?:[.!?]+(?=\s|$)|[。！？]+|(?=\n)|$))(\s*)", re.S)
+_NUMBERED_LINE = re.compile(r"^\s*(\d+)[.):]\s*(.*)$")
+
+# Room for translated text, which is often longer than its source
+BATCH_MAX_NEW_TOKENS = 1000
+
+
+def split_segments(text):
+    """Yield ``(sentence, whitespace)`` pairs; joining them gives back ``text`` minus leading whitespace.
+
+    Abbreviations such as "Mr." end a segment too, which only costs a
+    slightly smaller translation unit.
+    """
+    for match in _SENTENCE.finditer(text.lstrip()):
+        yield match.group(1), match.group(2)
+
+
+def segment_key(segment):
+    return " ".join(segment.split())
+
+
+class TranslationMemory:
+    """Persistent store of translated sentences per language pair"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(Config.CACHE_DIR, "translation_memory.sqlite3")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS segments (source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, "
+            "segment TEXT NOT NULL, translation TEXT NOT NULL, created REAL NOT NULL, "
+            "PRIMARY KEY (source_lang, target_lang, segment))"
+        )
+        self._db.commit()
+
+    def lookup(self, source_lang, target_lang, segments):
+        """Return ``{segment: translation}`` for the segments already translated"""
+        keys = list({segment_key(segment) for segment in segments})
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT segment, translation FROM segments WHERE source_lang = ? AND target_lang = ? "
+                    f"AND segment IN ({','.join('?' * len(chunk))})",
+                    (source_lang, target_lang, *chunk),
+                ).fetchall()
+                found.update(rows)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return {segment: found[segment_key(segment)] for segment in segments if segment_key(segment) in found}
+
+    def store(self, source_lang, target_lang, translations):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?)",
+                [(source_lang, target_lang, segment_key(segment), translation, now) for segment, translation in translations.items()],
+            )
+            self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    """Return the translation memory shared by every session in this process"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory()
+    return _memory
+
+
+def _generate(prompt, max_new_tokens):
+    url, headers, payload = build_inference_request(prompt)
+    payload["parameters"]["max_new_tokens"] = max_new_tokens
+    return get_inference_dispatcher().generate(url, headers, payload)
+
+
+def _translate_one(segment, source_lang, target_lang):
+    prompt = (
+        f"Translate the following text from {source_lang} to {target_lang}. "
+        f"Reply with the translation only.\n\n{segment}"
+    )
+    return _generate(prompt, BATCH_MAX_NEW_TOKENS).strip()
+
+
+def translate_segments(segments, source_lang, target_lang):
+    """Translate distinct ``segments`` with one numbered-list request.
+
+    Segments missing from the model's answer are translated one by one.
+    """
+    if len(segments) == 1:
+        return {segments[0]: _translate_one(segments[0], source_lang, target_lang)}
+
+    numbered = "\n".join(f"{i}. {segment_key(segment)}" for i, segment in enumerate(segments, 1))
+    prompt = (
+        f"Translate each numbered line from {source_lang} to {target_lang}. Reply with the same numbers, "
+        f"one translated line per number, and nothing else.\n\n{numbered}"
+    )
+    translated = {}
+    for line in _generate(prompt, BATCH_MAX_NEW_TOKENS).splitlines():
+        match = _NUMBERED_LINE.match(line)
+        if match and 1 <= int(match.group(1)) <= len(segments) and match.group(2).strip():
+            translated[segments[int(match.group(1)) - 1]] = match.group(2).strip()
+
+    for segment in segments:
+        if segment not in translated:
+            translated[segment] = _translate_one(segment, source_lang, target_lang)
+    return translated
+
+
+def _windows(text, max_chars):
+    """Group consecutive segments into windows of about ``max_chars`` characters"""
+    window, size = [], 0
+    for segment, whitespace in split_segments(text):
+        window.append((segment, whitespace))
+        size += len(segment)
+        if size >= max_chars:
+            yield window
+            window, size = [], 0
+    if window:
+        yield window
+
+
+@traced()
+def translate_stream(text, source_lang, target_lang, max_chars=None):
+    """Yield the translation of ``text`` piece by piece, in order.
+
+    The text is handled one window of sentences at a time: sentences found
+    in the translation memory are yielded straight away, the rest of the
+    window is sent upstream as one batch and stored in the memory.
+    """
+    if source_lang == target_lang:
+        yield text
+        return
+    if not Config.HUGGINGFACE_API_KEY:
+        # Template answers are not translations, so keep them out of the memory
+        yield from stream_ai_recommendation(f"Translate the following text from {source_lang} to {target_lang}:\n\n{text}")
+        return
+
+    memory = get_translation_memory()
+    max_chars = Config.TRANSLATION_BATCH_CHARS if max_chars is None else max_chars
+    for window in _windows(text, max_chars):
+        segments = [segment for segment, _ in window]
+        known = memory.lookup(source_lang, target_lang, segments)
+        misses = list(dict.fromkeys(segment for segment in segments if segment not in known))
+
+        position = 0
+        if misses:
+            # Yield what is already known up to the first sentence that needs the model
+            while window[position][0] in known:
+                segment, whitespace = window[position]
+                yield known[segment] + whitespace
+                position += 1
+            translated = translate_segments(misses, source_lang, target_lang)
+            memory.store(source_lang, target_lang, translated)
+            known.update(translated)
+
+        for segment, whitespace in window[position:]:
+            yield known[segment] + whitespace
@@ -1,25 +1,337 @@
-import requests
-
-def get_travel_destinations(api_key):
-    url = f"https://api.example.com/destinations?api_key={api_key}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        return None
+import codecs
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from config.settings import Config
+from utils import http_client
+from utils.tracing import traced
+
+# Bytes read from the socket per step while parsing a list page
+CHUNK_BYTES = 64 * 1024
+
+# List pages larger than this are streamed but not kept for revalidation
+MAX_CACHED_PAGE_BYTES = 8 * 2 ** 20
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]}"
+
+
+class TravelAPIError(Exception):
+    """The travel API answered with an unexpected status"""
+
+    def __init__(self, status_code):
+        super().__init__(f"Travel API returned {status_code}")
+        self.status_code = status_code
+
+
+class _JsonReader:
+    """Pulls JSON tokens and values out of a stream of byte chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            text = self._utf8.decode(b"", final=True)
+            self._eof = True
+        else:
+            text = self._utf8.decode(chunk)
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or "" at the end of the stream"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected):
+        char = self.peek()
+        if not char or char not in expected:
+            raise ValueError(f"Malformed travel API response: expected one of {expected!r}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number not yet followed by a delimiter may go on in the next chunk
+            if (
+                isinstance(value, (int, float)) and not isinstance(value, bool)
+                and (end == len(self._buffer) or self._buffer[end] not in _DELIMITERS)
+                and self._fill()
+            ):
+                continue
+            self._pos = end
+            return value
+
+
+def _array_items(reader):
+    reader.take("[")
+    if reader.peek() == "]":
+        reader.take("]")
+        return
+    while True:
+        yield reader.value()
+        if reader.take(",]") == "]":
+            return
+
+
+def iter_results(chunks, members=None, key="results"):
+    """Yield the items of a JSON list while its bytes are still arriving.
+
+    The document is either the list itself or an object holding it under
+    ``key``; the object's other members (e.g. ``next``) are stored in
+    ``members``. Only one item is decoded and held at a time.
+    """
+    reader = _JsonReader(chunks)
+    if reader.peek() == "[":
+        yield from _array_items(reader)
+        return
+    reader.take("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.value()
+        reader.take(":")
+        if name == key and reader.peek() == "[":
+            yield from _array_items(reader)
+        else:
+            value = reader.value()
+            if members is not None:
+                members[name] = value
+        if reader.take(",}") == "}":
+            return
+
+
+def canonical_url(url):
+    """``url`` with its query sorted and the API key removed, used as the cache key"""
+    parts = urlsplit(url)
+    query = sorted((name, value) for name, value in parse_qsl(parts.query) if name != "api_key")
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+class PageCache:
+    """Persistent store of travel API list pages and the validators they were served with"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(Config.CACHE_DIR, "travel_pages.sqlite3")
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "next_url TEXT, body BLOB NOT NULL, checked REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, url):
+        """Return ``(etag, last_modified, next_url, body, checked)`` or None"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT etag, last_modified, next_url, body, checked FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+    def put(self, url, etag, last_modified, next_url, body):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, next_url, body, time.time()),
+            )
+            self._db.commit()
+
+    def touch(self, url):
+        """Mark a page as just revalidated"""
+        with self._lock:
+            self._db.execute("UPDATE pages SET checked = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
 
-def get_accommodation_options(destination, api_key):
-    url = f"https://api.example.com/accommodations?destination={destination}&api_key={api_key}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    else:
+
+class TravelClient:
+    """Paginated, streaming reader for the travel content API.
+
+    List endpoints are walked page by page as one generator: a page is
+    requested with ``per_page`` and followed through its ``next`` member or
+    ``Link: rel="next"`` header, and its items are parsed off the socket
+    as they arrive. Pages served with an ETag or Last-Modified are kept on
+    disk; for ``revalidate_after`` seconds they are reused without a
+    request, then revalidated with If-None-Match / If-Modified-Since so an
+    unchanged page costs a 304 and no body.
+    """
+
+    def __init__(self, base_url=None, api_key=None, cache=None, page_size=None, revalidate_after=None):
+        self.base_url = (base_url or Config.TRAVEL_API_URL).rstrip("/")
+        self.api_key = api_key or Config.TRAVEL_API_KEY
+        self.cache = cache or PageCache()
+        self.page_size = Config.TRAVEL_PAGE_SIZE if page_size is None else page_size
+        self.revalidate_after = Config.TRAVEL_REVALIDATE_SECONDS if revalidate_after is None else revalidate_after
+        self._lock = threading.Lock()
+        self.fresh = 0
+        self.not_modified = 0
+        self.downloaded = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _streamed(self, url, response, store):
+        parts = []
+        size = 0
+        with response:
+            for chunk in response.iter_content(CHUNK_BYTES):
+                if store:
+                    size += len(chunk)
+                    parts.append(chunk)
+                    if size > MAX_CACHED_PAGE_BYTES:
+                        store = False
+                        parts.clear()
+                yield chunk
+        # Only pages read to the end are kept
+        if store:
+            self.cache.put(url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                           response.links.get("next", {}).get("url"), b"".join(parts))
+
+    def _page(self, url, endpoint, api_key):
+        """Return ``(chunks, next_url)`` for one page, from the cache when it is still valid"""
+        cached = self.cache.get(url)
+        headers = {}
+        if cached is not None:
+            etag, last_modified, next_url, body, checked = cached
+            if time.time() - checked < self.revalidate_after:
+                self._count("fresh")
+                return [body], next_url
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = http_client.get(
+            url, upstream="travel", endpoint=endpoint, params={"api_key": api_key or self.api_key},
+            headers=headers, stream=True,
+        )
+        if response.status_code == 304 and cached is not None:
+            response.close()
+            self.cache.touch(url)
+            self._count("not_modified")
+            return [body], next_url
+        if response.status_code != 200:
+            response.close()
+            raise TravelAPIError(response.status_code)
+
+        self._count("downloaded")
+        store = bool(response.headers.get("ETag") or response.headers.get("Last-Modified"))
+        return self._streamed(url, response, store), response.links.get("next", {}).get("url")
+
+    def iter_items(self, endpoint, api_key=None, **params):
+        """Yield every item of a list endpoint across all of its pages"""
+        url = canonical_url(f"{self.base_url}/{endpoint}?{urlencode({'per_page': self.page_size, **params})}")
+        while url:
+            members = {}
+            chunks, next_url = self._page(url, endpoint, api_key)
+            chunks = iter(chunks)
+            yield from iter_results(chunks, members)
+            # Read to the end so a downloaded page is stored
+            for _ in chunks:
+                pass
+            next_url = members.get("next") or next_url
+            url = canonical_url(urljoin(url, next_url)) if next_url else None
+
+    def stats(self):
+        with self._lock:
+            return {"fresh": self.fresh, "not_modified": self.not_modified, "downloaded": self.downloaded}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_travel_client():
+    """Return the travel API client shared by every session in this process"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TravelClient()
+    return _client
+
+
+def _collect(endpoint, api_key, **params):
+    if not (api_key or Config.TRAVEL_API_KEY):
         return None
+    try:
+        return list(get_travel_client().iter_items(endpoint, api_key=api_key, **params))
+    except Exception:
+        return None
+
+
+@traced()
+def get_travel_destinations(api_key=None):
+    return _collect("destinations", api_key)
+
+
+def iter_accommodation_options(destination, api_key=None):
+    """Accommodations for ``destination`` one at a time, for lists too large to hold at once"""
+    return get_travel_client().iter_items("accommodations", api_key=api_key, destination=destination)
+
+
+@traced()
+def get_accommodation_options(destination, api_key=None):
+    return _collect("accommodations", api_key, destination=destination)
+
+
+@traced()
+def get_travel_tips(destination, api_key=None):
+    return _collect("travel_tips", api_key, destination=destination)
+
+
+@traced()
+def get_destination_suggestions(region=None, limit=20):
+    """Names of the best-rated destinations, optionally in one region; [] if the API is unavailable"""
+    if not Config.TRAVEL_API_KEY:
+        return []
+    try:
+        destinations = (
+            destination for destination in get_travel_client().iter_items("destinations")
+            if region is None or destination.get("region") == region
+        )
+        best = heapq.nlargest(limit, destinations, key=lambda destination: destination.get("rating") or 0)
+    except Exception:
+        return []
+    return [destination["name"] for destination in best]
+
 
-def get_travel_tips(destination, api_key):
-    url = f"https://api.example.com/travel_tips?destination={destination}&api_key={api_key}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        return None
\ No newline at end of file
+def create_itinerary(items, start_date=None):
+    """Turn one-activity-per-line input into day-numbered itinerary rows"""
+    activities = [item.strip() for item in items if item.strip()]
+    itinerary = []
+    for day, activity in enumerate(activities, start=1):
+        row = {"Day": day, "Activity": activity}
+        if start_date is not None:
+            row["Date"] = start_date + timedelta(days=day - 1)
+        itinerary.append(row)
+    return itinerary
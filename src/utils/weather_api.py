@@ -0,0 +1,252 @@
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import streamlit as st
+
+from config.settings import Config
+from utils import http_client
+from utils.shared_cache import get_shared_cache
+from utils.tracing import traced
+
+# Most city IDs OpenWeather accepts in one /group request
+GROUP_LIMIT = 20
+
+# Current conditions kept in memory, across all cities
+CONDITIONS_ENTRIES = 1024
+
+NOT_FOUND = {"cod": "404", "message": "city not found"}
+
+_MISS = object()
+
+
+class _UnsharedAnswer(Exception):
+    """An error answer from OpenWeather, returned to the caller but not cached"""
+
+    def __init__(self, data):
+        super().__init__(data.get("message"))
+        self.data = data
+
+
+def normalize_city(city):
+    """Canonical form of a free-text city name, e.g. ``" paris ,FR"`` -> ``"paris,fr"``"""
+    text = unicodedata.normalize("NFKC", city)
+    return ",".join(" ".join(part.split()) for part in text.split(",")).strip(",").casefold()
+
+
+class GeocodeCache:
+    """Persistent map from normalized city name to OpenWeather city ID and coordinates.
+
+    Names OpenWeather does not know are remembered too, for a shorter time,
+    so a typo is not looked up again on every rerun.
+    """
+
+    def __init__(self, path=None, ttl=None, miss_ttl=None):
+        self.path = path or os.path.join(Config.CACHE_DIR, "geocode.sqlite3")
+        self.ttl = Config.GEOCODE_TTL_SECONDS if ttl is None else ttl
+        self.miss_ttl = Config.GEOCODE_MISS_TTL_SECONDS if miss_ttl is None else miss_ttl
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS places (key TEXT PRIMARY KEY, city_id INTEGER, name TEXT, lat REAL, lon REAL, created REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        """Return the place dict, ``_MISS`` for a known unknown name, or None if never looked up"""
+        with self._lock:
+            row = self._db.execute("SELECT city_id, name, lat, lon, created FROM places WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        city_id, name, lat, lon, created = row
+        if city_id is None:
+            return _MISS if time.time() - created < self.miss_ttl else None
+        if time.time() - created >= self.ttl:
+            return None
+        return {"id": city_id, "name": name, "lat": lat, "lon": lon}
+
+    def put(self, key, place):
+        """Remember ``place`` for ``key``; ``place=None`` records that the city was not found"""
+        place = place or {}
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?)",
+                (key, place.get("id"), place.get("name"), place.get("lat"), place.get("lon"), time.time()),
+            )
+            self._db.commit()
+
+
+class WeatherService:
+    """Current conditions from OpenWeather, looked up by city ID.
+
+    A city name is sent to OpenWeather only the first time it is seen; the
+    ID and coordinates in that answer go to the geocode cache, and later
+    lookups and batch lookups use the ID. Conditions are cached for
+    ``ttl`` seconds per city, in memory and in the shared cache, so other
+    worker processes on the host reuse them.
+    """
+
+    def __init__(self, geocodes=None, ttl=None, shared=None):
+        self.geocodes = geocodes or GeocodeCache()
+        self.ttl = Config.WEATHER_TTL_SECONDS if ttl is None else ttl
+        self.shared = shared or get_shared_cache()
+        self._conditions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, path, **params):
+        return http_client.get(
+            f"{Config.WEATHER_API_URL}/{path}", upstream="weather", endpoint=path,
+            params={**params, "appid": Config.WEATHER_API_KEY, "units": "metric"},
+        )
+
+    def _cached(self, city_id):
+        with self._lock:
+            entry = self._conditions.get(city_id)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+        shared = self.shared.get_json("weather", str(city_id))
+        if shared is None:
+            return None
+        age = time.time() - shared["fetched"]
+        if age >= self.ttl:
+            return None
+        self._remember(shared["data"], age)
+        return shared["data"]
+
+    def _remember(self, data, age=0.0):
+        with self._lock:
+            self._conditions[data["id"]] = (time.monotonic() - age, data)
+            self._conditions.move_to_end(data["id"])
+            while len(self._conditions) > CONDITIONS_ENTRIES:
+                self._conditions.popitem(last=False)
+
+    def _store(self, data):
+        self._remember(data)
+        self.shared.set_json("weather", str(data["id"]), {"fetched": time.time(), "data": data})
+
+    def current(self, city):
+        """Return OpenWeather's current-weather document for ``city``"""
+        key = normalize_city(city)
+        if not key:
+            return None
+        place = self.geocodes.get(key)
+        if place is _MISS:
+            return dict(NOT_FOUND)
+
+        if place is not None:
+            cached = self._cached(place["id"])
+            if cached is not None:
+                return cached
+
+        # One worker process on the host asks OpenWeather; the others wait for its answer
+        shared_key = f"name:{key}" if place is None else str(place["id"])
+        try:
+            entry = self.shared.fetch_once("weather", shared_key, lambda: self._download(key, place))
+        except _UnsharedAnswer as answer:
+            return answer.data
+        if "main" in entry["data"]:
+            self._remember(entry["data"], time.time() - entry["fetched"])
+        return entry["data"]
+
+    def _download(self, key, place):
+        """Ask OpenWeather for one city; found and not-found answers are shared, anything else raises"""
+        if place is None:
+            response = self._get("weather", q=key)
+        else:
+            response = self._get("weather", id=place["id"])
+
+        data = response.json()
+        entry = {"fetched": time.time(), "data": data}
+        if response.status_code == 404:
+            self.geocodes.put(key, None)
+        elif response.status_code == 200:
+            self._remember(data)
+            if place is None:
+                self.shared.set_json("weather", str(data["id"]), entry)
+                coord = data.get("coord", {})
+                self.geocodes.put(key, {"id": data["id"], "name": data.get("name"), "lat": coord.get("lat"), "lon": coord.get("lon")})
+        else:
+            raise _UnsharedAnswer(data)
+        return entry
+
+    def batch(self, cities):
+        """Return ``{city: document}`` for several cities with as few requests as possible.
+
+        Cached cities cost nothing, known cities are fetched together through
+        the ``/group`` endpoint, and only never-seen names are looked up one
+        by one.
+        """
+        results = {}
+        waiting = {}
+        for city in dict.fromkeys(cities):
+            place = self.geocodes.get(normalize_city(city))
+            if place is _MISS:
+                results[city] = dict(NOT_FOUND)
+            elif place is None:
+                results[city] = self.current(city)
+            else:
+                cached = self._cached(place["id"])
+                if cached is not None:
+                    results[city] = cached
+                else:
+                    waiting.setdefault(place["id"], []).append(city)
+
+        city_ids = list(waiting)
+        for start in range(0, len(city_ids), GROUP_LIMIT):
+            chunk = city_ids[start:start + GROUP_LIMIT]
+            response = self._get("group", id=",".join(str(city_id) for city_id in chunk))
+            if response.status_code != 200:
+                continue
+            for data in response.json().get("list", []):
+                self._store(data)
+                for city in waiting.get(data["id"], ()):
+                    results[city] = data
+
+        return {city: results.get(city) for city in cities}
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_weather_service():
+    """Return the weather service shared by every session in this process"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = WeatherService()
+    return _service
+
+
+# Function to get weather information
+@traced()
+def get_weather(city):
+    """Get current weather for a city"""
+    if not Config.WEATHER_API_KEY:
+        st.error("Weather API key not configured. Please set WEATHER_API_KEY in your environment variables.")
+        return None
+
+    try:
+        return get_weather_service().current(city)
+    except Exception as e:
+        st.error(f"Error fetching weather: {e}")
+        return None
+
+
+@traced()
+def get_weather_batch(cities):
+    """Get current weather for several cities, e.g. the stops of an itinerary"""
+    if not Config.WEATHER_API_KEY:
+        st.error("Weather API key not configured. Please set WEATHER_API_KEY in your environment variables.")
+        return {city: None for city in cities}
+
+    try:
+        return get_weather_service().batch(cities)
+    except Exception as e:
+        st.error(f"Error fetching weather: {e}")
+        return {city: None for city in cities}
@@ -0,0 +1,53 @@
+"""Shared fixtures: ``src`` and ``benchmarks`` on the path, and the local upstream stub.
+
+The environment is set before ``config.settings`` is first imported, so
+caches go to a throwaway directory and no test talks to a real service.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "benchmarks")]
+
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="travel-buddy-tests-")
+os.environ["SHARED_CACHE_BACKEND"] = "memory"
+for name in ("HUGGINGFACE_API_KEY", "WEATHER_API_KEY", "TRAVEL_API_KEY"):
+    os.environ[name] = "test"
+
+import pytest
+import stub_upstream
+
+from config.settings import Config
+from utils import inference_dispatcher
+
+
+@pytest.fixture(scope="session")
+def upstream_server():
+    server, state, base_url = stub_upstream.start()
+    yield state, base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def upstream(upstream_server, monkeypatch):
+    """The stub's ``StubState``, with counters cleared and the app's upstream URLs pointed at it"""
+    state, base_url = upstream_server
+    state.reset()
+    state.latency_ms = 0.0
+    for name, value in stub_upstream.env_for(base_url).items():
+        monkeypatch.setattr(Config, name, value)
+    return state
+
+
+@pytest.fixture(scope="session")
+def fixtures():
+    return stub_upstream.load_fixtures()
+
+
+@pytest.fixture
+def dispatcher(monkeypatch):
+    """A fresh, unthrottled dispatcher in place of the process-wide one"""
+    dispatcher = inference_dispatcher.InferenceDispatcher(rate=0, burst=1, max_attempts=3)
+    monkeypatch.setattr(inference_dispatcher, "_dispatcher", dispatcher)
+    return dispatcher
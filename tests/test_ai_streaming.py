@@ -0,0 +1,45 @@
+import uuid
+
+from utils import ai_service
+
+
+def unique_prompt():
+    return f"What should I see in Paris? ({uuid.uuid4().hex})"
+
+
+def test_stream_yields_tokens_as_they_arrive(upstream, dispatcher, fixtures):
+    tokens = list(ai_service.stream_ai_recommendation(unique_prompt(), use_cache=False))
+
+    assert len(tokens) == len(fixtures["inference"]["answer"].split(" "))
+    assert "".join(tokens) == fixtures["inference"]["answer"]
+    assert upstream.snapshot() == {"huggingface:generate_stream": 1}
+
+
+def test_stream_retries_model_loading(upstream, dispatcher, fixtures):
+    upstream.fail_next("huggingface:generate_stream", times=2)
+
+    answer = "".join(ai_service.stream_ai_recommendation(unique_prompt(), use_cache=False))
+
+    assert answer == fixtures["inference"]["answer"]
+    assert upstream.snapshot() == {"huggingface:generate_stream": 3, "huggingface:generate_stream:error": 2}
+    assert dispatcher.stats()["backoffs"] == 2
+
+
+def test_stream_falls_back_to_template_when_retries_run_out(upstream, dispatcher):
+    upstream.fail_next("huggingface:generate_stream", times=3)
+    prompt = unique_prompt()
+
+    answer = "".join(ai_service.stream_ai_recommendation(prompt, use_cache=False))
+
+    assert answer == ai_service.get_template_response(prompt)
+    assert upstream.snapshot()["huggingface:generate_stream"] == 3
+
+
+def test_streamed_answer_is_cached(upstream, dispatcher, fixtures):
+    prompt = unique_prompt()
+    first = "".join(ai_service.stream_ai_recommendation(prompt))
+    second = list(ai_service.stream_ai_recommendation(prompt))
+
+    assert first == fixtures["inference"]["answer"]
+    assert second == [first]
+    assert upstream.snapshot() == {"huggingface:generate_stream": 1}
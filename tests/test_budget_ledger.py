@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pytest
+
+from utils.budget_ledger import BudgetLedger, read_expense_csv
+
+
+def test_removed_lines_are_gone_for_update_and_remove():
+    ledger = BudgetLedger()
+    food = ledger.add("Food", 120.0, "USD")
+    hotel = ledger.add("Accommodation", 300.0, "EUR")
+
+    ledger.remove(food)
+
+    assert food not in ledger and hotel in ledger
+    assert len(ledger) == 1
+    with pytest.raises(KeyError):
+        ledger.update(food, amount=50.0)
+    with pytest.raises(KeyError):
+        ledger.remove(food)
+    with pytest.raises(KeyError):
+        ledger.remove(99)
+
+
+def test_removing_a_line_takes_it_out_of_the_totals():
+    ledger = BudgetLedger()
+    food = ledger.add("Food", 120.0, "USD", day=1)
+    ledger.add("Food", 30.0, "USD", day=2)
+
+    ledger.remove(food)
+
+    assert ledger.totals("category", "USD", factors=np.ones(1)) == {"Food": 30.0}
+    assert ledger.totals("day", "USD", factors=np.ones(1)) == {2: 30.0}
+
+
+def test_expense_csv_rows_without_amount_or_currency_are_skipped():
+    csv = io.StringIO("category,amount,currency,day\nFood,12.5,eur,1\nFood,,USD,1\nHotel,lots,USD,2\nTaxi,8,,2\nTaxi,9, usd ,x\n")
+
+    lines, skipped = read_expense_csv(csv)
+
+    assert skipped == 3
+    assert list(lines["currency"]) == ["EUR", "USD"]
+    ledger = BudgetLedger()
+    ledger.extend(lines["category"], lines["amount"], lines["currency"], days=lines["day"])
+    assert ledger.totals("category", "USD", factors=np.ones(2)) == {"Food": 12.5, "Taxi": 9.0}
+
+
+@pytest.mark.parametrize("text", ["category,amount\nFood,12\n", "", "a,b\n1,2,3,4\n\"x"])
+def test_unusable_expense_csv_is_a_value_error(text):
+    with pytest.raises(ValueError):
+        read_expense_csv(io.StringIO(text))
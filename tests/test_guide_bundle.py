@@ -0,0 +1,70 @@
+import json
+import time
+
+from pregenerate_guides import Journal, generate_guide, read_journal
+from utils.guide_bundle import PROMPT_VERSION, BundleWriter, GuideBundle, guide_key, rank_destinations
+from utils.inference_dispatcher import InferenceDispatcher
+
+GUIDE = {"city": "Paris", "overview": "City of light.", "attractions": "- Louvre"}
+
+
+def test_bundle_round_trip_and_freshness(tmp_path):
+    path = str(tmp_path / "guides.bundle")
+    writer = BundleWriter(path)
+    writer.add("paris", GUIDE, generated=time.time())
+    writer.add_raw("rome", b"x", time.time(), "older-prompts")
+    writer.commit()
+
+    bundle = GuideBundle(path)
+
+    assert bundle.get(" Paris ") == GUIDE
+    assert bundle.get("Paris, Texas") is None
+    assert "Kyoto" not in bundle
+    assert bundle.is_fresh("paris", max_age=60)
+    assert not bundle.is_fresh("paris", max_age=60, now=time.time() + 120)
+    assert not bundle.is_fresh("rome", max_age=60)
+
+
+def test_journal_keeps_only_complete_entries_for_the_current_prompts(tmp_path):
+    path = tmp_path / "guides.bundle.journal"
+    entries = [
+        {"key": "paris", "guide": GUIDE, "generated": 1.0, "version": PROMPT_VERSION},
+        {"key": "rome", "guide": GUIDE, "generated": 1.0, "version": "older-prompts"},
+        {"key": "oslo", "guide": GUIDE, "generated": 1.0},
+    ]
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries) + '{"key": "lima", "gui')
+
+    assert list(read_journal(str(path))) == ["paris"]
+
+
+def test_generated_guides_are_journaled_by_the_worker(upstream, fixtures, tmp_path):
+    path = str(tmp_path / "guides.bundle.journal")
+    journal = Journal(path)
+
+    entry = generate_guide(InferenceDispatcher(rate=0, burst=1), journal, "Kyoto")
+    journal.close()
+
+    assert entry["guide"]["overview"] == fixtures["inference"]["answer"]
+    assert read_journal(path) == {"kyoto": entry}
+    assert upstream.snapshot() == {"huggingface:generate": 2}
+
+
+def test_searched_cities_rank_before_capitals(tmp_path):
+    class Record:
+        def __init__(self, capital, population):
+            self.capital, self.population = capital, population
+
+    log = tmp_path / "searches.log"
+    log.write_text("1\tKyoto\n2\tkyoto\n3\tKyoto\n4\tTokyo\n5\tPorto\n6\tPorto\n")
+
+    ranked = rank_destinations([Record("Paris", 68), Record("Tokyo", 125)], str(log))
+
+    assert ranked == ["Kyoto", "Porto", "Tokyo", "Paris"]
+    assert guide_key(ranked[0]) == "kyoto"
+
+
+def test_guide_keys_keep_the_country_when_one_is_given():
+    assert guide_key("  paris ") == guide_key("PARIS") == "paris"
+    assert guide_key("Paris ,  Texas") == "paris, texas"
+    assert guide_key("Paris, Texas") != guide_key("Paris, France")
+    assert guide_key("Paris,") == "paris"
@@ -0,0 +1,48 @@
+import multiprocessing
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from utils.history_store import EPOCH, INITIAL_COLUMNS, HistoryStore
+
+
+def test_days_before_epoch_read_as_missing_and_cannot_be_stored(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.add_day(EPOCH, {"USD": 1.0, "EUR": 0.5})
+    before = EPOCH - timedelta(days=1)
+
+    with pytest.raises(ValueError):
+        store.add_day(before, {"USD": 1.0, "EUR": 0.9})
+    assert list(store.has_days([before, EPOCH])) == [False, True]
+    assert np.isnan(store.table([before], ["EUR"])).all()
+    dates, rates = store.series("USD", "EUR", before - timedelta(days=1), EPOCH)
+    assert dates[-1] == EPOCH and np.isnan(rates[:2]).all() and rates[2] == 0.5
+
+
+def add_days(directory, start, name, count):
+    store = HistoryStore(directory)
+    for i in range(count):
+        # Every day brings currencies no other process has, so the matrix keeps widening
+        store.add_day(start + timedelta(days=i), {"USD": 1.0, **{f"{name}{i}_{j}": i + j / 10 for j in range(8)}})
+
+
+def test_processes_sharing_the_store_keep_each_others_days(tmp_path):
+    names, count = ("A", "B", "C"), 40
+    starts = {name: date(2020, 1, 1) + timedelta(days=100 * n) for n, name in enumerate(names)}
+    processes = [
+        multiprocessing.get_context("spawn").Process(target=add_days, args=(str(tmp_path), starts[name], name, count))
+        for name in names
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    store = HistoryStore(str(tmp_path))
+    assert len(store.currencies()) == 1 + len(names) * count * 8 > INITIAL_COLUMNS
+    for name in names:
+        days = [starts[name] + timedelta(days=i) for i in range(count)]
+        codes = [f"{name}{i}_3" for i in range(count)]
+        assert np.diag(store.table(days, codes)).tolist() == [i + 0.3 for i in range(count)]
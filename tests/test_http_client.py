@@ -0,0 +1,65 @@
+import pytest
+
+from config.settings import Config
+from utils import http_client
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    for policy in http_client.POLICIES.values():
+        monkeypatch.setattr(policy, "backoff", 0.0)
+    http_client.reset_metrics()
+
+
+def latest_rates():
+    return http_client.get(f"{Config.EXCHANGE_RATE_API_URL}/latest/USD", upstream="exchange_rates", endpoint="latest")
+
+
+def test_retryable_status_is_retried_until_success(upstream):
+    upstream.fail_next("exchange_rates:latest", times=2)
+
+    response = latest_rates()
+
+    assert response.status_code == 200
+    assert upstream.snapshot()["exchange_rates:latest"] == 3
+    assert http_client.get_metrics()["exchange_rates:latest"]["errors"] == {"503": 2}
+
+
+def test_last_response_is_returned_when_retries_run_out(upstream):
+    upstream.fail_next("exchange_rates:latest", times=5)
+
+    response = latest_rates()
+
+    assert response.status_code == 503
+    assert upstream.snapshot()["exchange_rates:latest"] == http_client.POLICIES["exchange_rates"].retries + 1
+
+
+def test_non_retryable_status_is_not_retried(upstream):
+    upstream.fail_next("exchange_rates:latest", status=404)
+
+    assert latest_rates().status_code == 404
+    assert upstream.snapshot()["exchange_rates:latest"] == 1
+
+
+def test_retries_follow_the_upstream_policy(upstream):
+    upstream.fail_next("weather:weather", times=5)
+
+    response = http_client.get(f"{Config.WEATHER_API_URL}/weather", upstream="weather", params={"q": "Paris"})
+
+    assert response.status_code == 503
+    assert upstream.snapshot()["weather:weather"] == http_client.POLICIES["weather"].retries + 1
+
+
+def test_connection_errors_raise_after_retries():
+    with pytest.raises(http_client.requests.ConnectionError):
+        http_client.get("http://127.0.0.1:9/unreachable", upstream="exchange_rates", endpoint="unreachable")
+
+    errors = http_client.get_metrics()["exchange_rates:unreachable"]["errors"]
+    assert errors == {"ConnectionError": http_client.POLICIES["exchange_rates"].retries + 1}
+
+
+def test_worst_case_covers_every_attempt_and_backoff():
+    policy = http_client.RetryPolicy(timeout=(1.0, 4.0), retries=2, backoff=0.5, max_backoff=0.75)
+
+    # Three attempts of 5 s, then backoffs of at most 0.5 s and 0.75 s
+    assert policy.worst_case_seconds() == 16.25
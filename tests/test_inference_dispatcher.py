@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from utils.ai_service import build_inference_request
+from utils.inference_dispatcher import BACKGROUND, INTERACTIVE, InferenceDispatcher, _Flight
+
+
+def run_concurrently(*calls):
+    """Run each zero-argument call on its own thread; return their results in order"""
+    results = [None] * len(calls)
+
+    def run(i, call):
+        results[i] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+def test_identical_requests_share_one_upstream_call(upstream, fixtures):
+    upstream.latency_ms = 200
+    dispatcher = InferenceDispatcher(rate=0, burst=1)
+    url, headers, payload = build_inference_request("Top sights in Lisbon?")
+
+    answers = run_concurrently(*[lambda: dispatcher.generate(url, headers, payload)] * 8)
+
+    assert answers == [fixtures["inference"]["answer"]] * 8
+    assert upstream.snapshot() == {"huggingface:generate": 1}
+    assert dispatcher.stats()["upstream_calls"] == 1
+    assert dispatcher.stats()["coalesced"] == 7
+
+
+def test_identical_streams_share_one_upstream_call(upstream, fixtures):
+    dispatcher = InferenceDispatcher(rate=0, burst=1)
+    url, headers, payload = build_inference_request("Top sights in Porto?")
+
+    answers = run_concurrently(*[lambda: "".join(dispatcher.stream(url, headers, payload))] * 4)
+
+    assert answers == [fixtures["inference"]["answer"]] * 4
+    assert upstream.snapshot() == {"huggingface:generate_stream": 1}
+
+
+def test_different_requests_are_not_coalesced(upstream):
+    dispatcher = InferenceDispatcher(rate=0, burst=1)
+    requests = [build_inference_request(f"Top sights in {city}?") for city in ("Oslo", "Bergen")]
+
+    run_concurrently(*[lambda request=request: dispatcher.generate(*request) for request in requests])
+
+    assert upstream.snapshot() == {"huggingface:generate": 2}
+    assert dispatcher.stats()["coalesced"] == 0
+
+
+def test_model_loading_backoff_is_shared_by_queued_calls(upstream, fixtures):
+    upstream.fail_next("huggingface:generate")
+    dispatcher = InferenceDispatcher(rate=0, burst=1, max_attempts=3)
+    first = build_inference_request("Top sights in Rome?")
+    second = build_inference_request("Top sights in Milan?")
+
+    def later():
+        while dispatcher.stats()["backoffs"] == 0:
+            time.sleep(0.005)
+        start = time.monotonic()
+        answer = dispatcher.generate(*second)
+        return answer, time.monotonic() - start
+
+    answer, (later_answer, later_wait) = run_concurrently(lambda: dispatcher.generate(*first), later)
+
+    assert answer == later_answer == fixtures["inference"]["answer"]
+    # The stub's 503 asks for 0.2 s; a call made after it waits out the same deadline
+    assert later_wait >= 0.1
+    assert upstream.snapshot() == {"huggingface:generate": 3, "huggingface:generate:error": 1}
+    assert dispatcher.stats()["backoffs"] == 1
+
+
+def test_interactive_calls_are_admitted_before_queued_background_calls(upstream):
+    dispatcher = InferenceDispatcher(rate=5, burst=1)
+    finished = []
+
+    def call(name, priority, delay):
+        time.sleep(delay)
+        dispatcher.generate(*build_inference_request(f"Phrases for {name}?"), priority=priority)
+        finished.append(name)
+
+    run_concurrently(
+        lambda: call("background-1", BACKGROUND, 0),
+        lambda: call("background-2", BACKGROUND, 0.02),
+        lambda: call("background-3", BACKGROUND, 0.04),
+        lambda: call("interactive", INTERACTIVE, 0.08),
+    )
+
+    assert finished == ["background-1", "interactive", "background-2", "background-3"]
+
+
+def test_stream_timeout_is_per_chunk_not_per_answer(upstream, fixtures):
+    # About 40 tokens 10 ms apart: longer than the timeout in total, never between two tokens
+    dispatcher = InferenceDispatcher(rate=0, burst=1, timeout=0.2)
+    url, headers, payload = build_inference_request("Top sights in Paris?")
+
+    assert "".join(dispatcher.stream(url, headers, payload)) == fixtures["inference"]["answer"]
+
+
+def test_flight_times_out_when_no_chunk_arrives():
+    flight = _Flight("key", INTERACTIVE, 0)
+
+    def produce():
+        for token in ("slow ", "but ", "steady"):
+            time.sleep(0.1)
+            flight.publish(token)
+        flight.finish()
+
+    threading.Thread(target=produce).start()
+    assert "".join(flight.subscribe(timeout=0.25)) == "slow but steady"
+
+    stalled = _Flight("key", INTERACTIVE, 0)
+    stalled.publish("half an ")
+    tokens = stalled.subscribe(timeout=0.1)
+    assert next(tokens) == "half an "
+    with pytest.raises(TimeoutError):
+        next(tokens)
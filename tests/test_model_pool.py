@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from config.settings import Config
+from utils import ai_service, model_pool
+from utils.model_pool import ModelPool, ModelRegistry, ModelWorker
+
+
+class FakeParameter:
+    def __init__(self, count):
+        self.count = count
+
+    def numel(self):
+        return self.count
+
+    def element_size(self):
+        return 4
+
+
+class FakeModel:
+    def __init__(self, size):
+        self.size = size
+
+    def parameters(self):
+        return [FakeParameter(self.size // 4)]
+
+
+class FakePipeline:
+    """Stands in for a transformers pipeline: records each call and echoes its inputs"""
+
+    def __init__(self, task, model, size=400, gate=None):
+        self.model_name = model
+        self.model = FakeModel(size)
+        self.calls = []
+        self.gate = gate
+
+    def __call__(self, inputs, **kwargs):
+        if self.gate is not None:
+            self.gate.wait()
+        self.calls.append((list(inputs), kwargs))
+        return [{"answer": f"{self.model_name}: {item['question']}"} for item in inputs]
+
+
+class Loader:
+    def __init__(self, **pipeline_kwargs):
+        self.pipeline_kwargs = pipeline_kwargs
+        self.loads = []
+        self.pipelines = {}
+
+    def __call__(self, task, model):
+        self.loads.append((task, model))
+        pipe = self.pipelines[model] = FakePipeline(task, model, **self.pipeline_kwargs)
+        return pipe
+
+
+def question(text):
+    return {"question": text, "context": ai_service.TRAVEL_CONTEXT}
+
+
+def test_each_model_is_loaded_once():
+    loader = Loader()
+    registry = ModelRegistry(memory_budget=10_000, idle_seconds=60, loader=loader)
+
+    first = registry.get("question-answering", "qa")
+    second = registry.get("question-answering", "qa")
+
+    assert first is second
+    assert loader.loads == [("question-answering", "qa")]
+
+
+def test_least_recently_used_model_is_evicted_over_budget():
+    loader = Loader(size=400)
+    registry = ModelRegistry(memory_budget=1000, idle_seconds=60, loader=loader)
+
+    registry.get("question-answering", "a")
+    registry.get("question-answering", "b")
+    registry.get("question-answering", "a")
+    registry.get("question-answering", "c")
+
+    assert registry.loaded() == [("question-answering", "a"), ("question-answering", "c")]
+    assert registry.memory_used() == 800
+
+
+def test_idle_models_are_evicted():
+    loader = Loader()
+    registry = ModelRegistry(memory_budget=10_000, idle_seconds=0.05, loader=loader)
+
+    registry.get("question-answering", "a")
+    time.sleep(0.1)
+    registry.get("question-answering", "b")
+
+    assert registry.loaded() == [("question-answering", "b")]
+
+
+def test_queued_questions_share_one_forward_pass():
+    loader = Loader()
+    worker = ModelWorker(ModelRegistry(loader=loader), "question-answering", "qa", max_batch=8, batch_wait=0.2)
+
+    futures = [worker.submit(question(f"q{i}")) for i in range(5)]
+    answers = [future.result(timeout=5)["answer"] for future in futures]
+
+    assert answers == [f"qa: q{i}" for i in range(5)]
+    assert [len(inputs) for inputs, _ in loader.pipelines["qa"].calls] == [5]
+
+
+def test_requests_with_different_settings_are_not_batched_together():
+    loader = Loader()
+    worker = ModelWorker(ModelRegistry(loader=loader), "question-answering", "qa", max_batch=8, batch_wait=0.2)
+
+    futures = [worker.submit(question("a")), worker.submit(question("b"), top_k=2), worker.submit(question("c"))]
+    for future in futures:
+        future.result(timeout=5)
+
+    calls = loader.pipelines["qa"].calls
+    assert sorted((len(inputs), kwargs) for inputs, kwargs in calls) == [(1, {"top_k": 2}), (2, {})]
+
+
+def test_full_queue_rejects_new_requests():
+    gate = threading.Event()
+    worker = ModelWorker(ModelRegistry(loader=Loader(gate=gate)), "question-answering", "qa",
+                         max_batch=1, batch_wait=0, queue_size=1)
+
+    running = worker.submit(question("running"))
+    time.sleep(0.1)
+    queued = worker.submit(question("queued"))
+    with pytest.raises(queue.Full):
+        worker.submit(question("rejected"), timeout=0.05)
+
+    gate.set()
+    assert running.result(timeout=5)["answer"] == "qa: running"
+    assert queued.result(timeout=5)["answer"] == "qa: queued"
+
+
+def test_answer_travel_query_goes_through_the_pool(monkeypatch):
+    loader = Loader()
+    monkeypatch.setattr(model_pool, "_pool", ModelPool(ModelRegistry(loader=loader)))
+
+    answers = []
+    threads = [threading.Thread(target=lambda i=i: answers.append(ai_service.answer_travel_query(f"q{i}"))) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(answers) == [f"{Config.QA_MODEL}: q{i}" for i in range(3)]
+    assert len(loader.loads) == 1
@@ -0,0 +1,48 @@
+import time
+
+from utils.orchestrator import PageTasks
+
+
+def slow_words(words, pause, produced):
+    for word in words:
+        time.sleep(pause)
+        produced.append(word)
+        yield word
+
+
+def test_stream_timeout_bounds_each_chunk_not_the_whole_answer():
+    tasks = PageTasks(timeout=0.5)
+    produced = []
+
+    # 0.75 s in total, but never more than 0.25 s between chunks
+    answer = "".join(tasks.stream(slow_words, ["a", "b", "c"], 0.25, produced))
+
+    assert answer == "abc"
+
+
+def test_stalled_stream_is_truncated_and_its_producer_stopped():
+    tasks = PageTasks(timeout=0.3)
+    produced = []
+
+    def stall_after_first_chunk():
+        yield from slow_words(["a"], 0, produced)
+        yield from slow_words(["b", "c", "d", "e"], 0.6, produced)
+
+    answer = "".join(tasks.stream(stall_after_first_chunk))
+
+    assert answer.startswith("a")
+    assert "cut short" in answer
+    # The producer notices the stop at its next chunk and goes no further
+    time.sleep(1.5)
+    assert produced == ["a", "b"]
+
+
+def test_timed_out_result_gets_its_own_callback():
+    tasks = PageTasks()
+    rendered, timed_out = [], []
+
+    tasks.on_result(tasks.submit(time.sleep, 0.5), rendered.append, timeout=0.1, on_timeout=lambda: timed_out.append(True))
+    tasks.on_result(tasks.submit(lambda: "sunny"), rendered.append, timeout=1)
+    tasks.render_all()
+
+    assert rendered == ["sunny"] and timed_out == [True]
@@ -0,0 +1,26 @@
+import time
+
+from utils.rate_scheduler import RateRefreshScheduler
+
+
+class FakeStore:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def refresh(self):
+        self.calls.append("rates")
+
+
+def test_history_is_warmed_only_after_the_start_delay():
+    calls = []
+    scheduler = RateRefreshScheduler(interval=60, warm_days=1, store=FakeStore(calls), warm_delay=0.3)
+    scheduler.warm_history = lambda: calls.append("history")
+
+    scheduler.start()
+    time.sleep(0.1)
+    started = list(calls)
+    time.sleep(0.4)
+    scheduler.stop()
+
+    assert started == ["rates"]
+    assert calls == ["rates", "history"]
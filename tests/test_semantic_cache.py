@@ -0,0 +1,91 @@
+import pytest
+
+from utils import ai_service, semantic_cache
+from utils.semantic_cache import SemanticCache, content_words, same_subject, stem
+
+DIFFERENT_PLACES = [
+    ("Is it safe to travel to Niger?", "Is it safe to travel to Nigeria?"),
+    ("Is it safe to travel to India?", "Is it safe to travel to Indiana?"),
+    ("Is it safe to travel to Oman?", "Is it safe to travel to Romania?"),
+    ("Is it safe to travel to Mali?", "Is it safe to travel to Somalia?"),
+    ("3 days in Rome", "3 days in Paris"),
+]
+
+# Same words in another order; the Translator's and Budget Planner's own prompts
+SWAPPED = [
+    ("Provide 3 additional useful related travel phrases in Spanish with their English translations. Format as a bullet list.",
+     "Provide 3 additional useful related travel phrases in English with their Spanish translations. Format as a bullet list."),
+    ("Create a detailed travel budget for 2 travelers going to Rome for 7 days with a moderate budget.",
+     "Create a detailed travel budget for 7 travelers going to Rome for 2 days with a moderate budget."),
+]
+
+PARAPHRASES = [
+    ("what to pack for Norway in winter", "packing list winter Norway"),
+    ("best museums in Rome", "museum tips for Rome"),
+]
+
+
+@pytest.mark.parametrize("prompt, other", DIFFERENT_PLACES)
+def test_places_containing_each_other_are_different_subjects(prompt, other):
+    assert not same_subject(content_words(prompt), content_words(other))
+    assert not same_subject(content_words(other), content_words(prompt))
+
+
+@pytest.mark.parametrize("prompt, other", PARAPHRASES)
+def test_inflections_are_the_same_subject(prompt, other):
+    assert same_subject(content_words(prompt), content_words(other))
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("cities", "city"), ("packing", "pack"), ("shopping", "shop"), ("beaches", "beach"),
+    ("museums", "museum"), ("bus", "bus"), ("pass", "pass"), ("niger", "niger"), ("nigeria", "nigeria"),
+])
+def test_stem(word, expected):
+    assert stem(word) == expected
+
+
+@pytest.mark.parametrize("prompt, other", DIFFERENT_PLACES)
+def test_cache_does_not_answer_for_another_place(prompt, other):
+    cache = SemanticCache(capacity=8, threshold=0.5, policy="lru", ttl=60)
+    cache.put(prompt, "answer", partition="safety")
+
+    assert cache.get(other, partition="safety") is None
+
+
+@pytest.mark.parametrize("prompt, other", PARAPHRASES)
+def test_cache_answers_paraphrases(prompt, other):
+    cache = SemanticCache(capacity=8, threshold=0.5, policy="lru", ttl=60)
+    cache.put(prompt, "answer", partition="topic")
+
+    assert cache.get(other, partition="topic") == "answer"
+
+
+def test_numbers_in_another_order_are_different_subjects():
+    prompt, other = SWAPPED[1]
+    assert not same_subject(content_words(prompt), content_words(other))
+
+
+@pytest.fixture
+def fresh_semantic_cache(monkeypatch):
+    cache = SemanticCache(capacity=64, threshold=0.6, policy="lru", ttl=60)
+    monkeypatch.setattr(semantic_cache, "_cache", cache)
+    return cache
+
+
+@pytest.mark.parametrize("prompt, other", SWAPPED)
+def test_templated_page_prompts_only_use_the_exact_cache(upstream, dispatcher, fresh_semantic_cache, prompt, other):
+    first = "".join(ai_service.stream_ai_recommendation(prompt))
+    second = ai_service.get_ai_recommendation(other)
+
+    assert first and second
+    assert upstream.snapshot() == {"huggingface:generate_stream": 1, "huggingface:generate": 1}
+    assert fresh_semantic_cache.stats()["entries"] == 0
+
+
+def test_free_form_questions_are_answered_from_paraphrases(upstream, dispatcher, fresh_semantic_cache):
+    first = "".join(ai_service.stream_ai_recommendation("What should I pack for Norway in winter?", paraphrases=True))
+    second = "".join(ai_service.stream_ai_recommendation("packing list winter Norway", paraphrases=True))
+
+    assert second == first
+    assert upstream.snapshot() == {"huggingface:generate_stream": 1}
+    assert fresh_semantic_cache.stats()["hits"] == 1
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+import stub_redis
+
+from utils.rate_store import PIVOT_CURRENCY, RateStore, fetch_latest_rates
+from utils.shared_cache import CachePolicy, RedisBackend, SQLiteBackend, get_shared_cache
+
+NAMESPACES = {"rates": CachePolicy(ttl=60, max_bytes=1024 * 1024), "short": CachePolicy(ttl=0.2, max_bytes=16)}
+
+
+@pytest.fixture(scope="session")
+def redis_url():
+    server, _, url = stub_redis.start()
+    yield url
+    server.shutdown()
+
+
+@pytest.fixture(params=["redis", "sqlite"])
+def make_backend(request, redis_url, tmp_path):
+    """Factory for backend instances sharing one store, like the worker processes on a host"""
+    if request.param == "redis":
+        RedisBackend(redis_url).command("FLUSHDB")
+        return lambda: RedisBackend(redis_url, namespaces=NAMESPACES)
+    path = str(tmp_path / "shared_cache.sqlite3")
+    return lambda: SQLiteBackend(path, namespaces=NAMESPACES)
+
+
+def test_values_are_shared_between_instances(make_backend):
+    writer, reader = make_backend(), make_backend()
+
+    writer.set_json("rates", "latest", {"EUR": 0.9})
+
+    assert reader.get_json("rates", "latest") == {"EUR": 0.9}
+    reader.delete("rates", "latest")
+    assert writer.get("rates", "latest") is None
+
+
+def test_values_expire_and_oversized_values_are_skipped(make_backend):
+    backend = make_backend()
+
+    backend.set("short", "small", b"x")
+    backend.set("short", "large", b"x" * 17)
+
+    assert backend.get("short", "small") == b"x"
+    assert backend.get("short", "large") is None
+    time.sleep(0.3)
+    assert backend.get("short", "small") is None
+
+
+def test_concurrent_workers_fetch_once(upstream, make_backend):
+    workers = [make_backend() for _ in range(6)]
+    start = threading.Barrier(len(workers))
+    upstream.latency_ms = 100
+    results = []
+
+    def work(backend):
+        start.wait()
+        results.append(backend.fetch_once("rates", f"latest:{PIVOT_CURRENCY}", fetch_latest_rates))
+
+    threads = [threading.Thread(target=work, args=(backend,)) for backend in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert len(results) == len(workers) and all(result == results[0] for result in results)
+    assert upstream.snapshot() == {"exchange_rates:latest": 1}
+
+
+def test_unreachable_redis_counts_errors_and_still_fetches():
+    backend = RedisBackend("redis://127.0.0.1:9/0", namespaces=NAMESPACES, timeout=0.2)
+    calls = []
+
+    value = backend.fetch_once("rates", "latest", lambda: calls.append(1) or {"EUR": 0.9})
+
+    assert value == {"EUR": 0.9}
+    assert calls == [1]
+    assert backend.stats()["rates"]["errors"] >= 1
+
+
+def test_fetch_lock_taken_over_after_expiry_is_not_released_by_the_old_holder(make_backend, monkeypatch):
+    first, second = make_backend(), make_backend()
+    monkeypatch.setattr("utils.shared_cache.LOCK_SECONDS", 0.2)
+
+    def slow_fetch():
+        # Outlives the lock, which the second worker then takes
+        time.sleep(0.3)
+        assert second._lock_key("rates", "latest:lock", b"second") is True
+        return {"EUR": 0.9}
+
+    assert first.fetch_once("rates", "latest", slow_fetch) == {"EUR": 0.9}
+    assert second.get("rates", "latest:lock") == b"second"
+
+
+def test_snapshot_from_another_workers_table_keeps_its_fetch_time(upstream):
+    get_shared_cache().delete("rates", f"table:{PIVOT_CURRENCY}")
+    first = RateStore().snapshot()
+    time.sleep(0.05)
+
+    second = RateStore().snapshot()
+
+    assert second.rates == first.rates and second.as_of == first.as_of
+    assert upstream.snapshot() == {"exchange_rates:latest": 1}
@@ -0,0 +1,98 @@
+import pytest
+
+from config.settings import Config
+from utils import http_client, travel_api
+from utils.travel_api import PageCache, TravelAPIError, TravelClient
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_client.POLICIES["travel"], "backoff", 0.0)
+
+
+@pytest.fixture
+def make_client(upstream, tmp_path):
+    cache = PageCache(str(tmp_path / "travel_pages.sqlite3"))
+
+    def make(revalidate_after=0):
+        return TravelClient(api_key="test", cache=cache, page_size=3, revalidate_after=revalidate_after)
+
+    return make
+
+
+def test_every_page_is_walked(upstream, make_client, fixtures):
+    client = make_client()
+
+    assert list(client.iter_items("destinations")) == fixtures["travel"]["destinations"]
+    # 8 destinations, 3 per page
+    assert upstream.snapshot() == {"travel:destinations": 3}
+    assert client.stats() == {"fresh": 0, "not_modified": 0, "downloaded": 3}
+
+
+def test_unchanged_pages_are_revalidated_with_304s(upstream, make_client, fixtures):
+    list(make_client().iter_items("destinations"))
+    upstream.reset()
+    client = make_client()
+
+    assert list(client.iter_items("destinations")) == fixtures["travel"]["destinations"]
+    assert upstream.snapshot() == {"travel:destinations": 3}
+    assert client.stats() == {"fresh": 0, "not_modified": 3, "downloaded": 0}
+
+
+def test_recently_checked_pages_are_served_without_a_request(upstream, make_client, fixtures):
+    list(make_client().iter_items("destinations"))
+    upstream.reset()
+    client = make_client(revalidate_after=300)
+
+    assert list(client.iter_items("destinations")) == fixtures["travel"]["destinations"]
+    assert upstream.snapshot() == {}
+    assert client.stats() == {"fresh": 3, "not_modified": 0, "downloaded": 0}
+
+
+def test_query_parameters_are_kept_across_pages(upstream, make_client, fixtures):
+    client = make_client()
+
+    items = list(client.iter_items("accommodations", destination="Paris"))
+
+    assert items == fixtures["travel"]["accommodations"]
+
+
+def test_retryable_failure_mid_walk_is_retried(upstream, make_client, fixtures):
+    client = make_client()
+    items = client.iter_items("destinations")
+    first_page = [next(items) for _ in range(3)]
+    upstream.fail_next("travel:destinations")
+
+    assert first_page + list(items) == fixtures["travel"]["destinations"]
+    assert upstream.snapshot() == {"travel:destinations": 4, "travel:destinations:error": 1}
+
+
+def test_missing_page_stops_the_walk(upstream, make_client):
+    client = make_client()
+    items = client.iter_items("destinations")
+    for _ in range(3):
+        next(items)
+    upstream.fail_next("travel:destinations", status=404)
+
+    with pytest.raises(TravelAPIError) as error:
+        list(items)
+    assert error.value.status_code == 404
+    assert upstream.snapshot()["travel:destinations"] == 2
+
+
+def test_public_helpers_fall_back_when_a_page_is_missing(upstream, make_client, monkeypatch):
+    monkeypatch.setattr(travel_api, "_client", make_client())
+    monkeypatch.setattr(Config, "TRAVEL_API_KEY", "test")
+    upstream.fail_next("travel:destinations", times=2, status=404)
+
+    assert travel_api.get_travel_destinations() is None
+    assert travel_api.get_destination_suggestions() == []
+
+
+def test_destination_suggestions_are_the_best_rated(upstream, make_client, monkeypatch, fixtures):
+    monkeypatch.setattr(travel_api, "_client", make_client())
+    monkeypatch.setattr(Config, "TRAVEL_API_KEY", "test")
+    destinations = fixtures["travel"]["destinations"]
+    best = sorted(destinations, key=lambda destination: destination.get("rating") or 0, reverse=True)[:2]
+
+    assert travel_api.get_destination_suggestions(limit=2) == [destination["name"] for destination in best]